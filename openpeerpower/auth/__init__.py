@@ -2,7 +2,9 @@
 import asyncio
 from collections import OrderedDict
 from datetime import timedelta
+import hashlib
 import logging
+import time
 from typing import Any, Dict, List, Optional, Tuple, cast
 
 import jwt
@@ -20,6 +22,8 @@ from .providers import AuthProvider, LoginFlow, auth_provider_from_config
 EVENT_USER_ADDED = "user_added"
 EVENT_USER_REMOVED = "user_removed"
 
+ACCESS_TOKEN_CACHE_SIZE = 256
+
 _LOGGER = logging.getLogger(__name__)
 _MfaModuleDict = Dict[str, MultiFactorAuthModule]
 _ProviderKey = Tuple[str, Optional[str]]
@@ -146,6 +150,8 @@ class AuthManager:
         self._providers = providers
         self._mfa_modules = mfa_modules
         self.login_flow = AuthManagerFlowManager(opp, self)
+        # Verified access tokens by token hash, with their expiration time.
+        self._access_token_cache: OrderedDict = OrderedDict()
 
     @property
     def auth_providers(self) -> List[AuthProvider]:
@@ -277,6 +283,7 @@ class AuthManager:
             await asyncio.wait(tasks)
 
         await self._store.async_remove_user(user)
+        self._access_token_cache.clear()
 
         self.opp.bus.async_fire(EVENT_USER_REMOVED, {"user_id": user.id})
 
@@ -427,6 +434,7 @@ class AuthManager:
     ) -> None:
         """Delete a refresh token."""
         await self._store.async_remove_refresh_token(refresh_token)
+        self._access_token_cache.clear()
 
     @callback
     def async_create_access_token(
@@ -450,6 +458,16 @@ class AuthManager:
         self, token: str
     ) -> Optional[models.RefreshToken]:
         """Return refresh token if an access token is valid."""
+        token_hash = hashlib.sha256(token.encode()).digest()
+        cached = self._access_token_cache.get(token_hash)
+
+        if cached is not None:
+            refresh_token, expires = cached
+            if time.time() < expires and refresh_token.user.is_active:
+                self._access_token_cache.move_to_end(token_hash)
+                return refresh_token
+            self._access_token_cache.pop(token_hash)
+
         try:
             unverif_claims = jwt.decode(token, verify=False)
         except jwt.InvalidTokenError:
@@ -467,13 +485,20 @@ class AuthManager:
             issuer = refresh_token.id
 
         try:
-            jwt.decode(token, jwt_key, leeway=10, issuer=issuer, algorithms=["HS256"])
+            claims = jwt.decode(
+                token, jwt_key, leeway=10, issuer=issuer, algorithms=["HS256"]
+            )
         except jwt.InvalidTokenError:
             return None
 
         if refresh_token is None or not refresh_token.user.is_active:
             return None
 
+        if "exp" in claims:
+            self._access_token_cache[token_hash] = (refresh_token, claims["exp"])
+            if len(self._access_token_cache) > ACCESS_TOKEN_CACHE_SIZE:
+                self._access_token_cache.popitem(last=False)
+
         return refresh_token
 
     @callback
@@ -2,8 +2,9 @@
 import asyncio
 import json
 import logging
+import uuid
 
-from aiohttp import web
+from aiohttp import hdrs, web
 from aiohttp.web_exceptions import HTTPBadRequest
 import async_timeout
 import voluptuous as vol
@@ -12,11 +13,13 @@ from openpeerpower.auth.permissions.const import POLICY_READ
 from openpeerpower.bootstrap import DATA_LOGGING
 from openpeerpower.components.http import OpenPeerPowerView
 from openpeerpower.const import (
+    CONTENT_TYPE_JSON,
     EVENT_OPENPEERPOWER_STOP,
     EVENT_TIME_CHANGED,
     HTTP_BAD_REQUEST,
     HTTP_CREATED,
     HTTP_NOT_FOUND,
+    HTTP_NOT_MODIFIED,
     MATCH_ALL,
     URL_API,
     URL_API_COMPONENTS,
@@ -48,10 +51,15 @@ ATTR_VERSION = "version"
 DOMAIN = "api"
 STREAM_PING_PAYLOAD = "ping"
 STREAM_PING_INTERVAL = 50  # seconds
+# Number of states serialized per chunk of a states response
+STATES_CHUNK_SIZE = 100
 
 
 def setup(opp, config):
     """Register the API with the HTTP interface."""
+    # Part of the ETag of states so the tags of an earlier run don't match
+    opp.data[DOMAIN] = uuid.uuid4().hex[:8]
+
     opp.http.register_view(APIStatusView)
     opp.http.register_view(APIEventStream)
     opp.http.register_view(APIConfigView)
@@ -101,14 +109,12 @@ class APIEventStream(OpenPeerPowerView):
         if restrict:
             restrict = restrict.split(",") + [EVENT_OPENPEERPOWER_STOP]
 
-        async def forward_events(event):
+        @op.callback
+        def forward_events(event):
             """Forward events to the open request."""
             if event.event_type == EVENT_TIME_CHANGED:
                 return
 
-            if restrict and event.event_type not in restrict:
-                return
-
             _LOGGER.debug("STREAM %s FORWARDING %s", id(stop_obj), event)
 
             if event.event_type == EVENT_OPENPEERPOWER_STOP:
@@ -116,13 +122,21 @@ class APIEventStream(OpenPeerPowerView):
             else:
                 data = json.dumps(event, cls=JSONEncoder)
 
-            await to_write.put(data)
+            to_write.put_nowait(data)
 
         response = web.StreamResponse()
         response.content_type = "text/event-stream"
         await response.prepare(request)
 
-        unsub_stream = opp.bus.async_listen(MATCH_ALL, forward_events)
+        # Only listen to the requested event types so other events are
+        # filtered out by the bus.
+        if restrict:
+            unsubs = [
+                opp.bus.async_listen(event_type, forward_events)
+                for event_type in set(restrict)
+            ]
+        else:
+            unsubs = [opp.bus.async_listen(MATCH_ALL, forward_events)]
 
         try:
             _LOGGER.debug("STREAM %s ATTACHED", id(stop_obj))
@@ -149,7 +163,8 @@ class APIEventStream(OpenPeerPowerView):
 
         finally:
             _LOGGER.debug("STREAM %s RESPONSE CLOSED", id(stop_obj))
-            unsub_stream()
+            for unsub in unsubs:
+                unsub()
 
         return response
 
@@ -194,17 +209,93 @@ class APIStatesView(OpenPeerPowerView):
     url = URL_API_STATES
     name = "api:states"
 
-    @op.callback
-    def get(self, request):
-        """Get current states."""
+    async def get(self, request):
+        """Get current states.
+
+        The states can be filtered with comma separated lists of domains and
+        entity ids. The response is streamed in chunks and carries an ETag, a
+        request with a matching If-None-Match header gets a 304 response
+        if no state changed.
+        """
+        opp = request.app["opp"]
         user = request["opp_user"]
+        domains = request.query.get("domain")
+        entity_ids = request.query.get("entity_id")
+
+        if domains:
+            domains = list(dict.fromkeys(domains.lower().split(",")))
+            generation = max(opp.states.domain_generation(dom) for dom in domains)
+        else:
+            generation = opp.states.generation
+
+        etag = f'"{opp.data[DOMAIN]}-{generation}-{user.id}"'
+
+        if _etag_matches(request, etag):
+            return web.Response(status=HTTP_NOT_MODIFIED, headers={hdrs.ETAG: etag})
+
+        if entity_ids:
+            states = [opp.states.get(entity_id) for entity_id in entity_ids.split(",")]
+            states = [
+                state
+                for state in states
+                if state is not None and (not domains or state.domain in domains)
+            ]
+        elif domains:
+            states = [state for dom in domains for state in opp.states.async_all(dom)]
+        else:
+            states = opp.states.async_all()
+
         entity_perm = user.permissions.check_entity
-        states = [
-            state
-            for state in request.app["opp"].states.async_all()
-            if entity_perm(state.entity_id, "read")
-        ]
-        return self.json(states)
+        states = [state for state in states if entity_perm(state.entity_id, "read")]
+
+        # Serialize before sending the status and ETag, so a state that can't
+        # be serialized fails the request instead of truncating the response
+        chunks = []
+        for start in range(0, len(states), STATES_CHUNK_SIZE):
+            if chunks:
+                await asyncio.sleep(0)
+            try:
+                chunks.append(
+                    ", ".join(
+                        json.dumps(
+                            state, sort_keys=True, cls=JSONEncoder, allow_nan=False
+                        )
+                        for state in states[start : start + STATES_CHUNK_SIZE]
+                    ).encode("UTF-8")
+                )
+            except (ValueError, TypeError) as err:
+                _LOGGER.error("Unable to serialize to JSON: %s", err)
+                raise
+
+        response = web.StreamResponse(headers={hdrs.ETAG: etag})
+        response.content_type = CONTENT_TYPE_JSON
+        response.enable_chunked_encoding()
+        response.enable_compression()
+        await response.prepare(request)
+
+        separator = b"["
+        for chunk in chunks:
+            await response.write(separator + chunk)
+            separator = b", "
+
+        await response.write(b"[]" if separator == b"[" else b"]")
+        await response.write_eof()
+        return response
+
+
+def _etag_matches(request, etag):
+    """Return if the If-None-Match header of a request matches an ETag."""
+    if_none_match = request.headers.get(hdrs.IF_NONE_MATCH)
+
+    if not if_none_match:
+        return False
+
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or (tag[2:] if tag.startswith("W/") else tag) == etag:
+            return True
+
+    return False
 
 
 class APIEntityStateView(OpenPeerPowerView):
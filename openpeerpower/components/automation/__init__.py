@@ -1,6 +1,8 @@
 """Allow to set up simple automation rules via the config file."""
+import asyncio
 import importlib
 import logging
+import time
 from typing import Any, Awaitable, Callable, List, Optional, Set
 
 import voluptuous as vol
@@ -23,7 +25,12 @@ from openpeerpower.const import (
 )
 from openpeerpower.core import Context, CoreState, OpenPeerPower, callback
 from openpeerpower.exceptions import OpenPeerPowerError
-from openpeerpower.helpers import condition, extract_domain_configs, script
+from openpeerpower.helpers import (
+    condition,
+    extract_domain_configs,
+    reference_index,
+    script,
+)
 import openpeerpower.helpers.config_validation as cv
 from openpeerpower.helpers.entity import ToggleEntity
 from openpeerpower.helpers.entity_component import EntityComponent
@@ -124,18 +131,7 @@ def is_on(opp, entity_id):
 @callback
 def automations_with_entity(opp: OpenPeerPower, entity_id: str) -> List[str]:
     """Return all automations that reference the entity."""
-    if DOMAIN not in opp.data:
-        return []
-
-    component = opp.data[DOMAIN]
-
-    results = []
-
-    for automation_entity in component.entities:
-        if entity_id in automation_entity.referenced_entities:
-            results.append(automation_entity.entity_id)
-
-    return results
+    return reference_index.async_get_index(opp, DOMAIN).async_with_entity(entity_id)
 
 
 @callback
@@ -157,18 +153,7 @@ def entities_in_automation(opp: OpenPeerPower, entity_id: str) -> List[str]:
 @callback
 def automations_with_device(opp: OpenPeerPower, device_id: str) -> List[str]:
     """Return all automations that reference the device."""
-    if DOMAIN not in opp.data:
-        return []
-
-    component = opp.data[DOMAIN]
-
-    results = []
-
-    for automation_entity in component.entities:
-        if device_id in automation_entity.referenced_devices:
-            results.append(automation_entity.entity_id)
-
-    return results
+    return reference_index.async_get_index(opp, DOMAIN).async_with_device(device_id)
 
 
 @callback
@@ -214,11 +199,20 @@ async def async_setup(opp, config):
     component.async_register_entity_service(SERVICE_TURN_OFF, {}, "async_turn_off")
 
     async def reload_service_handler(service_call):
-        """Remove all automations and load new ones from config."""
-        conf = await component.async_prepare_reload()
+        """Reload the automations that changed in the config."""
+        start = time.monotonic()
+        conf = await component.async_prepare_reload(skip_reset=True)
         if conf is None:
             return
-        await _async_process_config(opp, conf, component)
+        added, removed, unchanged = await _async_process_config(opp, conf, component)
+        _LOGGER.info(
+            "Reloaded automations in %.3f seconds: "
+            "%s added, %s removed, %s unchanged",
+            time.monotonic() - start,
+            added,
+            removed,
+            unchanged,
+        )
 
     async_register_admin_service(
         opp,
@@ -243,6 +237,7 @@ class AutomationEntity(ToggleEntity, RestoreEntity):
         action_script,
         hidden,
         initial_state,
+        raw_config=None,
     ):
         """Initialize an automation entity."""
         self._id = automation_id
@@ -257,6 +252,7 @@ class AutomationEntity(ToggleEntity, RestoreEntity):
         self._is_enabled = False
         self._referenced_entities: Optional[Set[str]] = None
         self._referenced_devices: Optional[Set[str]] = None
+        self.raw_config = raw_config
 
     @property
     def name(self):
@@ -288,6 +284,13 @@ class AutomationEntity(ToggleEntity, RestoreEntity):
         """Return True if entity is on."""
         return self._async_detach_triggers is not None or self._is_enabled
 
+    @property
+    def condition_metrics(self) -> Optional[dict]:
+        """Return evaluation counters and timings of the conditions."""
+        if self._cond_func is None:
+            return None
+        return self._cond_func.metrics
+
     @property
     def referenced_devices(self):
         """Return a set of referenced devices."""
@@ -331,6 +334,10 @@ class AutomationEntity(ToggleEntity, RestoreEntity):
         """Startup with initial state or previous state."""
         await super().async_added_to_opp()
 
+        reference_index.async_get_index(self.opp, DOMAIN).async_set(
+            self, self.referenced_entities, self.referenced_devices
+        )
+
         state = await self.async_get_last_state()
         if state:
             enable_automation = state.state == STATE_ON
@@ -410,6 +417,7 @@ class AutomationEntity(ToggleEntity, RestoreEntity):
     async def async_will_remove_from_opp(self):
         """Remove listeners when removing automation from Open Peer Power."""
         await super().async_will_remove_from_opp()
+        reference_index.async_get_index(self.opp, DOMAIN).async_remove(self)
         await self.async_disable()
 
     async def async_enable(self):
@@ -498,9 +506,18 @@ class AutomationEntity(ToggleEntity, RestoreEntity):
 async def _async_process_config(opp, config, component):
     """Process config and add automations.
 
+    Automations that are already set up with the same config are kept as they
+    are, including their attached triggers. Other existing automations are
+    removed. Returns the number of added, removed and unchanged automations.
+
     This method is a coroutine.
     """
+    existing = {}
+    for entity in component.entities:
+        existing.setdefault((entity.unique_id, entity.name), []).append(entity)
+
     entities = []
+    unchanged = 0
 
     for config_key in extract_domain_configs(config, DOMAIN):
         conf = config[config_key]
@@ -509,6 +526,20 @@ async def _async_process_config(opp, config, component):
             automation_id = config_block.get(CONF_ID)
             name = config_block.get(CONF_ALIAS) or f"{config_key} {list_no}"
 
+            candidates = existing.get((automation_id, name), [])
+            current = next(
+                (
+                    entity
+                    for entity in candidates
+                    if entity.raw_config == config_block
+                ),
+                None,
+            )
+            if current is not None:
+                candidates.remove(current)
+                unchanged += 1
+                continue
+
             hidden = config_block[CONF_HIDE_ENTITY]
             initial_state = config_block.get(CONF_INITIAL_STATE)
 
@@ -530,33 +561,34 @@ async def _async_process_config(opp, config, component):
                 action_script,
                 hidden,
                 initial_state,
+                config_block,
             )
 
             entities.append(entity)
 
+    # Remove changed automations before adding them back so they keep
+    # their entity id.
+    removed = [entity for candidates in existing.values() for entity in candidates]
+    if removed:
+        await asyncio.wait(
+            [component.async_remove_entity(entity.entity_id) for entity in removed]
+        )
+
     if entities:
         await component.async_add_entities(entities)
 
+    return len(entities), len(removed), unchanged
+
 
 async def _async_process_if(opp, config, p_config):
     """Process if checks."""
     if_configs = p_config[CONF_CONDITION]
 
-    checks = []
-    for if_config in if_configs:
-        try:
-            checks.append(await condition.async_from_config(opp, if_config, False))
-        except OpenPeerPowerError as ex:
-            _LOGGER.warning("Invalid condition: %s", ex)
-            return None
-
-    def if_action(variables=None):
-        """AND all conditions."""
-        return all(check(opp, variables) for check in checks)
-
-    if_action.config = if_configs
-
-    return if_action
+    try:
+        return await condition.async_compile(opp, if_configs)
+    except OpenPeerPowerError as ex:
+        _LOGGER.warning("Invalid condition: %s", ex)
+        return None
 
 
 @callback
@@ -2,7 +2,8 @@
 import asyncio
 from datetime import timedelta
 import hashlib
-from typing import Any, List, Sequence
+import heapq
+from typing import Any, Dict, List, Sequence, Tuple
 
 import voluptuous as vol
 
@@ -95,6 +96,12 @@ class DeviceTracker:
         )
         self.defaults = defaults
         self._is_updating = asyncio.Lock()
+        # New devices waiting to be written to known_devices.yaml
+        self._pending_devices: List[Device] = []
+        # Min-heap of (time the device becomes stale, dev_id) and the time
+        # each device is currently scheduled at.
+        self._stale_heap: List[Tuple[dt_util.dt.datetime, str]] = []
+        self._stale_times: Dict[str, dt_util.dt.datetime] = {}
 
         for dev in devices:
             if self.devices[dev.dev_id] is not dev:
@@ -154,7 +161,6 @@ class DeviceTracker:
 
         This method is a coroutine.
         """
-        registry = await async_get_registry(self.opp)
         if mac is None and dev_id is None:
             raise OpenPeerPowerError("Neither mac or device id passed in")
         if mac is not None:
@@ -166,6 +172,14 @@ class DeviceTracker:
             dev_id = cv.slug(str(dev_id).lower())
             device = self.devices.get(dev_id)
 
+        if not device:
+            registry = await async_get_registry(self.opp)
+            # A concurrent call may have added the device while waiting
+            if mac is not None:
+                device = self.mac_to_dev.get(mac)
+            else:
+                device = self.devices.get(dev_id)
+
         if device:
             await device.async_seen(
                 host_name,
@@ -177,6 +191,7 @@ class DeviceTracker:
                 source_type,
                 consider_home,
             )
+            self._async_schedule_stale_check(device)
             if device.track:
                 await device.async_update_op_state()
             return
@@ -214,6 +229,7 @@ class DeviceTracker:
             attributes,
             source_type,
         )
+        self._async_schedule_stale_check(device)
 
         if device.track:
             await device.async_update_op_state()
@@ -235,21 +251,66 @@ class DeviceTracker:
     async def async_update_config(self, path, dev_id, device):
         """Add device to YAML configuration file.
 
+        Devices added while a write is in progress are appended together by
+        the next write.
+
         This method is a coroutine.
         """
+        self._pending_devices.append(device)
+
         async with self._is_updating:
-            await self.opp.async_add_executor_job(
-                update_config, self.opp.config.path(YAML_DEVICES), dev_id, device
-            )
+            devices = self._pending_devices
+            if not devices:
+                # Written together with the devices of an earlier call
+                return
+
+            self._pending_devices = []
+            await self.opp.async_add_executor_job(update_devices_config, path, devices)
+
+    @callback
+    def _async_schedule_stale_check(self, device: "Device") -> None:
+        """Schedule a check for when a seen device becomes stale."""
+        if device.last_seen is None:
+            return
+
+        stale_time = device.last_seen + device.consider_home
+        scheduled = self._stale_times.get(device.dev_id)
+
+        # A later check is rescheduled when it is due
+        if scheduled is not None and scheduled <= stale_time:
+            return
+
+        self._stale_times[device.dev_id] = stale_time
+        heapq.heappush(self._stale_heap, (stale_time, device.dev_id))
 
     @callback
     def async_update_stale(self, now: dt_util.dt.datetime):
         """Update stale devices.
 
+        Only the devices that are due according to the last time they were
+        seen are checked.
+
         This method must be run in the event loop.
         """
-        for device in self.devices.values():
-            if (device.track and device.last_update_home) and device.stale(now):
+        heap = self._stale_heap
+
+        while heap and heap[0][0] < now:
+            stale_time, dev_id = heapq.heappop(heap)
+
+            # Skip checks that were replaced by an earlier one
+            if self._stale_times.get(dev_id) != stale_time:
+                continue
+
+            del self._stale_times[dev_id]
+            device = self.devices.get(dev_id)
+
+            if device is None:
+                continue
+
+            if not device.stale(now):
+                # Seen again since the check was scheduled
+                self._async_schedule_stale_check(device)
+            elif device.track and device.last_update_home:
                 self.opp.async_create_task(device.async_update_op_state(True))
 
     async def async_setup_tracked_device(self):
@@ -261,6 +322,7 @@ class DeviceTracker:
         async def async_init_single_device(dev):
             """Init a single device_tracker entity."""
             await dev.async_added_to_opp()
+            self._async_schedule_stale_check(dev)
             await dev.async_update_op_state()
 
         tasks = []
@@ -556,19 +618,31 @@ async def async_load_config(
 
 def update_config(path: str, dev_id: str, device: Device):
     """Add device to YAML configuration file."""
+    update_devices_config(path, [device])
+
+
+def update_devices_config(path: str, devices: List[Device]):
+    """Add devices to YAML configuration file with a single append."""
+    content = []
+    for device in devices:
+        content.append("\n")
+        content.append(
+            dump(
+                {
+                    device.dev_id: {
+                        ATTR_NAME: device.name,
+                        ATTR_MAC: device.mac,
+                        ATTR_ICON: device.icon,
+                        "picture": device.config_picture,
+                        "track": device.track,
+                        CONF_AWAY_HIDE: device.away_hide,
+                    }
+                }
+            )
+        )
+
     with open(path, "a") as out:
-        device = {
-            device.dev_id: {
-                ATTR_NAME: device.name,
-                ATTR_MAC: device.mac,
-                ATTR_ICON: device.icon,
-                "picture": device.config_picture,
-                "track": device.track,
-                CONF_AWAY_HIDE: device.away_hide,
-            }
-        }
-        out.write("\n")
-        out.write(dump(device))
+        out.write("".join(content))
 
 
 def get_gravatar_for_email(email: str):
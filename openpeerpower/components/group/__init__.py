@@ -1,7 +1,8 @@
 """Provide the functionality to group entities."""
 import asyncio
+from collections import Counter
 import logging
-from typing import Any, Iterable, List, Optional, cast
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, cast
 
 import voluptuous as vol
 
@@ -15,6 +16,7 @@ from openpeerpower.const import (
     CONF_NAME,
     ENTITY_MATCH_ALL,
     ENTITY_MATCH_NONE,
+    EVENT_STATE_CHANGED,
     SERVICE_RELOAD,
     STATE_CLOSED,
     STATE_HOME,
@@ -29,6 +31,7 @@ from openpeerpower.const import (
     STATE_UNLOCKED,
 )
 from openpeerpower.core import callback
+from openpeerpower.helpers import reference_index
 import openpeerpower.helpers.config_validation as cv
 from openpeerpower.helpers.config_validation import make_entity_service_schema
 from openpeerpower.helpers.entity import Entity, async_generate_entity_id
@@ -42,6 +45,9 @@ from openpeerpower.loader import bind_opp
 DOMAIN = "group"
 
 ENTITY_ID_FORMAT = DOMAIN + ".{}"
+GROUP_PREFIX = DOMAIN + "."
+
+DATA_MEMBERS = "group_members"
 
 CONF_ENTITIES = "entities"
 CONF_VIEW = "view"
@@ -134,7 +140,10 @@ def expand_entity_ids(opp: OpenPeerPowerType, entity_ids: Iterable[Any]) -> List
 
     Async friendly.
     """
-    found_ids: List[str] = []
+    index = opp.data.get(DATA_MEMBERS)
+    # Dict used as an ordered set
+    found_ids: Dict[str, None] = {}
+
     for entity_id in entity_ids:
         if not isinstance(entity_id, str) or entity_id in (
             ENTITY_MATCH_NONE,
@@ -144,30 +153,105 @@ def expand_entity_ids(opp: OpenPeerPowerType, entity_ids: Iterable[Any]) -> List
 
         entity_id = entity_id.lower()
 
-        try:
-            # If entity_id points at a group, expand it
-            domain, _ = op.split_entity_id(entity_id)
-
-            if domain == DOMAIN:
-                child_entities = get_entity_ids(opp, entity_id)
-                if entity_id in child_entities:
-                    child_entities = list(child_entities)
-                    child_entities.remove(entity_id)
-                found_ids.extend(
-                    ent_id
-                    for ent_id in expand_entity_ids(opp, child_entities)
-                    if ent_id not in found_ids
-                )
+        # If entity_id points at a group, expand it
+        domain, _ = op.split_entity_id(entity_id)
 
-            else:
-                if entity_id not in found_ids:
-                    found_ids.append(entity_id)
+        if domain != DOMAIN:
+            found_ids[entity_id] = None
+        elif index is not None:
+            found_ids.update(dict.fromkeys(index.async_members(entity_id)))
+        else:
+            found_ids.update(dict.fromkeys(_expand_group(opp, entity_id, {}, set())))
+
+    return list(found_ids)
+
+
+def _expand_group(
+    opp: OpenPeerPowerType,
+    group_id: str,
+    cache: Dict[str, Tuple[str, ...]],
+    visiting: Set[str],
+) -> Tuple[str, ...]:
+    """Return the members of a group with nested groups expanded.
+
+    Groups that are being expanded are skipped to break cycles. Only top
+    level results are added to and read from the cache. Nested results can
+    miss members of a cycle, and a cached result of a group in a cycle
+    would change the order of the members.
+    """
+    if not visiting:
+        cached = cache.get(group_id)
+        if cached is not None:
+            return cached
 
-        except AttributeError:
-            # Raised by split_entity_id if entity_id is not a string
-            pass
+    visiting.add(group_id)
+    found_ids: Dict[str, None] = {}
 
-    return found_ids
+    for entity_id in get_entity_ids(opp, group_id):
+        if not isinstance(entity_id, str) or entity_id in (
+            ENTITY_MATCH_NONE,
+            ENTITY_MATCH_ALL,
+        ):
+            continue
+
+        entity_id = entity_id.lower()
+        domain, _ = op.split_entity_id(entity_id)
+
+        if domain != DOMAIN:
+            found_ids[entity_id] = None
+        elif entity_id not in visiting:
+            found_ids.update(
+                dict.fromkeys(_expand_group(opp, entity_id, cache, visiting))
+            )
+
+    visiting.remove(group_id)
+    members = tuple(found_ids)
+
+    if not visiting:
+        cache[group_id] = members
+
+    return members
+
+
+class GroupMembershipIndex:
+    """Cache the expanded members of groups.
+
+    The cache is cleared when the members of any group change. Groups that
+    are not Group entities, e.g. states set by other integrations, are
+    covered because changes are detected from state changed events.
+    """
+
+    def __init__(self, opp: OpenPeerPowerType):
+        """Initialize the index."""
+        self.opp = opp
+        self._members: Dict[str, Tuple[str, ...]] = {}
+
+    @callback
+    def async_members(self, group_id: str) -> Tuple[str, ...]:
+        """Return the members of a group with nested groups expanded."""
+        return _expand_group(self.opp, group_id, self._members, set())
+
+    @callback
+    def async_invalidate(self) -> None:
+        """Clear the cache."""
+        self._members.clear()
+
+    @callback
+    def async_state_changed(self, event: op.Event) -> None:
+        """Clear the cache when the members of a group changed."""
+        if not event.data["entity_id"].startswith(GROUP_PREFIX):
+            return
+
+        old_state = event.data["old_state"]
+        new_state = event.data["new_state"]
+
+        if (
+            old_state is None
+            or new_state is None
+            or old_state.attributes.get(ATTR_ENTITY_ID)
+            != new_state.attributes.get(ATTR_ENTITY_ID)
+        ):
+            self.async_invalidate()
 
 
 @bind_opp
@@ -198,16 +282,7 @@ def groups_with_entity(opp: OpenPeerPowerType, entity_id: str) -> List[str]:
 
     Async friendly.
     """
-    if DOMAIN not in opp.data:
-        return []
-
-    groups = []
-
-    for group in opp.data[DOMAIN].entities:
-        if entity_id in group.tracking:
-            groups.append(group.entity_id)
-
-    return groups
+    return reference_index.async_get_index(opp, DOMAIN).async_with_entity(entity_id)
 
 
 async def async_setup(opp, config):
@@ -217,6 +292,10 @@ async def async_setup(opp, config):
     if component is None:
         component = opp.data[DOMAIN] = EntityComponent(_LOGGER, DOMAIN, opp)
 
+    if DATA_MEMBERS not in opp.data:
+        index = opp.data[DATA_MEMBERS] = GroupMembershipIndex(opp)
+        opp.bus.async_listen(EVENT_STATE_CHANGED, index.async_state_changed)
+
     await _async_process_config(opp, config, component)
 
     async def reload_service_handler(service):
@@ -446,6 +525,10 @@ class Group(Entity):
         self._order = order
         self._assumed_state = False
         self._async_unsub_state_changed = None
+        # Counted state and assumed state of each member with a state
+        self._member_states = {}
+        self._state_counts = Counter()
+        self._assumed_members = 0
 
     @staticmethod
     def create_group(
@@ -589,6 +672,12 @@ class Group(Entity):
         await self.async_stop()
         self.tracking = tuple(ent_id.lower() for ent_id in entity_ids)
         self.group_on, self.group_off = None, None
+        index = self.opp.data.get(DATA_MEMBERS)
+        if index is not None:
+            index.async_invalidate()
+        reference_index.async_get_index(self.opp, DOMAIN).async_set(
+            self, self.tracking
+        )
 
         await self.async_update_op_state(True)
         self.async_start()
@@ -620,11 +709,15 @@ class Group(Entity):
 
     async def async_added_to_opp(self):
         """Handle addition to Open Peer Power."""
+        reference_index.async_get_index(self.opp, DOMAIN).async_set(
+            self, self.tracking
+        )
         if self.tracking:
             self.async_start()
 
     async def async_will_remove_from_opp(self):
         """Handle removal from Open Peer Power."""
+        reference_index.async_get_index(self.opp, DOMAIN).async_remove(self)
         if self._async_unsub_state_changed:
             self._async_unsub_state_changed()
             self._async_unsub_state_changed = None
@@ -659,23 +752,26 @@ class Group(Entity):
         """Update group state.
 
         Optionally you can provide the only state changed since last update
-        allowing this method to take shortcuts.
+        allowing this method to only update the member counts for it instead
+        of rescanning all members.
 
         This method must be run in the event loop.
         """
-        # To store current states of group entities. Might not be needed.
-        states = None
-        gr_state = self._state
+        if tr_state is None:
+            self._async_count_all_members()
+        else:
+            self._async_count_member(tr_state.entity_id, tr_state)
+
         gr_on = self.group_on
-        gr_off = self.group_off
 
         # We have not determined type of group yet
         if gr_on is None:
             if tr_state is None:
-                states = self._tracking_states
-
-                for state in states:
-                    gr_on, gr_off = _get_group_on_off(state.state)
+                for entity_id in self.tracking:
+                    member = self._member_states.get(entity_id)
+                    if member is None:
+                        continue
+                    gr_on, gr_off = _get_group_on_off(member[0])
                     if gr_on is not None:
                         break
             else:
@@ -688,33 +784,41 @@ class Group(Entity):
         if gr_on is None:
             return
 
-        if tr_state is None or (
-            (gr_state == gr_on and tr_state.state == gr_off)
-            or (gr_state == gr_off and tr_state.state == gr_on)
-            or tr_state.state not in (gr_on, gr_off)
-        ):
-            if states is None:
-                states = self._tracking_states
+        members = len(self._member_states)
+        on_members = self._state_counts[gr_on]
 
-            if self.mode(state.state == gr_on for state in states):
-                self._state = gr_on
-            else:
-                self._state = gr_off
+        if on_members and (self.mode is any or on_members == members):
+            self._state = gr_on
+        else:
+            self._state = self.group_off
 
-        elif tr_state.state in (gr_on, gr_off):
-            self._state = tr_state.state
+        self._assumed_state = bool(self._assumed_members) and (
+            self.mode is any or self._assumed_members == members
+        )
 
-        if (
-            tr_state is None
-            or self._assumed_state
-            and not tr_state.attributes.get(ATTR_ASSUMED_STATE)
-        ):
-            if states is None:
-                states = self._tracking_states
+    @callback
+    def _async_count_all_members(self):
+        """Rebuild the member counts from the current member states."""
+        self._member_states = {}
+        self._state_counts = Counter()
+        self._assumed_members = 0
 
-            self._assumed_state = self.mode(
-                state.attributes.get(ATTR_ASSUMED_STATE) for state in states
-            )
+        for state in self._tracking_states:
+            self._async_count_member(state.entity_id, state)
+
+    @callback
+    def _async_count_member(self, entity_id, new_state):
+        """Replace the counted state of a member."""
+        old = self._member_states.pop(entity_id, None)
+
+        if old is not None:
+            self._state_counts[old[0]] -= 1
+            self._assumed_members -= old[1]
+
+        if new_state is None:
+            return
 
-        elif tr_state.attributes.get(ATTR_ASSUMED_STATE):
-            self._assumed_state = True
+        assumed = bool(new_state.attributes.get(ATTR_ASSUMED_STATE))
+        self._member_states[entity_id] = (new_state.state, assumed)
+        self._state_counts[new_state.state] += 1
+        self._assumed_members += assumed
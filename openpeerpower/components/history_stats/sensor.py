@@ -1,4 +1,5 @@
 """Component to make instant statistics about your history."""
+from collections import deque
 import datetime
 import logging
 import math
@@ -40,6 +41,9 @@ ICON = "mdi:chart-line"
 
 ATTR_VALUE = "value"
 
+# Maximum number of state changes kept while the history is not loaded
+MAX_PENDING_CHANGES = 100
+
 
 def exactly_two_period_keys(conf):
     """Ensure exactly 2 of CONF_PERIOD_KEYS are provided."""
@@ -67,7 +71,7 @@ PLATFORM_SCHEMA = vol.All(
 
 
 # noinspection PyUnusedLocal
-def setup_platform(opponfig, add_entities, discovery_info=None):
+def setup_platform(opp, config, add_entities, discovery_info=None):
     """Set up the History Stats sensor."""
     entity_id = config.get(CONF_ENTITY_ID)
     entity_state = config.get(CONF_STATE)
@@ -79,12 +83,12 @@ def setup_platform(opponfig, add_entities, discovery_info=None):
 
     for template in [start, end]:
         if template is not None:
-            template.oppoooopp
+            template.opp = opp
 
     add_entities(
         [
             HistoryStatsSensor(
-                oppntity_id, entity_state, start, end, duration, sensor_type, name
+                opp, entity_id, entity_state, start, end, duration, sensor_type, name
             )
         ]
     )
@@ -93,12 +97,20 @@ def setup_platform(opponfig, add_entities, discovery_info=None):
 
 
 class HistoryStatsSensor(Entity):
-    """Representation of a HistoryStats sensor."""
+    """Representation of a HistoryStats sensor.
+
+    The state changes of the period are loaded from the database once. After
+    that, changes are added from the state machine as they happen and changes
+    before the start of the period are dropped when the period moves forward.
+    The database is only queried again when the start of the period moves
+    back in time.
+    """
 
     def __init__(
-        self, oppntity_id, entity_state, start, end, duration, sensor_type, name
+        self, opp, entity_id, entity_state, start, end, duration, sensor_type, name
     ):
         """Initialize the HistoryStats sensor."""
+        self.opp = opp
         self._entity_id = entity_id
         self._entity_state = entity_state
         self._duration = duration
@@ -112,20 +124,65 @@ class HistoryStatsSensor(Entity):
         self.value = None
         self.count = None
 
+        # Timestamp of the start of the loaded changes, None if not loaded
+        self._loaded_start = None
+        # If the state matched at the start of the loaded changes
+        self._initial_match = False
+        # Timestamps at which the state started or stopped matching
+        self._changes = deque()
+        # Changes seen while the history is loading, the oldest are dropped
+        # first as they are the most likely to be stored already
+        self._pending_changes = deque(maxlen=MAX_PENDING_CHANGES)
+        # If a state change was recorded since the last update
+        self._recorded = False
+
+    async def async_added_to_opp(self):
+        """Track the state changes of the entity."""
+
         @callback
         def start_refresh(*args):
-            """Register state tracking."""
+            """Force the component to refresh."""
+            self.async_schedule_update_op_state(True)
 
-            @callback
-            def force_refresh(*args):
-                """Force the component to refresh."""
-                self.async_schedule_update_op_state(True)
-
-            force_refresh()
-            async_track_state_change(self.oppelf._entity_id, force_refresh)
+        self.async_on_remove(
+            async_track_state_change(
+                self.opp, self._entity_id, self._async_state_changed
+            )
+        )
 
         # Delay first refresh to keep startup fast
-        opps.listen_once(EVENT_OPENPEERPOWER_START, start_refresh)
+        self.async_on_remove(
+            self.opp.bus.async_listen_once(EVENT_OPENPEERPOWER_START, start_refresh)
+        )
+
+    @callback
+    def _async_state_changed(self, entity_id, old_state, new_state):
+        """Record a state change and refresh."""
+        if new_state is not None:
+            self._record_state(new_state)
+
+        self.async_schedule_update_op_state(True)
+
+    def _record_state(self, new_state):
+        """Record a new state of the entity."""
+        change = (
+            new_state.last_changed.timestamp(),
+            new_state.state == self._entity_state,
+        )
+
+        self._recorded = True
+
+        if self._loaded_start is None:
+            self._pending_changes.append(change)
+        else:
+            self._add_change(*change)
+
+    def _add_change(self, timestamp, match):
+        """Add a change if it changes whether the state matches."""
+        last_match = self._changes[-1][1] if self._changes else self._initial_match
+
+        if match != last_match:
+            self._changes.append((timestamp, match))
 
     @property
     def name(self):
@@ -171,7 +228,7 @@ class HistoryStatsSensor(Entity):
         """Return the icon to use in the frontend, if any."""
         return ICON
 
-    def update(self):
+    async def async_update(self):
         """Get the latest data and updates the states."""
         # Get previous values of start and end
         p_start, p_end = self._period
@@ -199,29 +256,34 @@ class HistoryStatsSensor(Entity):
             start_timestamp == p_start_timestamp
             and end_timestamp == p_end_timestamp
             and end_timestamp <= now_timestamp
+            and self._loaded_start is not None
+            and not self._recorded
         ):
             # Don't compute anything as the value cannot have changed
             return
 
-        # Get history between start and end
-        history_list = history.state_changes_during_period(
-            self.opptart, end, str(self._entity_id)
-        )
+        self._recorded = False
 
-        if self._entity_id not in history_list.keys():
-            return
+        if self._loaded_start is None or start_timestamp < self._loaded_start:
+            if not await self._async_load_history(start, start_timestamp):
+                return
+
+        changes = self._changes
 
-        # Get the first state
-        last_state = history.get_state(self.opptart, self._entity_id)
-        last_state = last_state is not None and last_state == self._entity_state
+        # Drop the changes from before the start of the period
+        while changes and changes[0][0] <= start_timestamp:
+            self._initial_match = changes.popleft()[1]
+        self._loaded_start = start_timestamp
+
+        last_state = self._initial_match
         last_time = start_timestamp
         elapsed = 0
         count = 0
 
         # Make calculations
-        for item in history_list.get(self._entity_id):
-            current_state = item.state == self._entity_state
-            current_time = item.last_changed.timestamp()
+        for current_time, current_state in changes:
+            if current_time >= end_timestamp:
+                break
 
             if last_state:
                 elapsed += current_time - last_time
@@ -242,6 +304,66 @@ class HistoryStatsSensor(Entity):
         # Save counter
         self.count = count
 
+    async def _async_load_history(self, start, start_timestamp):
+        """Load the state changes from the start of the period until now.
+
+        If the entity has no history, e.g. because it is excluded from the
+        recorder, the changes are kept from the current state on. The load is
+        done either way, so the database is not queried on every update.
+
+        Return False if nothing is known about the entity.
+        """
+        history_list, initial_state = await self.opp.async_add_executor_job(
+            self._load_history, start
+        )
+
+        # Changes seen so far, the latest ones might not be stored yet
+        seen_changes = list(self._changes) + list(self._pending_changes)
+        items = history_list.get(self._entity_id)
+
+        if items is None:
+            items = []
+            current_state = self.opp.states.get(self._entity_id)
+
+            if current_state is not None:
+                timestamp = current_state.last_changed.timestamp()
+
+                if timestamp <= start_timestamp:
+                    initial_state = current_state
+                else:
+                    seen_changes.append(
+                        (timestamp, current_state.state == self._entity_state)
+                    )
+
+        self._initial_match = (
+            initial_state is not None and initial_state.state == self._entity_state
+        )
+        self._changes = deque()
+        last_timestamp = start_timestamp
+
+        for item in items:
+            last_timestamp = item.last_changed.timestamp()
+            self._add_change(last_timestamp, item.state == self._entity_state)
+
+        for timestamp, match in seen_changes:
+            if timestamp > last_timestamp:
+                self._add_change(timestamp, match)
+
+        self._pending_changes.clear()
+        self._loaded_start = start_timestamp
+        return bool(items or seen_changes) or initial_state is not None
+
+    def _load_history(self, start):
+        """Load the state changes since start and the state at start."""
+        history_list = history.state_changes_during_period(
+            self.opp, start, None, str(self._entity_id)
+        )
+
+        if self._entity_id not in history_list.keys():
+            return history_list, None
+
+        return history_list, history.get_state(self.opp, start, self._entity_id)
+
     def update_period(self):
         """Parse the templates and store a datetime tuple in _period."""
         start = None
@@ -250,7 +372,7 @@ class HistoryStatsSensor(Entity):
         # Parse start
         if self._start is not None:
             try:
-                start_rendered = self._start.render()
+                start_rendered = self._start.async_render()
             except (TemplateError, TypeError) as ex:
                 HistoryStatsHelper.handle_template_exception(ex, "start")
                 return
@@ -269,7 +391,7 @@ class HistoryStatsSensor(Entity):
         # Parse end
         if self._end is not None:
             try:
-                end_rendered = self._end.render()
+                end_rendered = self._end.async_render()
             except (TemplateError, TypeError) as ex:
                 HistoryStatsHelper.handle_template_exception(ex, "end")
                 return
@@ -2,24 +2,30 @@
 from datetime import timedelta
 from functools import partial, wraps
 from inspect import getmodule
+import json
 import logging
+import threading
 
 from pyhap.accessory import Accessory, Bridge
-from pyhap.accessory_driver import AccessoryDriver
-from pyhap.const import CATEGORY_OTHER
+from pyhap.accessory_driver import AccessoryDriver, get_topic
+from pyhap.const import (
+    CATEGORY_OTHER,
+    HAP_REPR_AID,
+    HAP_REPR_CHARS,
+    HAP_REPR_IID,
+    HAP_REPR_VALUE,
+)
 
 from openpeerpower.const import (
     ATTR_BATTERY_CHARGING,
     ATTR_BATTERY_LEVEL,
     ATTR_ENTITY_ID,
     ATTR_SERVICE,
+    EVENT_STATE_CHANGED,
     __version__,
 )
 from openpeerpower.core import callback as op_callback, split_entity_id
-from openpeerpower.helpers.event import (
-    async_track_state_change,
-    track_point_in_utc_time,
-)
+from openpeerpower.helpers.event import track_point_in_utc_time
 from openpeerpower.util import dt as dt_util
 
 from .const import (
@@ -51,7 +57,7 @@ def debounce(func):
         """Handle call_later callback."""
         debounce_params = self.debounce.pop(func.__name__, None)
         if debounce_params:
-            self.opp.async_add_executor_job(func, self, *debounce_params[1:])
+            func(self, *debounce_params[1:])
 
     @wraps(func)
     def wrapper(self, *args):
@@ -94,6 +100,7 @@ class HomeAccessory(Accessory):
         self.entity_id = entity_id
         self.opp = opp
         self.debounce = {}
+        self._unsub_listeners = []
         self._support_battery_level = False
         self._support_battery_charging = True
         self.linked_battery_sensor = self.config.get(CONF_LINKED_BATTERY_SENSOR)
@@ -141,19 +148,38 @@ class HomeAccessory(Accessory):
 
         Run inside the Open Peer Power event loop.
         """
+        self.async_remove_listeners()
+
         state = self.opp.states.get(self.entity_id)
-        self.opp.async_add_job(self.update_state_callback, None, None, state)
-        async_track_state_change(self.opp, self.entity_id, self.update_state_callback)
+        self.update_state_callback(None, None, state)
+        self._unsub_listeners.append(
+            self.driver.async_track_entity_state(
+                self.entity_id, self.update_state_callback
+            )
+        )
 
         if self.linked_battery_sensor:
             battery_state = self.opp.states.get(self.linked_battery_sensor)
-            self.opp.async_add_job(
-                self.update_linked_battery, None, None, battery_state
-            )
-            async_track_state_change(
-                self.opp, self.linked_battery_sensor, self.update_linked_battery
+            self.update_linked_battery(None, None, battery_state)
+            self._unsub_listeners.append(
+                self.driver.async_track_entity_state(
+                    self.linked_battery_sensor, self.update_linked_battery
+                )
             )
 
+    async def stop(self):
+        """Handle accessory driver stop event.
+
+        Run inside the HAP-python event loop.
+        """
+        self.opp.add_job(self.async_remove_listeners)
+
+    @op_callback
+    def async_remove_listeners(self):
+        """Remove the state change listeners of the accessory."""
+        while self._unsub_listeners:
+            self._unsub_listeners.pop()()
+
     @op_callback
     def update_state_callback(self, entity_id=None, old_state=None, new_state=None):
         """Handle state change listener callback."""
@@ -161,13 +187,15 @@ class HomeAccessory(Accessory):
         if new_state is None:
             return
         if self._support_battery_level and not self.linked_battery_sensor:
-            self.opp.async_add_executor_job(self.update_battery, new_state)
-        self.opp.async_add_executor_job(self.update_state, new_state)
+            self.update_battery(new_state)
+        self.update_state(new_state)
 
     @op_callback
     def update_linked_battery(self, entity_id=None, old_state=None, new_state=None):
         """Handle linked battery sensor state change listener callback."""
-        self.opp.async_add_executor_job(self.update_battery, new_state)
+        if new_state is None:
+            return
+        self.update_battery(new_state)
 
     def update_battery(self, new_state):
         """Update battery service if available.
@@ -239,12 +267,150 @@ class HomeBridge(Bridge):
 
 
 class HomeDriver(AccessoryDriver):
-    """Adapter class for AccessoryDriver."""
+    """Adapter class for AccessoryDriver.
+
+    State changes are dispatched to the accessories of the bridge once per
+    event loop tick. Characteristic values changed inside the event loop are
+    diffed against the last value sent and sent in a single event per client.
+    """
 
     def __init__(self, opp, **kwargs):
         """Initialize a AccessoryDriver object."""
         super().__init__(**kwargs)
         self.opp = opp
+        self._entity_listeners = {}
+        self._pending_states = {}
+        self._pending_values = {}
+        self._sent_values = {}
+        self._unsub_state_changed = None
+
+    @op_callback
+    def async_track_entity_state(self, entity_id, action):
+        """Call action with entity_id, old_state and new_state on state changes.
+
+        Returns a function to remove the listener.
+        """
+        if self._unsub_state_changed is None:
+            self._unsub_state_changed = self.opp.bus.async_listen(
+                EVENT_STATE_CHANGED, self._async_state_changed
+            )
+        self._entity_listeners.setdefault(entity_id, []).append(action)
+
+        @op_callback
+        def async_remove_listener():
+            """Remove the state change listener."""
+            listeners = self._entity_listeners.get(entity_id)
+            if listeners is None or action not in listeners:
+                return
+            listeners.remove(action)
+            if listeners:
+                return
+            del self._entity_listeners[entity_id]
+            self._pending_states.pop(entity_id, None)
+            if not self._entity_listeners:
+                self._unsub_state_changed()
+                self._unsub_state_changed = None
+
+        return async_remove_listener
+
+    @op_callback
+    def _async_state_changed(self, event):
+        """Queue a state change for the accessories tracking the entity."""
+        entity_id = event.data.get(ATTR_ENTITY_ID)
+        if entity_id not in self._entity_listeners:
+            return
+
+        if not self._pending_states:
+            self.opp.loop.call_soon(self._async_dispatch_states)
+
+        # Keep the first old state and the last new state within a tick
+        old_state = self._pending_states.get(entity_id, (event.data.get("old_state"),))
+        self._pending_states[entity_id] = (old_state[0], event.data.get("new_state"))
+
+    @op_callback
+    def _async_dispatch_states(self):
+        """Update the accessories for the state changes of the last tick."""
+        pending, self._pending_states = self._pending_states, {}
+        for entity_id, (old_state, new_state) in pending.items():
+            for action in tuple(self._entity_listeners.get(entity_id, ())):
+                try:
+                    action(entity_id, old_state, new_state)
+                except Exception:  # pylint: disable=broad-except
+                    _LOGGER.exception("Error updating HomeKit for %s", entity_id)
+
+    def publish(self, data, sender_client_addr=None):
+        """Queue a characteristic value event for the clients.
+
+        Values changed from outside the event loop, e.g. by a HomeKit client,
+        are published right away.
+        """
+        key = (data[HAP_REPR_AID], data[HAP_REPR_IID])
+        if (
+            sender_client_addr is not None
+            or self.opp.loop.__dict__.get("_thread_ident") != threading.get_ident()
+        ):
+            self._sent_values[key] = data[HAP_REPR_VALUE]
+            super().publish(data, sender_client_addr)
+            return
+
+        if not self._pending_values:
+            self.opp.loop.call_soon(self._async_send_values)
+        self._pending_values[key] = data
+
+    @op_callback
+    def _async_send_values(self):
+        """Send the characteristic values that changed in the last tick."""
+        pending, self._pending_values = self._pending_values, {}
+        changed = []
+        for key, data in pending.items():
+            value = data[HAP_REPR_VALUE]
+            if key in self._sent_values and self._sent_values[key] == value:
+                continue
+            self._sent_values[key] = value
+            changed.append(data)
+
+        if changed:
+            # Sent from the event thread of the driver, which owns the sockets
+            self.event_queue.put((None, changed, None))
+
+    def send_events(self):
+        """Send the queued events to the clients until the loop is closed."""
+        while not self.loop.is_closed():
+            self._send_event(*self.event_queue.get())
+            self.event_queue.task_done()
+
+    def _send_event(self, topic, data, sender_client_addr):
+        """Send a queued event to the subscribed clients.
+
+        Characteristic values batched in the event loop are queued without a
+        topic and are combined into a single event per client. Clients that
+        can't be reached are unsubscribed from the topic.
+        """
+        if topic is None:
+            client_events = {}
+            for char in data:
+                char_topic = get_topic(char[HAP_REPR_AID], char[HAP_REPR_IID])
+                for client_addr in self.topics.get(char_topic, set()).copy():
+                    topics, chars = client_events.setdefault(client_addr, ([], []))
+                    topics.append(char_topic)
+                    chars.append(char)
+            events = [
+                (client_addr, topics, json.dumps({HAP_REPR_CHARS: chars}).encode())
+                for client_addr, (topics, chars) in client_events.items()
+            ]
+        else:
+            events = [
+                (client_addr, [topic], data)
+                for client_addr in self.topics.get(topic, set()).copy()
+                if client_addr != sender_client_addr
+            ]
+
+        for client_addr, topics, bytedata in events:
+            if self.http_server.push_event(bytedata, client_addr):
+                continue
+            _LOGGER.debug("Could not send event to %s, unsubscribing", client_addr)
+            for client_topic in topics:
+                self.subscribe_client_topic(client_addr, client_topic, False)
 
     def pair(self, client_uuid, client_public):
         """Override super function to dismiss setup message if paired."""
@@ -1,9 +1,17 @@
 """Ban logic for HTTP component."""
-from collections import defaultdict
+import asyncio
+from collections import OrderedDict
 from datetime import datetime
-from ipaddress import ip_address
+from ipaddress import (
+    IPv4Address,
+    IPv4Network,
+    IPv6Address,
+    IPv6Network,
+    ip_address,
+    ip_network,
+)
 import logging
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple, Union
 
 from aiohttp.web import middleware
 from aiohttp.web_exceptions import HTTPForbidden, HTTPUnauthorized
@@ -13,6 +21,7 @@ from openpeerpower.config import load_yaml_config_file
 from openpeerpower.core import OpenPeerPower, callback
 from openpeerpower.exceptions import OpenPeerPowerError
 import openpeerpower.helpers.config_validation as cv
+from openpeerpower.util import dt as dt_util
 from openpeerpower.util.yaml import dump
 
 from .const import KEY_REAL_IP
@@ -24,15 +33,23 @@ _LOGGER = logging.getLogger(__name__)
 KEY_BANNED_IPS = "op_banned_ips"
 KEY_FAILED_LOGIN_ATTEMPTS = "op_failed_login_attempts"
 KEY_LOGIN_THRESHOLD = "op_login_threshold"
+KEY_PENDING_BANS = "op_pending_ip_bans"
+KEY_BANS_WRITE = "op_ip_bans_write"
+
+MAX_FAILED_LOGIN_ADDRESSES = 10000
 
 NOTIFICATION_ID_BAN = "ip-ban"
 NOTIFICATION_ID_LOGIN = "http-login"
 
 IP_BANS_FILE = "ip_bans.yaml"
 ATTR_BANNED_AT = "banned_at"
+ATTR_EXPIRES_AT = "expires_at"
 
 SCHEMA_IP_BAN_ENTRY = vol.Schema(
-    {vol.Optional("banned_at"): vol.Any(None, cv.datetime)}
+    {
+        vol.Optional(ATTR_BANNED_AT): vol.Any(None, cv.datetime),
+        vol.Optional(ATTR_EXPIRES_AT): vol.Any(None, cv.datetime),
+    }
 )
 
 
@@ -40,13 +57,15 @@ SCHEMA_IP_BAN_ENTRY = vol.Schema(
 def setup_bans(opp, app, login_threshold):
     """Create IP Ban middleware for the app."""
     app.middlewares.append(ban_middleware)
-    app[KEY_FAILED_LOGIN_ATTEMPTS] = defaultdict(int)
+    app[KEY_FAILED_LOGIN_ATTEMPTS] = FailedLoginAttempts()
     app[KEY_LOGIN_THRESHOLD] = login_threshold
+    app[KEY_PENDING_BANS] = []
+    app[KEY_BANS_WRITE] = None
 
     async def ban_startup(app):
         """Initialize bans when app starts up."""
-        app[KEY_BANNED_IPS] = await async_load_ip_bans_config(
-            opp, opp.config.path(IP_BANS_FILE)
+        app[KEY_BANNED_IPS] = IpBanIndex(
+            await async_load_ip_bans_config(opp, opp.config.path(IP_BANS_FILE))
         )
 
     app.on_startup.append(ban_startup)
@@ -60,12 +79,7 @@ async def ban_middleware(request, handler):
         return await handler(request)
 
     # Verify if IP is not banned
-    ip_address_ = request[KEY_REAL_IP]
-    is_banned = any(
-        ip_ban.ip_address == ip_address_ for ip_ban in request.app[KEY_BANNED_IPS]
-    )
-
-    if is_banned:
+    if request[KEY_REAL_IP] in request.app[KEY_BANNED_IPS]:
         raise HTTPForbidden()
 
     try:
@@ -117,11 +131,10 @@ async def process_wrong_login(request):
         >= request.app[KEY_LOGIN_THRESHOLD]
     ):
         new_ban = IpBan(remote_addr)
-        request.app[KEY_BANNED_IPS].append(new_ban)
+        request.app[KEY_BANNED_IPS].add(new_ban)
+        request.app[KEY_FAILED_LOGIN_ATTEMPTS].pop(remote_addr, None)
 
-        await opp.async_add_job(
-            update_ip_bans_config, opp.config.path(IP_BANS_FILE), new_ban
-        )
+        await async_save_ip_ban(opp, request.app, new_ban)
 
         _LOGGER.warning("Banned IP %s for too many login attempts", remote_addr)
 
@@ -155,13 +168,123 @@ async def process_success_login(request):
         request.app[KEY_FAILED_LOGIN_ATTEMPTS].pop(remote_addr)
 
 
-class IpBan:
-    """Represents banned IP address."""
+class FailedLoginAttempts(OrderedDict):
+    """Failed login attempts by IP address.
+
+    Only the most recently failing addresses are kept.
+    """
 
-    def __init__(self, ip_ban: str, banned_at: Optional[datetime] = None) -> None:
+    def __init__(self, max_size: int = MAX_FAILED_LOGIN_ADDRESSES) -> None:
+        """Initialize the failed login attempts."""
+        super().__init__()
+        self._max_size = max_size
+
+    def __missing__(self, key):
+        """Return no attempts for unknown addresses."""
+        return 0
+
+    def __setitem__(self, key, value):
+        """Set the attempts of an address and evict the oldest address."""
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        if len(self) > self._max_size:
+            self.popitem(last=False)
+
+
+class IpBan:
+    """Represents banned IP address or network."""
+
+    def __init__(
+        self,
+        ip_ban: str,
+        banned_at: Optional[datetime] = None,
+        expires_at: Optional[datetime] = None,
+    ) -> None:
         """Initialize IP Ban object."""
-        self.ip_address = ip_address(ip_ban)
+        ip_ban = str(ip_ban)
+        if "/" in ip_ban:
+            self.ip_address = None
+            self.ip_network = ip_network(ip_ban)
+        else:
+            self.ip_address = ip_address(ip_ban)
+            self.ip_network = ip_network(self.ip_address)
         self.banned_at = banned_at or datetime.utcnow()
+        if expires_at is not None and expires_at.tzinfo is not None:
+            expires_at = dt_util.as_utc(expires_at).replace(tzinfo=None)
+        self.expires_at = expires_at
+
+    def __str__(self) -> str:
+        """Return the banned address or network."""
+        if self.ip_address is not None:
+            return str(self.ip_address)
+        return str(self.ip_network)
+
+
+class IpBanIndex:
+    """Index of banned IP addresses and networks.
+
+    Single addresses are looked up directly. Networks are looked up once for
+    every prefix length that has banned networks.
+    """
+
+    def __init__(self, ip_bans: Optional[List[IpBan]] = None) -> None:
+        """Initialize the index."""
+        self._addresses: Dict[Union[IPv4Address, IPv6Address], IpBan] = {}
+        self._networks: Dict[
+            Tuple[int, int], Dict[Union[IPv4Network, IPv6Network], IpBan]
+        ] = {}
+        for ip_ban in ip_bans or ():
+            self.add(ip_ban)
+
+    def __len__(self) -> int:
+        """Return the number of bans."""
+        return len(self._addresses) + sum(
+            len(networks) for networks in self._networks.values()
+        )
+
+    def __contains__(self, address) -> bool:
+        """Return if an address is banned."""
+        ip_ban = self._addresses.get(address)
+
+        if ip_ban is None:
+            for (version, prefixlen), networks in self._networks.items():
+                if version != address.version:
+                    continue
+                ip_ban = networks.get(
+                    ip_network((address, prefixlen), strict=False)
+                )
+                if ip_ban is not None:
+                    break
+            else:
+                return False
+
+        if ip_ban.expires_at is not None and ip_ban.expires_at <= datetime.utcnow():
+            self.remove(ip_ban)
+            return self.__contains__(address)
+
+        return True
+
+    def add(self, ip_ban: IpBan) -> None:
+        """Add a ban."""
+        if ip_ban.ip_address is not None:
+            self._addresses[ip_ban.ip_address] = ip_ban
+            return
+        network = ip_ban.ip_network
+        self._networks.setdefault((network.version, network.prefixlen), {})[
+            network
+        ] = ip_ban
+
+    def remove(self, ip_ban: IpBan) -> None:
+        """Remove a ban."""
+        if ip_ban.ip_address is not None:
+            self._addresses.pop(ip_ban.ip_address, None)
+            return
+        network = ip_ban.ip_network
+        key = (network.version, network.prefixlen)
+        networks = self._networks.get(key, {})
+        networks.pop(network, None)
+        if not networks:
+            self._networks.pop(key, None)
 
 
 async def async_load_ip_bans_config(opp: OpenPeerPower, path: str) -> List[IpBan]:
@@ -179,21 +302,51 @@ async def async_load_ip_bans_config(opp: OpenPeerPower, path: str) -> List[IpBan
     for ip_ban, ip_info in list_.items():
         try:
             ip_info = SCHEMA_IP_BAN_ENTRY(ip_info)
-            ip_list.append(IpBan(ip_ban, ip_info["banned_at"]))
-        except vol.Invalid as err:
+            ip_list.append(
+                IpBan(ip_ban, ip_info.get(ATTR_BANNED_AT), ip_info.get(ATTR_EXPIRES_AT))
+            )
+        except (vol.Invalid, ValueError) as err:
             _LOGGER.error("Failed to load IP ban %s: %s", ip_info, err)
             continue
 
     return ip_list
 
 
-def update_ip_bans_config(path: str, ip_ban: IpBan) -> None:
-    """Update config file with new banned IP address."""
+async def async_save_ip_ban(opp: OpenPeerPower, app, ip_ban: IpBan) -> None:
+    """Add a ban to the config file.
+
+    Bans made while the file is being written are appended together.
+    """
+    app[KEY_PENDING_BANS].append(ip_ban)
+
+    if app[KEY_BANS_WRITE] is None:
+        app[KEY_BANS_WRITE] = opp.async_create_task(_async_write_pending_bans(opp, app))
+
+    await asyncio.shield(app[KEY_BANS_WRITE])
+
+
+async def _async_write_pending_bans(opp: OpenPeerPower, app) -> None:
+    """Write the pending bans to the config file."""
+    try:
+        while app[KEY_PENDING_BANS]:
+            ip_bans = app[KEY_PENDING_BANS]
+            app[KEY_PENDING_BANS] = []
+            await opp.async_add_executor_job(
+                update_ip_bans_config, opp.config.path(IP_BANS_FILE), ip_bans
+            )
+    finally:
+        app[KEY_BANS_WRITE] = None
+
+
+def update_ip_bans_config(path: str, ip_bans: List[IpBan]) -> None:
+    """Update config file with new banned IP addresses."""
+    ip_ = {}
+    for ip_ban in ip_bans:
+        ip_info = {ATTR_BANNED_AT: ip_ban.banned_at.strftime("%Y-%m-%dT%H:%M:%S")}
+        if ip_ban.expires_at is not None:
+            ip_info[ATTR_EXPIRES_AT] = ip_ban.expires_at.strftime("%Y-%m-%dT%H:%M:%S")
+        ip_[str(ip_ban)] = ip_info
+
     with open(path, "a") as out:
-        ip_ = {
-            str(ip_ban.ip_address): {
-                ATTR_BANNED_AT: ip_ban.banned_at.strftime("%Y-%m-%dT%H:%M:%S")
-            }
-        }
         out.write("\n")
         out.write(dump(ip_))
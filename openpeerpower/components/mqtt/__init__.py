@@ -1,5 +1,6 @@
 """Support for MQTT message handling."""
 import asyncio
+from collections import Counter, deque
 from functools import partial, wraps
 import inspect
 from itertools import groupby
@@ -11,7 +12,7 @@ import socket
 import ssl
 import sys
 import time
-from typing import Any, Callable, List, Optional, Union
+from typing import Any, Callable, Dict, List, Optional, Set, Union
 
 import attr
 import requests.certs
@@ -120,6 +121,8 @@ ATTR_QOS = CONF_QOS
 ATTR_RETAIN = CONF_RETAIN
 
 MAX_RECONNECT_WAIT = 300  # seconds
+MAX_PUBLISH_BATCH = 500
+MAX_INBOX_SLICE = 100
 
 CONNECTION_SUCCESS = "connection_success"
 CONNECTION_FAILED = "connection_failed"
@@ -364,6 +367,23 @@ def async_publish(
     opp.async_create_task(opp.services.async_call(DOMAIN, SERVICE_PUBLISH, data))
 
 
+@callback
+@bind_opp
+def async_publish_nowait(
+    opp: OpenPeerPowerType,
+    topic: str,
+    payload: PublishPayloadType,
+    qos: int = DEFAULT_QOS,
+    retain: bool = DEFAULT_RETAIN,
+) -> None:
+    """Queue a message for an MQTT topic without calling the publish service."""
+    mqtt_client = opp.data.get(DATA_MQTT)
+    if mqtt_client is None:
+        _LOGGER.debug("MQTT is not connected, dropping message on %s", topic)
+        return
+    mqtt_client.async_publish_nowait(topic, payload, qos, retain)
+
+
 @bind_opp
 def publish_template(
     opp: OpenPeerPowerType, topic, payload_template, qos=None, retain=None
@@ -734,6 +754,21 @@ class Subscription:
     encoding = attr.ib(type=str, default="utf-8")
 
 
+@callback
+def _async_resolve_publish(
+    future: Optional[asyncio.Future], error: Optional[BaseException]
+) -> None:
+    """Resolve the future of a published message."""
+    if future is None or future.done():
+        return
+    if error is None:
+        future.set_result(None)
+    elif isinstance(error, asyncio.CancelledError):
+        future.cancel()
+    else:
+        future.set_exception(error)
+
+
 class MQTT:
     """Open Peer Power MQTT client."""
 
@@ -770,6 +805,18 @@ class MQTT:
         self.connected = False
         self._mqttc: mqtt.Client = None
         self._paho_lock = asyncio.Lock()
+        self._publish_queue: deque = deque()
+        self._publish_drain: Optional[asyncio.Future] = None
+        self._published = 0
+        self._publish_latency_total = 0.0
+        self._publish_latency_max = 0.0
+        self._publish_queue_max = 0
+        self._inbox: deque = deque()
+        self._inbox_scheduled = False
+        self._subscription_refs: Counter = Counter()
+        self._pending_subscribe: Dict[str, int] = {}
+        self._pending_unsubscribe: Set[str] = set()
+        self._subscription_flush: Optional[asyncio.Future] = None
 
         if protocol == PROTOCOL_31:
             proto: int = mqtt.MQTTv31
@@ -804,15 +851,121 @@ class MQTT:
                 *attr.astuple(will_message)
             )
 
+    @property
+    def publish_metrics(self) -> dict:
+        """Return publish latency and queue depth metrics."""
+        published = self._published
+        return {
+            "queued": len(self._publish_queue),
+            "queued_max": self._publish_queue_max,
+            "published": published,
+            "latency_avg": self._publish_latency_total / published
+            if published
+            else 0.0,
+            "latency_max": self._publish_latency_max,
+        }
+
     async def async_publish(
         self, topic: str, payload: PublishPayloadType, qos: int, retain: bool
     ) -> None:
-        """Publish a MQTT message."""
-        async with self._paho_lock:
+        """Publish a MQTT message.
+
+        Returns once the message has been handed to the MQTT client.
+        """
+        future = self.opp.loop.create_future()
+        self._async_queue_publish(topic, payload, qos, retain, future)
+        await future
+
+    @callback
+    def async_publish_nowait(
+        self, topic: str, payload: PublishPayloadType, qos: int, retain: bool
+    ) -> None:
+        """Queue a MQTT message without waiting for it to be handed over."""
+        self._async_queue_publish(topic, payload, qos, retain, None)
+
+    @callback
+    def _async_queue_publish(
+        self,
+        topic: str,
+        payload: PublishPayloadType,
+        qos: int,
+        retain: bool,
+        future: Optional[asyncio.Future],
+    ) -> None:
+        """Add a message to the outbound queue."""
+        self._publish_queue.append(
+            (topic, payload, qos, retain, time.monotonic(), future)
+        )
+        self._publish_queue_max = max(
+            self._publish_queue_max, len(self._publish_queue)
+        )
+        self._async_schedule_publish_drain()
+
+    @callback
+    def _async_schedule_publish_drain(self) -> None:
+        """Start draining the outbound queue unless a drain is running."""
+        if self._publish_drain is not None or not self._publish_queue:
+            return
+        batch: list = []
+        self._publish_drain = self.opp.async_add_executor_job(
+            self._drain_publish_queue, batch
+        )
+        self._publish_drain.add_done_callback(
+            partial(self._async_publish_drained, batch)
+        )
+
+    def _drain_publish_queue(self, batch: list) -> None:
+        """Hand a batch of queued messages to the MQTT client.
+
+        Runs in the executor. The futures of the messages are added to batch
+        together with the exception raised for their message, if any.
+        """
+        for _ in range(MAX_PUBLISH_BATCH):
+            try:
+                topic, payload, qos, retain, queued, future = (
+                    self._publish_queue.popleft()
+                )
+            except IndexError:
+                break
+
+            result = [future, None]
+            if future is not None:
+                batch.append(result)
+
             _LOGGER.debug("Transmitting message on %s: %s", topic, payload)
-            await self.opp.async_add_executor_job(
-                self._mqttc.publish, topic, payload, qos, retain
-            )
+            try:
+                self._mqttc.publish(topic, payload, qos, retain)
+            except Exception as err:  # pylint: disable=broad-except
+                result[1] = err
+                if future is None:
+                    _LOGGER.error("Error publishing message on %s: %s", topic, err)
+
+            latency = time.monotonic() - queued
+            self._published += 1
+            self._publish_latency_total += latency
+            self._publish_latency_max = max(self._publish_latency_max, latency)
+
+    @callback
+    def _async_publish_drained(self, batch: list, drain: asyncio.Future) -> None:
+        """Resolve the futures of a drained batch and continue draining."""
+        self._publish_drain = None
+
+        if drain.cancelled():
+            drain_error: Optional[BaseException] = asyncio.CancelledError()
+        else:
+            drain_error = drain.exception()
+
+        for future, error in batch:
+            _async_resolve_publish(future, error or drain_error)
+
+        if drain_error is None:
+            self._async_schedule_publish_drain()
+            return
+
+        # Don't keep publishers waiting on a queue that can't be drained
+        _LOGGER.error("Error publishing queued messages: %r", drain_error)
+        while self._publish_queue:
+            _async_resolve_publish(self._publish_queue.popleft()[-1], drain_error)
 
     async def async_connect(self) -> str:
         """Connect to the host. Does process messages yet."""
@@ -861,8 +1014,11 @@ class MQTT:
 
         subscription = Subscription(topic, msg_callback, qos, encoding)
         self.subscriptions.append(subscription)
+        self._subscription_refs[(topic, qos)] += 1
 
-        await self._async_perform_subscription(topic, qos)
+        self._pending_unsubscribe.discard(topic)
+        self._pending_subscribe[topic] = self._async_topic_qos(topic)
+        await self._async_flush_subscriptions()
 
         @callback
         def async_remove() -> None:
@@ -870,39 +1026,77 @@ class MQTT:
             if subscription not in self.subscriptions:
                 raise OpenPeerPowerError("Can't remove subscription twice")
             self.subscriptions.remove(subscription)
+            self._subscription_refs[(topic, qos)] -= 1
+            if not self._subscription_refs[(topic, qos)]:
+                del self._subscription_refs[(topic, qos)]
 
-            if any(other.topic == topic for other in self.subscriptions):
+            if self._async_topic_qos(topic) is not None:
                 # Other subscriptions on topic remaining - don't unsubscribe.
                 return
 
+            self._pending_subscribe.pop(topic, None)
             # Only unsubscribe if currently connected.
             if self.connected:
-                self.opp.async_create_task(self._async_unsubscribe(topic))
+                self._pending_unsubscribe.add(topic)
+                self.opp.async_create_task(self._async_flush_subscriptions())
 
         return async_remove
 
-    async def _async_unsubscribe(self, topic: str) -> None:
-        """Unsubscribe from a topic.
+    @callback
+    def _async_topic_qos(self, topic: str) -> Optional[int]:
+        """Return the highest qos subscribed to a topic."""
+        for qos in (2, 1, 0):
+            if self._subscription_refs[(topic, qos)]:
+                return qos
+        return None
 
-        This method is a coroutine.
+    async def _async_flush_subscriptions(self) -> None:
+        """Wait until the pending subscription changes have been sent.
+
+        Changes queued in the same event loop iteration are sent together in
+        a single SUBSCRIBE and a single UNSUBSCRIBE packet.
         """
-        async with self._paho_lock:
-            result: int = None
-            result, _ = await self.opp.async_add_executor_job(
-                self._mqttc.unsubscribe, topic
+        if self._subscription_flush is None:
+            self._subscription_flush = self.opp.async_create_task(
+                self._async_perform_subscriptions()
             )
-            _raise_on_error(result)
-
-    async def _async_perform_subscription(self, topic: str, qos: int) -> None:
-        """Perform a paho-mqtt subscription."""
-        _LOGGER.debug("Subscribing to %s", topic)
+        await asyncio.shield(self._subscription_flush)
+
+    async def _async_perform_subscriptions(self) -> None:
+        """Send the pending subscription changes to the broker."""
+        # Let subscriptions made in the same iteration join this batch.
+        await asyncio.sleep(0)
+        self._subscription_flush = None
+        subscribe = list(self._pending_subscribe.items())
+        unsubscribe = list(self._pending_unsubscribe)
+        self._pending_subscribe.clear()
+        self._pending_unsubscribe.clear()
 
         async with self._paho_lock:
-            result: int = None
-            result, _ = await self.opp.async_add_executor_job(
-                self._mqttc.subscribe, topic, qos
+            if subscribe:
+                _LOGGER.debug("Subscribing to %s", subscribe)
+                result: int = None
+                result, _ = await self.opp.async_add_executor_job(
+                    self._mqttc.subscribe, subscribe
+                )
+                _raise_on_error(result)
+
+            if unsubscribe:
+                _LOGGER.debug("Unsubscribing from %s", unsubscribe)
+                result, _ = await self.opp.async_add_executor_job(
+                    self._mqttc.unsubscribe, unsubscribe
+                )
+                _raise_on_error(result)
+
+    async def _async_resubscribe(self) -> None:
+        """Re-subscribe to all topics with the highest requested qos."""
+        keyfunc = attrgetter("topic")
+        for topic, subs in groupby(sorted(self.subscriptions, key=keyfunc), keyfunc):
+            self._pending_subscribe[topic] = max(
+                self._pending_subscribe.get(topic, 0),
+                max(subscription.qos for subscription in subs),
             )
-            _raise_on_error(result)
+        await self._async_flush_subscriptions()
 
     def _mqtt_on_connect(self, _mqttc, _userdata, _flags, result_code: int) -> None:
         """On connect callback.
@@ -923,23 +1117,50 @@ class MQTT:
 
         self.connected = True
 
-        # Group subscriptions to only re-subscribe once for each topic.
-        keyfunc = attrgetter("topic")
-        for topic, subs in groupby(sorted(self.subscriptions, key=keyfunc), keyfunc):
-            # Re-subscribe with the highest requested qos
-            max_qos = max(subscription.qos for subscription in subs)
-            self.opp.add_job(self._async_perform_subscription, topic, max_qos)
+        # Re-subscribe to all topics at once.
+        self.opp.add_job(self._async_resubscribe)
 
         if self.birth_message:
             self.opp.add_job(
-                self.async_publish(  # pylint: disable=no-value-for-parameter
-                    *attr.astuple(self.birth_message)
-                )
+                self.async_publish_nowait,  # pylint: disable=no-value-for-parameter
+                *attr.astuple(self.birth_message),
             )
 
     def _mqtt_on_message(self, _mqttc, _userdata, msg) -> None:
-        """Message received callback."""
-        self.opp.add_job(self._mqtt_handle_message, msg)
+        """Message received callback.
+
+        Messages are collected in an inbox and the event loop is only woken
+        up when it is not already going to process the inbox.
+        """
+        self._inbox.append(msg)
+        if not self._inbox_scheduled:
+            self._inbox_scheduled = True
+            self.opp.loop.call_soon_threadsafe(self._async_process_inbox)
+
+    @callback
+    def _async_process_inbox(self) -> None:
+        """Handle a slice of received messages."""
+        try:
+            for _ in range(MAX_INBOX_SLICE):
+                try:
+                    msg = self._inbox.popleft()
+                except IndexError:
+                    break
+
+                try:
+                    self._mqtt_handle_message(msg)
+                except Exception:  # pylint: disable=broad-except
+                    _LOGGER.exception("Error handling message on %s", msg.topic)
+        finally:
+            if not self._inbox:
+                self._inbox_scheduled = False
+
+            # A message may have been added after the inbox was found empty
+            # but before the flag was cleared, check again.
+            if self._inbox:
+                self._inbox_scheduled = True
+                # Yield to other callbacks before handling the next slice.
+                self.opp.loop.call_soon(self._async_process_inbox)
 
     @callback
     def _mqtt_handle_message(self, msg) -> None:
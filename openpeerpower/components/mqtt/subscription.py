@@ -1,4 +1,5 @@
 """Helper to handle a set of topics to subscribe to."""
+import asyncio
 import logging
 from typing import Any, Callable, Dict, Optional
 
@@ -69,6 +70,7 @@ async def async_subscribe_topics(
     """
     current_subscriptions = new_state if new_state is not None else {}
     new_state = {}
+    resubscribe = []
     for key, value in topics.items():
         # Extract the new requested subscription
         requested = EntitySubscription(
@@ -80,9 +82,13 @@ async def async_subscribe_topics(
         )
         # Get the current subscription state
         current = current_subscriptions.pop(key, None)
-        await requested.resubscribe_if_necessary(opp, current)
+        resubscribe.append(requested.resubscribe_if_necessary(opp, current))
         new_state[key] = requested
 
+    # Subscribe concurrently so the topics are sent in a single packet
+    if resubscribe:
+        await asyncio.gather(*resubscribe)
+
     # Go through all remaining subscriptions and unsubscribe them
     for remaining in current_subscriptions.values():
         if remaining.unsubscribe_callback is not None:
@@ -20,9 +20,14 @@ from openpeerpower.helpers.json import JSONEncoder
 CONF_BASE_TOPIC = "base_topic"
 CONF_PUBLISH_ATTRIBUTES = "publish_attributes"
 CONF_PUBLISH_TIMESTAMPS = "publish_timestamps"
+CONF_PUBLISH_CHANGED_ONLY = "publish_changed_only"
+CONF_PUBLISH_JSON = "publish_json"
 
 DOMAIN = "mqtt_statestream"
 
+# Attribute value types whose JSON encoding is cached between state changes
+CACHED_VALUE_TYPES = (str, int, float, bool, type(None))
+
 CONFIG_SCHEMA = vol.Schema(
     {
         DOMAIN: vol.Schema(
@@ -46,6 +51,8 @@ CONFIG_SCHEMA = vol.Schema(
                 vol.Required(CONF_BASE_TOPIC): valid_publish_topic,
                 vol.Optional(CONF_PUBLISH_ATTRIBUTES, default=False): cv.boolean,
                 vol.Optional(CONF_PUBLISH_TIMESTAMPS, default=False): cv.boolean,
+                vol.Optional(CONF_PUBLISH_CHANGED_ONLY, default=False): cv.boolean,
+                vol.Optional(CONF_PUBLISH_JSON, default=False): cv.boolean,
             }
         )
     },
@@ -61,6 +68,8 @@ async def async_setup(opp, config):
     pub_exclude = conf.get(CONF_EXCLUDE, {})
     publish_attributes = conf.get(CONF_PUBLISH_ATTRIBUTES)
     publish_timestamps = conf.get(CONF_PUBLISH_TIMESTAMPS)
+    publish_changed_only = conf.get(CONF_PUBLISH_CHANGED_ONLY)
+    publish_json = conf.get(CONF_PUBLISH_JSON)
     publish_filter = generate_filter(
         pub_include.get(CONF_DOMAINS, []),
         pub_include.get(CONF_ENTITIES, []),
@@ -70,33 +79,81 @@ async def async_setup(opp, config):
     if not base_topic.endswith("/"):
         base_topic = base_topic + "/"
 
+    # Per entity: the payloads last published per topic and the encoded
+    # attribute values.
+    published = {}
+    encoded_attributes = {}
+
+    def _encode_attributes(entity_id, attributes):
+        """Return the attributes encoded as JSON, reusing cached encodings.
+
+        Only values of immutable types are cached. A cached encoding is reused
+        if the new value has the same type and compares equal.
+        """
+        cache = encoded_attributes.get(entity_id, {})
+        new_cache = {}
+        payloads = {}
+        for key, val in attributes.items():
+            cached = cache.get(key)
+            if cached is not None and type(cached[0]) is type(val) and cached[0] == val:
+                payload = cached[1]
+            else:
+                payload = json.dumps(val, cls=JSONEncoder)
+            if type(val) in CACHED_VALUE_TYPES:
+                new_cache[key] = (val, payload)
+            payloads[key] = payload
+        encoded_attributes[entity_id] = new_cache
+        return payloads
+
     @callback
     def _state_publisher(entity_id, old_state, new_state):
         if new_state is None:
+            published.pop(entity_id, None)
+            encoded_attributes.pop(entity_id, None)
             return
 
         if not publish_filter(entity_id):
             return
 
-        payload = new_state.state
-
         mybase = base_topic + entity_id.replace(".", "/") + "/"
-        opp.components.mqtt.async_publish(mybase + "state", payload, 1, True)
-
-        if publish_timestamps:
-            if new_state.last_updated:
-                opp.components.mqtt.async_publish(
-                    mybase + "last_updated", new_state.last_updated.isoformat(), 1, True
-                )
-            if new_state.last_changed:
-                opp.components.mqtt.async_publish(
-                    mybase + "last_changed", new_state.last_changed.isoformat(), 1, True
-                )
-
-        if publish_attributes:
-            for key, val in new_state.attributes.items():
-                encoded_val = json.dumps(val, cls=JSONEncoder)
-                opp.components.mqtt.async_publish(mybase + key, encoded_val, 1, True)
+        payloads = {}
+
+        if publish_json:
+            document = {"state": new_state.state}
+            if publish_timestamps:
+                document["last_updated"] = new_state.last_updated.isoformat()
+                document["last_changed"] = new_state.last_changed.isoformat()
+            if publish_attributes:
+                document["attributes"] = dict(new_state.attributes)
+            payloads[mybase[:-1]] = json.dumps(document, cls=JSONEncoder)
+        else:
+            payloads[mybase + "state"] = new_state.state
+
+            if publish_timestamps:
+                if new_state.last_updated:
+                    payloads[
+                        mybase + "last_updated"
+                    ] = new_state.last_updated.isoformat()
+                if new_state.last_changed:
+                    payloads[
+                        mybase + "last_changed"
+                    ] = new_state.last_changed.isoformat()
+
+            if publish_attributes:
+                for key, encoded_val in _encode_attributes(
+                    entity_id, new_state.attributes
+                ).items():
+                    payloads[mybase + key] = encoded_val
+
+        if publish_changed_only:
+            last_published = published.get(entity_id, {})
+            published[entity_id] = payloads
+        else:
+            last_published = {}
+
+        for topic, payload in payloads.items():
+            if last_published.get(topic) != payload:
+                opp.components.mqtt.async_publish_nowait(topic, payload, 1, True)
 
     async_track_state_change(opp, MATCH_ALL, _state_publisher)
     return True
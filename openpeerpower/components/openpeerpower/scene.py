@@ -25,6 +25,7 @@ from openpeerpower.helpers import (
     config_per_platform,
     config_validation as cv,
     entity_platform,
+    reference_index,
 )
 from openpeerpower.helpers.state import async_reproduce_state
 from openpeerpower.loader import async_get_integration
@@ -118,18 +119,9 @@ _LOGGER = logging.getLogger(__name__)
 @callback
 def scenes_with_entity(opp: OpenPeerPower, entity_id: str) -> List[str]:
     """Return all scenes that reference the entity."""
-    if DATA_PLATFORM not in opp.data:
-        return []
-
-    platform = opp.data[DATA_PLATFORM]
-
-    results = []
-
-    for scene_entity in platform.entities.values():
-        if entity_id in scene_entity.scene_config.states:
-            results.append(scene_entity.entity_id)
-
-    return results
+    return reference_index.async_get_index(opp, SCENE_DOMAIN).async_with_entity(
+        entity_id
+    )
 
 
 @callback
@@ -289,6 +281,16 @@ class OpenPeerPowerScene(Scene):
             attributes[CONF_ID] = unique_id
         return attributes
 
+    async def async_added_to_opp(self):
+        """Register the entities of the scene."""
+        reference_index.async_get_index(self.opp, SCENE_DOMAIN).async_set(
+            self, self.scene_config.states
+        )
+
+    async def async_will_remove_from_opp(self):
+        """Unregister the entities of the scene."""
+        reference_index.async_get_index(self.opp, SCENE_DOMAIN).async_remove(self)
+
     async def async_activate(self):
         """Activate scene. Try to get entities into requested state."""
         await async_reproduce_state(
@@ -18,6 +18,7 @@ from openpeerpower.const import (
     STATE_ON,
 )
 from openpeerpower.core import OpenPeerPower, callback
+from openpeerpower.helpers import reference_index
 import openpeerpower.helpers.config_validation as cv
 from openpeerpower.helpers.config_validation import make_entity_service_schema
 from openpeerpower.helpers.entity import ToggleEntity
@@ -76,18 +77,7 @@ def is_on(opp, entity_id):
 @callback
 def scripts_with_entity(opp: OpenPeerPower, entity_id: str) -> List[str]:
     """Return all scripts that reference the entity."""
-    if DOMAIN not in opp.data:
-        return []
-
-    component = opp.data[DOMAIN]
-
-    results = []
-
-    for script_entity in component.entities:
-        if entity_id in script_entity.script.referenced_entities:
-            results.append(script_entity.entity_id)
-
-    return results
+    return reference_index.async_get_index(opp, DOMAIN).async_with_entity(entity_id)
 
 
 @callback
@@ -109,18 +99,7 @@ def entities_in_script(opp: OpenPeerPower, entity_id: str) -> List[str]:
 @callback
 def scripts_with_device(opp: OpenPeerPower, device_id: str) -> List[str]:
     """Return all scripts that reference the device."""
-    if DOMAIN not in opp.data:
-        return []
-
-    component = opp.data[DOMAIN]
-
-    results = []
-
-    for script_entity in component.entities:
-        if device_id in script_entity.script.referenced_devices:
-            results.append(script_entity.entity_id)
-
-    return results
+    return reference_index.async_get_index(opp, DOMAIN).async_with_device(device_id)
 
 
 @callback
@@ -291,8 +270,16 @@ class ScriptEntity(ToggleEntity):
         """Turn script off."""
         self.script.async_stop()
 
+    async def async_added_to_opp(self):
+        """Register the references of the script."""
+        reference_index.async_get_index(self.opp, DOMAIN).async_set(
+            self, self.script.referenced_entities, self.script.referenced_devices
+        )
+
     async def async_will_remove_from_opp(self):
         """Stop script and remove service when it will be removed from Open Peer Power."""
+        reference_index.async_get_index(self.opp, DOMAIN).async_remove(self)
+
         if self.script.is_running:
             self.script.async_stop()
 
@@ -1,14 +1,18 @@
 """Support for system log."""
-from collections import OrderedDict
+from collections import OrderedDict, deque
 import logging
 import re
+import sys
+import time
 import traceback
+from traceback import walk_tb
 
 import voluptuous as vol
 
 from openpeerpower import __path__ as OPENPEERPOWER_PATH
 from openpeerpower.components.http import OpenPeerPowerView
 from openpeerpower.const import EVENT_OPENPEERPOWER_STOP
+from openpeerpower.core import callback
 import openpeerpower.helpers.config_validation as cv
 
 CONF_MAX_ENTRIES = "max_entries"
@@ -22,6 +26,10 @@ DEFAULT_MAX_ENTRIES = 50
 DEFAULT_FIRE_EVENT = False
 DOMAIN = "system_log"
 
+# Maximum number of system_log_event events fired per second
+MAX_EVENTS_PER_SECOND = 20
+MAX_PENDING_EVENTS = 100
+
 EVENT_SYSTEM_LOG = "system_log_event"
 
 SERVICE_CLEAR = "clear"
@@ -53,7 +61,8 @@ SERVICE_WRITE_SCHEMA = vol.Schema(
 )
 
 
-def _figure_out_source(record, call_stack, opp):
+def _source_paths_re(opp):
+    """Return a regex matching files in Open Peer Power or the config dir."""
     paths = [OPENPEERPOWER_PATH[0], opp.config.config_dir]
     try:
         # If netdisco is installed check its path too.
@@ -63,11 +72,58 @@ def _figure_out_source(record, call_stack, opp):
         paths.append(netdisco_path[0])
     except ImportError:
         pass
-    # If a stack trace exists, extract file names from the entire call stack.
-    # The other case is when a regular "log" is made (without an attached
-    # exception). In that case, just use the file where the log was made from.
+
+    return re.compile(r"(?:{})/(.*)".format("|".join([re.escape(x) for x in paths])))
+
+
+def _call_stack(record):
+    """Return the file names of the frames from where a log was made, innermost first.
+
+    Frames inside the logging module and the handler are skipped.
+    """
+    frame = sys._getframe(1)  # pylint: disable=protected-access
+
+    # Skip the frames up to the file where the log was made from.
+    while frame is not None and frame.f_code.co_filename != record.pathname:
+        frame = frame.f_back
+
+    if frame is None:
+        # For some reason we couldn't find pathname in the stack.
+        yield record.pathname
+
+    while frame is not None:
+        yield frame.f_code.co_filename
+        frame = frame.f_back
+
+
+def _source_from_stack(record, stack, paths_re, sources=None):
+    """Return the first file in Open Peer Power of a stack, innermost first."""
+    if sources is None:
+        sources = {}
+
+    # Find the last call from a file in Open Peer Power. Try to figure
+    # out where error happened.
+    for pathname in stack:
+        if pathname not in sources:
+            match = paths_re.match(pathname)
+            sources[pathname] = match.group(1) if match else None
+
+        source = sources[pathname]
+        if source is not None:
+            return source
+
+    # Ok, we don't know what this is
+    return record.pathname
+
+
+def _figure_out_source(record, call_stack, opp):
+    """Return the file within Open Peer Power where a log was made from.
+
+    call_stack is the list of file names of the stack of the log call,
+    outermost first. It is not used if the record has a traceback.
+    """
     if record.exc_info:
-        stack = [x[0] for x in traceback.extract_tb(record.exc_info[2])]
+        stack = [frame.f_code.co_filename for frame, _ in walk_tb(record.exc_info[2])]
     else:
         index = -1
         for i, frame in enumerate(call_stack):
@@ -80,17 +136,30 @@ def _figure_out_source(record, call_stack, opp):
         else:
             stack = call_stack[0 : index + 1]
 
-    # Iterate through the stack call (in reverse) and find the last call from
-    # a file in Open Peer Power. Try to figure out where error happened.
-    paths_re = r"(?:{})/(.*)".format("|".join([re.escape(x) for x in paths]))
-    for pathname in reversed(stack):
+    return _source_from_stack(record, reversed(stack), _source_paths_re(opp))
 
-        # Try to match with a file within Open Peer Power
-        match = re.match(paths_re, pathname)
-        if match:
-            return match.group(1)
-    # Ok, we don't know what this is
-    return record.pathname
+
+def _root_cause(record):
+    """Return the last frame of the traceback of a record as string."""
+    if not record.exc_info:
+        return None
+
+    tb = record.exc_info[2]  # pylint: disable=invalid-name
+    if tb is None:
+        return None
+
+    while tb.tb_next is not None:
+        tb = tb.tb_next  # pylint: disable=invalid-name
+
+    # Last line of traceback contains the root cause of the exception
+    return str(
+        traceback.FrameSummary(
+            tb.tb_frame.f_code.co_filename,
+            tb.tb_lineno,
+            tb.tb_frame.f_code.co_name,
+            lookup_line=False,
+        )
+    )
 
 
 class LogEntry:
@@ -103,19 +172,15 @@ class LogEntry:
         self.level = record.levelname
         self.message = record.getMessage()
         self.exception = ""
-        self.root_cause = None
+        self.root_cause = _root_cause(record)
         if record.exc_info:
             self.exception = "".join(traceback.format_exception(*record.exc_info))
-            _, _, tb = record.exc_info  # pylint: disable=invalid-name
-            # Last line of traceback contains the root cause of the exception
-            if traceback.extract_tb(tb):
-                self.root_cause = str(traceback.extract_tb(tb)[-1])
         self.source = source
         self.count = 1
 
     def hash(self):
         """Calculate a key for DedupStore."""
-        return frozenset([self.name, self.message, self.root_cause])
+        return (self.name, self.message, self.root_cause)
 
     def to_dict(self):
         """Convert object into dict to maintain backward compatibility."""
@@ -132,28 +197,44 @@ class DedupStore(OrderedDict):
 
     def add_entry(self, entry):
         """Add a new entry."""
-        key = str(entry.hash())
+        key = entry.hash()
 
         if key in self:
-            # Update stored entry
-            self[key].count += 1
-            self[key].timestamp = entry.timestamp
+            self.update_entry(key, entry.timestamp)
+            return
 
-            self.move_to_end(key)
-        else:
-            self[key] = entry
+        self[key] = entry
 
         if len(self) > self.maxlen:
             # Removes the first record which should also be the oldest
             self.popitem(last=False)
 
+    def update_entry(self, key, timestamp):
+        """Count another occurrence of a stored entry.
+
+        Return the entry or None if no entry is stored for the key.
+        """
+        entry = self.get(key)
+
+        if entry is not None:
+            entry.count += 1
+            entry.timestamp = timestamp
+            self.move_to_end(key)
+
+        return entry
+
     def to_list(self):
         """Return reversed list of log entries - LIFO."""
         return [value.to_dict() for value in reversed(self.values())]
 
 
 class LogErrorHandler(logging.Handler):
-    """Log handler for error messages."""
+    """Log handler for error messages.
+
+    Entries are deduplicated before the source of the log is looked up.
+    Events are fired in batches from the event loop, at most
+    MAX_EVENTS_PER_SECOND per second.
+    """
 
     def __init__(self, opp, maxlen, fire_event):
         """Initialize a new LogErrorHandler."""
@@ -161,6 +242,14 @@ class LogErrorHandler(logging.Handler):
         self.opp = opp
         self.records = DedupStore(maxlen=maxlen)
         self.fire_event = fire_event
+        self.events_dropped = 0
+        self._paths_re = _source_paths_re(opp)
+        # File name to file name within Open Peer Power, None if outside
+        self._sources = {}
+        self._pending_events = deque(maxlen=MAX_PENDING_EVENTS)
+        self._fire_scheduled = False
+        self._window_start = 0.0
+        self._window_events = 0
 
     def emit(self, record):
         """Save error and warning logs.
@@ -169,15 +258,65 @@ class LogErrorHandler(logging.Handler):
         default upper limit is set to 50 (older entries are discarded) but can
         be changed if needed.
         """
-        if record.levelno >= logging.WARN:
-            stack = []
-            if not record.exc_info:
-                stack = [f for f, _, _, _ in traceback.extract_stack()]
+        if record.levelno < logging.WARN:
+            return
 
-            entry = LogEntry(record, stack, _figure_out_source(record, stack, self.opp))
+        key = (record.name, record.getMessage(), _root_cause(record))
+        entry = self.records.update_entry(key, record.created)
+
+        if entry is None:
+            entry = LogEntry(record, None, self._figure_out_source(record))
             self.records.add_entry(entry)
-            if self.fire_event:
-                self.opp.bus.fire(EVENT_SYSTEM_LOG, entry.to_dict())
+
+        if not self.fire_event:
+            return
+
+        if len(self._pending_events) == MAX_PENDING_EVENTS:
+            # The oldest pending event is discarded by the append
+            self.events_dropped += 1
+
+        self._pending_events.append(dict(entry.to_dict()))
+
+        if not self._fire_scheduled:
+            self._fire_scheduled = True
+            self.opp.loop.call_soon_threadsafe(self._async_fire_events)
+
+    def _figure_out_source(self, record):
+        """Return the file within Open Peer Power where the log was made from.
+
+        If a stack trace exists, use the file names from the traceback. The
+        other case is when a regular "log" is made (without an attached
+        exception). In that case, use the file where the log was made from
+        and its callers.
+        """
+        if record.exc_info and record.exc_info[2] is not None:
+            stack = reversed(
+                [frame.f_code.co_filename for frame, _ in walk_tb(record.exc_info[2])]
+            )
+        else:
+            stack = _call_stack(record)
+
+        return _source_from_stack(record, stack, self._paths_re, self._sources)
+
+    @callback
+    def _async_fire_events(self):
+        """Fire events for the logged entries."""
+        self._fire_scheduled = False
+
+        now = time.monotonic()
+        if now - self._window_start >= 1:
+            self._window_start = now
+            self._window_events = 0
+
+        while self._pending_events:
+            data = self._pending_events.popleft()
+
+            if self._window_events >= MAX_EVENTS_PER_SECOND:
+                self.events_dropped += 1
+                continue
+
+            self._window_events += 1
+            self.opp.bus.async_fire(EVENT_SYSTEM_LOG, data)
 
 
 async def async_setup(opp, config):
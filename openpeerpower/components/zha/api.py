@@ -53,6 +53,7 @@ from .core.const import (
     WARNING_DEVICE_STROBE_YES,
 )
 from .core.helpers import async_is_bindable_target, get_matched_clusters
+from .core.scheduler import RequestPriority
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -572,8 +573,13 @@ async def websocket_read_zigbee_cluster_attributes(opp, connection, msg):
         cluster = zha_device.async_get_cluster(
             endpoint_id, cluster_id, cluster_type=cluster_type
         )
-        success, failure = await cluster.read_attributes(
-            [attribute], allow_cache=False, only_cache=False, manufacturer=manufacturer
+        success, failure = await zha_device.async_request(
+            RequestPriority.READ,
+            cluster.read_attributes,
+            [attribute],
+            allow_cache=False,
+            only_cache=False,
+            manufacturer=manufacturer,
         )
     _LOGGER.debug(
         "Read attribute for: %s: [%s] %s: [%s] %s: [%s] %s: [%s] %s: [%s] %s: [%s] %s: [%s],",
@@ -760,7 +766,9 @@ async def async_binding_operation(zha_gateway, source_ieee, target_ieee, operati
 
         bind_tasks.append(
             (
-                zdo.request(
+                source_device.async_request(
+                    RequestPriority.CONFIGURE,
+                    zdo.request,
                     operation,
                     source_device.ieee,
                     cluster_pair.source_cluster.endpoint.endpoint_id,
@@ -926,8 +934,15 @@ def async_load_api(opp):
         response = None
         if group is not None:
             cluster = group.endpoint[cluster_id]
-            response = await cluster.command(
-                command, *args, manufacturer=manufacturer, expect_reply=True
+            # group commands are multicast by the coordinator
+            response = await zha_gateway.request_scheduler.async_request(
+                application_controller.ieee,
+                RequestPriority.COMMAND,
+                cluster.command,
+                command,
+                *args,
+                manufacturer=manufacturer,
+                expect_reply=True,
             )
         _LOGGER.debug(
             "Issued group command for: %s: [%s] %s: [%s] %s: %s %s: [%s] %s: %s",
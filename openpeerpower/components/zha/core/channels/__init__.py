@@ -27,6 +27,7 @@ from ..const import (
 )
 from ..helpers import LogMixin, get_attr_id_by_name, safe_read
 from ..registries import CLUSTER_REPORT_CONFIGS
+from ..scheduler import RequestPriority
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -50,7 +51,9 @@ def decorate_command(channel, command):
     @wraps(command)
     async def wrapper(*args, **kwds):
         try:
-            result = await command(*args, **kwds)
+            result = await channel.device.async_request(
+                RequestPriority.COMMAND, command, *args, **kwds
+            )
             channel.debug(
                 "executed command: %s %s %s %s",
                 command.__name__,
@@ -143,7 +146,9 @@ class ZigbeeChannel(LogMixin):
         devices are unreachable.
         """
         try:
-            res = await self.cluster.bind()
+            res = await self.device.async_request(
+                RequestPriority.CONFIGURE, self.cluster.bind
+            )
             self.debug("bound '%s' cluster: %s", self.cluster.ep_attribute, res[0])
         except (zigpy.exceptions.DeliveryError, Timeout) as ex:
             self.debug(
@@ -172,8 +177,14 @@ class ZigbeeChannel(LogMixin):
 
         min_report_int, max_report_int, reportable_change = report_config
         try:
-            res = await self.cluster.configure_reporting(
-                attr, min_report_int, max_report_int, reportable_change, **kwargs
+            res = await self.device.async_request(
+                RequestPriority.CONFIGURE,
+                self.cluster.configure_reporting,
+                attr,
+                min_report_int,
+                max_report_int,
+                reportable_change,
+                **kwargs,
             )
             self.debug(
                 "reporting '%s' attr on '%s' cluster: %d/%d/%d: Result: '%s'",
@@ -252,13 +263,25 @@ class ZigbeeChannel(LogMixin):
         manufacturer_code = self._zha_device.manufacturer_code
         if self.cluster.cluster_id >= 0xFC00 and manufacturer_code:
             manufacturer = manufacturer_code
-        result = await safe_read(
-            self._cluster,
-            [attribute],
-            allow_cache=from_cache,
-            only_cache=from_cache,
-            manufacturer=manufacturer,
-        )
+        if from_cache:
+            # cached reads don't go over the network
+            result = await safe_read(
+                self._cluster,
+                [attribute],
+                allow_cache=True,
+                only_cache=True,
+                manufacturer=manufacturer,
+            )
+        else:
+            result = await self._zha_device.async_request(
+                RequestPriority.READ,
+                safe_read,
+                self._cluster,
+                [attribute],
+                allow_cache=False,
+                only_cache=False,
+                manufacturer=manufacturer,
+            )
         return result.get(attribute)
 
     def log(self, level, msg, *args):
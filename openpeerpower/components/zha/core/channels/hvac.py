@@ -15,6 +15,7 @@ from openpeerpower.helpers.dispatcher import async_dispatcher_send
 from . import ZigbeeChannel
 from .. import registries
 from ..const import REPORT_CONFIG_OP, SIGNAL_ATTR_UPDATED
+from ..scheduler import RequestPriority
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -38,7 +39,11 @@ class FanChannel(ZigbeeChannel):
         """Set the speed of the fan."""
 
         try:
-            await self.cluster.write_attributes({"fan_mode": value})
+            await self.device.async_request(
+                RequestPriority.COMMAND,
+                self.cluster.write_attributes,
+                {"fan_mode": value},
+            )
         except DeliveryError as ex:
             self.error("Could not set speed: %s", ex)
             return
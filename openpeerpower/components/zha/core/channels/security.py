@@ -23,6 +23,7 @@ from ..const import (
     WARNING_DEVICE_STROBE_HIGH,
     WARNING_DEVICE_STROBE_YES,
 )
+from ..scheduler import RequestPriority
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -156,7 +157,11 @@ class IASZoneChannel(ZigbeeChannel):
         ieee = self.cluster.endpoint.device.application.ieee
 
         try:
-            res = await self._cluster.write_attributes({"cie_addr": ieee})
+            res = await self.device.async_request(
+                RequestPriority.CONFIGURE,
+                self._cluster.write_attributes,
+                {"cie_addr": ieee},
+            )
             self.debug(
                 "wrote cie_addr: %s to '%s' cluster: %s",
                 str(ieee),
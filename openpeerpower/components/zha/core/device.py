@@ -5,7 +5,6 @@ For more details about this component, please refer to the documentation at
 https://open-peer-power.io/integrations/zha/
 """
 import asyncio
-from datetime import timedelta
 from enum import Enum
 import logging
 import time
@@ -22,7 +21,6 @@ from openpeerpower.helpers.dispatcher import (
     async_dispatcher_connect,
     async_dispatcher_send,
 )
-from openpeerpower.helpers.event import async_track_time_interval
 
 from .channels import EventRelayChannel
 from .const import (
@@ -63,10 +61,10 @@ from .const import (
     UNKNOWN_MODEL,
 )
 from .helpers import LogMixin
+from .scheduler import RequestPriority
 
 _LOGGER = logging.getLogger(__name__)
 _KEEP_ALIVE_INTERVAL = 7200
-_UPDATE_ALIVE_INTERVAL = timedelta(seconds=60)
 _CHECKIN_GRACE_PERIODS = 2
 
 
@@ -101,9 +99,6 @@ class ZHADevice(LogMixin):
             self._zigpy_device.__class__.__module__,
             self._zigpy_device.__class__.__name__,
         )
-        self._available_check = async_track_time_interval(
-            self.opp, self._check_available, _UPDATE_ALIVE_INTERVAL
-        )
         self._op_device_id = None
         self.status = DeviceStatus.CREATED
 
@@ -249,32 +244,61 @@ class ZHADevice(LogMixin):
         """Set availability from restore and prevent signals."""
         self._available = available
 
-    def _check_available(self, *_):
+    @callback
+    def async_check_available(self, now):
+        """Update availability from last_seen, only signalling transitions.
+
+        Return True if the device missed its keep alive and should be sent a
+        checkin. The gateway decides if and when the checkin is sent.
+        """
         if self.last_seen is None:
-            self.update_available(False)
-        else:
-            difference = time.time() - self.last_seen
-            if difference > _KEEP_ALIVE_INTERVAL:
-                if self._checkins_missed_count < _CHECKIN_GRACE_PERIODS:
-                    self._checkins_missed_count += 1
-                    if (
-                        CHANNEL_BASIC in self.cluster_channels
-                        and self.manufacturer != "LUMI"
-                    ):
-                        self.debug(
-                            "Attempting to checkin with device - missed checkins: %s",
-                            self._checkins_missed_count,
-                        )
-                        self.opp.async_create_task(
-                            self.cluster_channels[CHANNEL_BASIC].get_attribute_value(
-                                ATTR_MANUFACTURER, from_cache=False
-                            )
-                        )
-                else:
-                    self.update_available(False)
-            else:
-                self.update_available(True)
-                self._checkins_missed_count = 0
+            self._async_update_available_changed(False)
+            return False
+
+        if now - self.last_seen <= _KEEP_ALIVE_INTERVAL:
+            self._checkins_missed_count = 0
+            self._async_update_available_changed(True)
+            return False
+
+        if self._checkins_missed_count < _CHECKIN_GRACE_PERIODS:
+            return True
+
+        self._async_update_available_changed(False)
+        return False
+
+    @callback
+    def async_checkin(self):
+        """Try to get a response from a device that missed its keep alive.
+
+        Return True if a read request was sent to the device.
+        """
+        self._checkins_missed_count += 1
+        if CHANNEL_BASIC not in self.cluster_channels or self.manufacturer == "LUMI":
+            return False
+
+        self.debug(
+            "Attempting to checkin with device - missed checkins: %s",
+            self._checkins_missed_count,
+        )
+        self.opp.async_create_task(
+            self.cluster_channels[CHANNEL_BASIC].get_attribute_value(
+                ATTR_MANUFACTURER, from_cache=False
+            )
+        )
+        return True
+
+    @callback
+    def async_availability_deadline(self, now):
+        """Return the time at which availability needs to be checked again."""
+        if self._available and self.last_seen is not None:
+            return max(now, self.last_seen + _KEEP_ALIVE_INTERVAL)
+        return now
+
+    @callback
+    def _async_update_available_changed(self, available):
+        """Set sensor availability if it changed."""
+        if self._available != available:
+            self.update_available(available)
 
     def update_available(self, available):
         """Set sensor availability."""
@@ -385,32 +409,33 @@ class ZHADevice(LogMixin):
 
     async def _execute_channel_tasks(self, channels, task_name, *args):
         """Gather and execute a set of CHANNEL tasks."""
+        # concurrent requests per device are limited by the request scheduler
         channel_tasks = []
-        semaphore = asyncio.Semaphore(3)
         zdo_task = None
         for channel in channels:
             if channel.name == CHANNEL_ZDO:
                 if zdo_task is None:  # We only want to do this once
-                    zdo_task = self._async_create_task(
-                        semaphore, channel, task_name, *args
-                    )
+                    zdo_task = self._async_create_task(channel, task_name, *args)
             else:
-                channel_tasks.append(
-                    self._async_create_task(semaphore, channel, task_name, *args)
-                )
+                channel_tasks.append(self._async_create_task(channel, task_name, *args))
         if zdo_task is not None:
             await zdo_task
         await asyncio.gather(*channel_tasks)
 
-    async def _async_create_task(self, semaphore, channel, func_name, *args):
+    async def _async_create_task(self, channel, func_name, *args):
         """Configure a single channel on this device."""
         try:
-            async with semaphore:
-                await getattr(channel, func_name)(*args)
-                channel.debug("channel: '%s' stage succeeded", func_name)
+            await getattr(channel, func_name)(*args)
+            channel.debug("channel: '%s' stage succeeded", func_name)
         except Exception as ex:  # pylint: disable=broad-except
             channel.warning("channel: '%s' stage failed ex: %s", func_name, ex)
 
+    async def async_request(self, priority, target, *args, **kwargs):
+        """Send a request to this device through the gateway request scheduler."""
+        return await self.gateway.request_scheduler.async_request(
+            self.ieee, priority, target, *args, **kwargs
+        )
+
     @callback
     def async_unsub_dispatcher(self):
         """Unsubscribe the dispatcher."""
@@ -509,8 +534,11 @@ class ZHADevice(LogMixin):
             return None
 
         try:
-            response = await cluster.write_attributes(
-                {attribute: value}, manufacturer=manufacturer
+            response = await self.async_request(
+                RequestPriority.COMMAND,
+                cluster.write_attributes,
+                {attribute: value},
+                manufacturer=manufacturer,
             )
             self.debug(
                 "set: %s for attr: %s to cluster: %s for ept: %s - res: %s",
@@ -547,11 +575,18 @@ class ZHADevice(LogMixin):
         if cluster is None:
             return None
         if command_type == CLUSTER_COMMAND_SERVER:
-            response = await cluster.command(
-                command, *args, manufacturer=manufacturer, expect_reply=True
+            response = await self.async_request(
+                RequestPriority.COMMAND,
+                cluster.command,
+                command,
+                *args,
+                manufacturer=manufacturer,
+                expect_reply=True,
             )
         else:
-            response = await cluster.client_command(command, *args)
+            response = await self.async_request(
+                RequestPriority.COMMAND, cluster.client_command, command, *args
+            )
 
         self.debug(
             "Issued cluster command: %s %s %s %s %s %s %s",
@@ -618,7 +653,9 @@ class ZHADevice(LogMixin):
                 zdo.debug("processing " + op_msg, *op_params)
                 tasks.append(
                     (
-                        zdo.request(
+                        self.async_request(
+                            RequestPriority.CONFIGURE,
+                            zdo.request,
                             operation,
                             self.ieee,
                             cluster_binding.endpoint_id,
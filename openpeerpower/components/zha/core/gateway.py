@@ -7,9 +7,12 @@ https://open-peer-power.io/integrations/zha/
 
 import asyncio
 import collections
+from datetime import timedelta
+import heapq
 import itertools
 import logging
 import os
+import time
 import traceback
 
 import zigpy.device as zigpy_dev
@@ -22,6 +25,7 @@ from openpeerpower.helpers.device_registry import (
 )
 from openpeerpower.helpers.dispatcher import async_dispatcher_send
 from openpeerpower.helpers.entity_registry import async_get_registry as get_ent_reg
+from openpeerpower.helpers.event import async_track_time_interval
 
 from .const import (
     ATTR_IEEE,
@@ -68,6 +72,7 @@ from .const import (
     ZHA_GW_MSG_LOG_ENTRY,
     ZHA_GW_MSG_LOG_OUTPUT,
     ZHA_GW_MSG_RAW_INIT,
+    ZHA_GW_MAX_IN_FLIGHT,
     ZHA_GW_RADIO,
     ZHA_GW_RADIO_DESCRIPTION,
 )
@@ -76,9 +81,14 @@ from .discovery import async_dispatch_discovery_info, async_process_endpoint
 from .group import ZHAGroup
 from .patches import apply_application_controller_patch
 from .registries import RADIO_TYPES
+from .scheduler import DEFAULT_MAX_IN_FLIGHT, ZHARequestScheduler
 from .store import async_get_registry
 
 _LOGGER = logging.getLogger(__name__)
+_UPDATE_ALIVE_INTERVAL = timedelta(seconds=60)
+# Limit checkin reads per availability sweep so the radio isn't flooded when
+# many devices go quiet at once, e.g. after a coordinator restart.
+_MAX_CHECKINS_PER_SWEEP = 8
 
 EntityReference = collections.namedtuple(
     "EntityReference",
@@ -101,6 +111,7 @@ class ZHAGateway:
         self.op_entity_registry = None
         self.application_controller = None
         self.radio_description = None
+        self.request_scheduler = ZHARequestScheduler()
         opp.data[DATA_ZHA][DATA_ZHA_GATEWAY] = self
         self._log_levels = {
             DEBUG_LEVEL_ORIGINAL: async_capture_log_levels(),
@@ -109,6 +120,10 @@ class ZHAGateway:
         self.debug_enabled = False
         self._log_relay_handler = LogRelayHandler(opp, self)
         self._config_entry = config_entry
+        self._available_index = []
+        self._available_deadlines = {}
+        self._available_refresh = set()
+        self._unsub_available_check = None
 
     async def async_initialize(self):
         """Initialize controller and connect radio."""
@@ -123,6 +138,9 @@ class ZHAGateway:
         radio_details = RADIO_TYPES[radio_type]
         radio = radio_details[ZHA_GW_RADIO]()
         self.radio_description = radio_details[ZHA_GW_RADIO_DESCRIPTION]
+        self.request_scheduler.max_in_flight = radio_details.get(
+            ZHA_GW_MAX_IN_FLIGHT, DEFAULT_MAX_IN_FLIGHT
+        )
         await radio.connect(usb_path, baudrate)
 
         if CONF_DATABASE in self._config:
@@ -139,21 +157,18 @@ class ZHAGateway:
             self.application_controller.ieee
         )
 
-        init_tasks = []
-        semaphore = asyncio.Semaphore(2)
-
-        async def init_with_semaphore(coro, semaphore):
-            """Don't flood the zigbee network during initialization."""
-            async with semaphore:
-                await coro
-
-        for device in self.application_controller.devices.values():
-            init_tasks.append(
-                init_with_semaphore(self.async_device_restored(device), semaphore)
+        # requests are throttled by the request scheduler
+        await asyncio.gather(
+            *(
+                self.async_device_restored(device)
+                for device in self.application_controller.devices.values()
             )
-        await asyncio.gather(*init_tasks)
+        )
 
         self._initialize_groups()
+        self._unsub_available_check = async_track_time_interval(
+            self._opp, self._async_check_available, _UPDATE_ALIVE_INTERVAL
+        )
 
     def device_joined(self, device):
         """Handle device joined.
@@ -249,6 +264,7 @@ class ZHAGateway:
         """Handle device being removed from the network."""
         zha_device = self._devices.pop(device.ieee, None)
         entity_refs = self._device_registry.pop(device.ieee, None)
+        self._available_deadlines.pop(device.ieee, None)
         if zha_device is not None:
             device_info = zha_device.async_get_info()
             zha_device.async_unsub_dispatcher()
@@ -323,6 +339,8 @@ class ZHAGateway:
         remove_future,
     ):
         """Record the creation of a opp entity associated with ieee."""
+        # new entities only learn the availability of the device on a transition
+        self._available_refresh.add(ieee)
         self._device_registry[ieee].append(
             EntityReference(
                 reference_id=reference_id,
@@ -376,10 +394,56 @@ class ZHAGateway:
                 model=zha_device.model,
             )
             zha_device.set_device_id(device_registry_device.id)
-        entry = self.zha_storage.async_get_or_create(zha_device)
-        zha_device.async_update_last_seen(entry.last_seen)
+            entry = self.zha_storage.async_get_or_create(zha_device)
+            zha_device.async_update_last_seen(entry.last_seen)
+            self._async_index_availability(zha_device, time.time())
+        else:
+            entry = self.zha_storage.async_get_or_create(zha_device)
+            zha_device.async_update_last_seen(entry.last_seen)
         return zha_device
 
+    @callback
+    def _async_index_availability(self, zha_device, now):
+        """Schedule the next availability check for a device."""
+        deadline = zha_device.async_availability_deadline(now)
+        self._available_deadlines[zha_device.ieee] = deadline
+        heapq.heappush(self._available_index, (deadline, zha_device.ieee))
+
+    @callback
+    def _async_check_available(self, *_):
+        """Check availability of the devices whose keep alive expired.
+
+        Devices are kept in a heap ordered by the time their keep alive
+        expires, so devices that were recently seen are not visited at all.
+        """
+        now = time.time()
+        checked = []
+        checkins = 0
+
+        while self._available_index and self._available_index[0][0] <= now:
+            deadline, ieee = heapq.heappop(self._available_index)
+            zha_device = self._devices.get(ieee)
+            # Skip entries of removed devices and superseded deadlines
+            if zha_device is None or self._available_deadlines.get(ieee) != deadline:
+                continue
+
+            if (
+                zha_device.async_check_available(now)
+                and checkins < _MAX_CHECKINS_PER_SWEEP
+                and zha_device.async_checkin()
+            ):
+                checkins += 1
+            checked.append(zha_device)
+
+        for zha_device in checked:
+            self._async_index_availability(zha_device, now)
+
+        for ieee in self._available_refresh:
+            zha_device = self._devices.get(ieee)
+            if zha_device is not None and zha_device.available:
+                zha_device.update_available(True)
+        self._available_refresh.clear()
+
     @callback
     def _async_get_or_create_group(self, zigpy_group):
         """Get or create a ZHA group."""
@@ -546,6 +610,9 @@ class ZHAGateway:
     async def shutdown(self):
         """Stop ZHA Controller Application."""
         _LOGGER.debug("Shutting down ZHA ControllerApplication")
+        if self._unsub_available_check is not None:
+            self._unsub_available_check()
+            self._unsub_available_check = None
         await self.application_controller.shutdown()
 
 
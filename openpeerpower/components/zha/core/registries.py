@@ -33,7 +33,13 @@ from openpeerpower.components.switch import DOMAIN as SWITCH
 
 # importing channels updates registries
 from . import channels  # noqa: F401 pylint: disable=unused-import
-from .const import CONTROLLER, ZHA_GW_RADIO, ZHA_GW_RADIO_DESCRIPTION, RadioType
+from .const import (
+    CONTROLLER,
+    ZHA_GW_MAX_IN_FLIGHT,
+    ZHA_GW_RADIO,
+    ZHA_GW_RADIO_DESCRIPTION,
+    RadioType,
+)
 from .decorators import CALLABLE_T, DictRegistry, SetRegistry
 
 SMARTTHINGS_ACCELERATION_CLUSTER = 0xFC02
@@ -133,26 +139,31 @@ RADIO_TYPES = {
         ZHA_GW_RADIO: zigpy_deconz.api.Deconz,
         CONTROLLER: zigpy_deconz.zigbee.application.ControllerApplication,
         ZHA_GW_RADIO_DESCRIPTION: "Deconz",
+        ZHA_GW_MAX_IN_FLIGHT: 4,
     },
     RadioType.ezsp.name: {
         ZHA_GW_RADIO: bellows.ezsp.EZSP,
         CONTROLLER: bellows.zigbee.application.ControllerApplication,
         ZHA_GW_RADIO_DESCRIPTION: "EZSP",
+        ZHA_GW_MAX_IN_FLIGHT: 8,
     },
     RadioType.ti_cc.name: {
         ZHA_GW_RADIO: zigpy_cc.api.API,
         CONTROLLER: zigpy_cc.zigbee.application.ControllerApplication,
         ZHA_GW_RADIO_DESCRIPTION: "TI CC",
+        ZHA_GW_MAX_IN_FLIGHT: 4,
     },
     RadioType.xbee.name: {
         ZHA_GW_RADIO: zigpy_xbee.api.XBee,
         CONTROLLER: zigpy_xbee.zigbee.application.ControllerApplication,
         ZHA_GW_RADIO_DESCRIPTION: "XBee",
+        ZHA_GW_MAX_IN_FLIGHT: 4,
     },
     RadioType.zigate.name: {
         ZHA_GW_RADIO: zigpy_zigate.api.ZiGate,
         CONTROLLER: zigpy_zigate.zigbee.application.ControllerApplication,
         ZHA_GW_RADIO_DESCRIPTION: "ZiGate",
+        ZHA_GW_MAX_IN_FLIGHT: 2,
     },
 }
 
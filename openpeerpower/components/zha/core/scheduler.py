@@ -0,0 +1,128 @@
+"""
+Request scheduler for Zigbee Home Automation.
+
+For more details about this component, please refer to the documentation at
+https://open-peer-power.io/integrations/zha/
+"""
+import asyncio
+from collections import defaultdict
+import enum
+import heapq
+import itertools
+import logging
+import time
+
+import zigpy.exceptions
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_MAX_IN_FLIGHT = 4
+DEFAULT_MAX_IN_FLIGHT_PER_DEVICE = 3
+
+
+class RequestPriority(enum.IntEnum):
+    """Priority of a request to the Zigbee network, lower runs first."""
+
+    COMMAND = 0
+    READ = 1
+    CONFIGURE = 2
+
+
+class ZHARequestScheduler:
+    """Schedule requests to the Zigbee network.
+
+    Requests wait in a priority queue until both the radio and the target
+    device have a free slot. User commands are let through before attribute
+    reads, which go before configuration requests. Requests with the same
+    priority run in the order they were queued.
+    """
+
+    def __init__(
+        self,
+        max_in_flight=DEFAULT_MAX_IN_FLIGHT,
+        max_in_flight_per_device=DEFAULT_MAX_IN_FLIGHT_PER_DEVICE,
+    ):
+        """Initialize the request scheduler."""
+        self.max_in_flight = max_in_flight
+        self.max_in_flight_per_device = max_in_flight_per_device
+        self._queue = []
+        self._sequence = itertools.count()
+        self._in_flight = 0
+        self._device_in_flight = defaultdict(int)
+        self._requests = 0
+        self._nacks = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    @property
+    def metrics(self):
+        """Return queue wait and delivery metrics."""
+        return {
+            "queued": len(self._queue),
+            "in_flight": self._in_flight,
+            "requests": self._requests,
+            "nacks": self._nacks,
+            "nack_rate": self._nacks / self._requests if self._requests else 0.0,
+            "wait_avg": self._wait_total / self._requests if self._requests else 0.0,
+            "wait_max": self._wait_max,
+        }
+
+    async def async_request(self, ieee, priority, target, *args, **kwargs):
+        """Run a request to a device once a slot is available."""
+        queued = time.monotonic()
+        await self._async_acquire(ieee, priority)
+
+        wait = time.monotonic() - queued
+        self._requests += 1
+        self._wait_total += wait
+        self._wait_max = max(self._wait_max, wait)
+
+        try:
+            return await target(*args, **kwargs)
+        except (zigpy.exceptions.DeliveryError, asyncio.TimeoutError):
+            self._nacks += 1
+            raise
+        finally:
+            self._release(ieee)
+
+    async def _async_acquire(self, ieee, priority):
+        """Wait until a slot is granted for a request to a device."""
+        future = asyncio.get_event_loop().create_future()
+        heapq.heappush(self._queue, (priority, next(self._sequence), ieee, future))
+        self._dispatch()
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # the slot was granted before the request got cancelled
+                self._release(ieee)
+            raise
+
+    def _release(self, ieee):
+        """Free the slot of a finished request."""
+        self._in_flight -= 1
+        self._device_in_flight[ieee] -= 1
+        if not self._device_in_flight[ieee]:
+            del self._device_in_flight[ieee]
+        self._dispatch()
+
+    def _dispatch(self):
+        """Grant slots to queued requests in priority order."""
+        blocked = []
+
+        while self._queue and self._in_flight < self.max_in_flight:
+            entry = heapq.heappop(self._queue)
+            _, _, ieee, future = entry
+            if future.cancelled():
+                continue
+            if self._device_in_flight[ieee] >= self.max_in_flight_per_device:
+                blocked.append(entry)
+                continue
+
+            self._in_flight += 1
+            self._device_in_flight[ieee] += 1
+            future.set_result(None)
+
+        for entry in blocked:
+            heapq.heappush(self._queue, entry)
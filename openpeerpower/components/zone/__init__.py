@@ -1,6 +1,8 @@
 """Support for the definition of zones."""
+from collections import OrderedDict
 import logging
-from typing import Dict, List, Optional, cast
+import math
+from typing import Dict, Iterable, List, Optional, Tuple, cast
 
 import voluptuous as vol
 
@@ -17,6 +19,7 @@ from openpeerpower.const import (
     CONF_NAME,
     CONF_RADIUS,
     EVENT_CORE_CONFIG_UPDATE,
+    EVENT_STATE_CHANGED,
     SERVICE_RELOAD,
 )
 from openpeerpower.core import Event, OpenPeerPower, ServiceCall, State, callback
@@ -41,6 +44,19 @@ DEFAULT_RADIUS = 100
 
 ENTITY_ID_FORMAT = "zone.{}"
 ENTITY_ID_HOME = ENTITY_ID_FORMAT.format(HOME_ZONE)
+ZONE_PREFIX = ENTITY_ID_FORMAT.format("")
+
+DATA_ZONE_INDEX = "zone_index"
+# Size of the cells of the zone index grid in degrees
+INDEX_CELL_SIZE = 0.1
+# Zones covering more cells are checked for every position
+MAX_INDEX_CELLS = 400
+# Zones closer to the poles are checked for every position
+MAX_INDEX_LATITUDE = 85
+# Lower bound of the meters per degree of latitude, so bounding boxes are
+# never too small
+METERS_PER_DEGREE = 110000
+ACTIVE_ZONE_CACHE_SIZE = 128
 
 ICON_HOME = "mdi:home"
 ICON_IMPORT = "mdi:import"
@@ -83,19 +99,33 @@ def async_active_zone(
 
     This method must be run in the event loop.
     """
+    index: Optional[ZoneIndex] = opp.data.get(DATA_ZONE_INDEX)
+
+    if index is not None:
+        return index.async_active_zone(latitude, longitude, radius)
+
     # Sort entity IDs so that we are deterministic if equal distance to 2 zones
     zones = (
         cast(State, opp.states.get(entity_id))
         for entity_id in sorted(opp.states.async_entity_ids(DOMAIN))
     )
 
+    return _closest_zone(
+        (zone for zone in zones if not zone.attributes.get(ATTR_PASSIVE)),
+        latitude,
+        longitude,
+        radius,
+    )
+
+
+def _closest_zone(
+    zones: Iterable[State], latitude: float, longitude: float, radius: float
+) -> Optional[State]:
+    """Return the closest zone that contains the position."""
     min_dist = None
     closest = None
 
     for zone in zones:
-        if zone.attributes.get(ATTR_PASSIVE):
-            continue
-
         zone_dist = distance(
             latitude,
             longitude,
@@ -121,6 +151,155 @@ def async_active_zone(
     return closest
 
 
+def _cell_range(
+    latitude: Optional[float], longitude: Optional[float], radius: float
+) -> Optional[Tuple[int, int, int, int]]:
+    """Return the grid cells covered by a circle.
+
+    Return None if the circle can't be bounded, e.g. near the poles or the
+    antimeridian.
+    """
+    if latitude is None or longitude is None or not radius >= 0:
+        return None
+
+    lat_delta = radius / METERS_PER_DEGREE
+    lat_min = latitude - lat_delta
+    lat_max = latitude + lat_delta
+
+    if lat_min < -MAX_INDEX_LATITUDE or lat_max > MAX_INDEX_LATITUDE:
+        return None
+
+    lon_delta = lat_delta / math.cos(math.radians(max(-lat_min, lat_max)))
+    lon_min = longitude - lon_delta
+    lon_max = longitude + lon_delta
+
+    if lon_min < -180 or lon_max > 180:
+        return None
+
+    return (
+        math.floor(lat_min / INDEX_CELL_SIZE),
+        math.floor(lat_max / INDEX_CELL_SIZE),
+        math.floor(lon_min / INDEX_CELL_SIZE),
+        math.floor(lon_max / INDEX_CELL_SIZE),
+    )
+
+
+def _cell_count(cells: Tuple[int, int, int, int]) -> int:
+    """Return the number of cells in a cell range."""
+    return (cells[1] - cells[0] + 1) * (cells[3] - cells[2] + 1)
+
+
+class ZoneIndex:
+    """Spatial index of the active zones.
+
+    Zones are put in the cells of a grid that their bounding box covers, so
+    a lookup only computes the exact distance to zones near the position.
+    The index is rebuilt on the next lookup after a zone changed. Results
+    of repeated lookups of the same position, e.g. a phone sitting at home,
+    are cached.
+    """
+
+    def __init__(self, opp: OpenPeerPower):
+        """Initialize the zone index."""
+        self.opp = opp
+        self._zones: Optional[List[State]] = None
+        self._cells: Dict[Tuple[int, int], List[int]] = {}
+        # Zones that are checked for every position
+        self._wide: List[int] = []
+        self._cache: OrderedDict = OrderedDict()
+
+    @callback
+    def async_invalidate(self) -> None:
+        """Rebuild the index on the next lookup."""
+        self._zones = None
+        self._cells = {}
+        self._wide = []
+        self._cache.clear()
+
+    @callback
+    def async_state_changed(self, event: Event) -> None:
+        """Invalidate the index when a zone changed."""
+        if event.data["entity_id"].startswith(ZONE_PREFIX):
+            self.async_invalidate()
+
+    @callback
+    def _async_build(self) -> List[State]:
+        """Build the index from the zone states."""
+        zones: List[State] = []
+        cells: Dict[Tuple[int, int], List[int]] = {}
+        wide: List[int] = []
+
+        # Sort entity IDs so that we are deterministic if equal distance to 2 zones
+        for entity_id in sorted(self.opp.states.async_entity_ids(DOMAIN)):
+            zone = self.opp.states.get(entity_id)
+
+            if zone is None or zone.attributes.get(ATTR_PASSIVE):
+                continue
+
+            idx = len(zones)
+            zones.append(zone)
+
+            try:
+                zone_cells = _cell_range(
+                    zone.attributes[ATTR_LATITUDE],
+                    zone.attributes[ATTR_LONGITUDE],
+                    zone.attributes[ATTR_RADIUS],
+                )
+            except (KeyError, TypeError):
+                zone_cells = None
+
+            if zone_cells is None or _cell_count(zone_cells) > MAX_INDEX_CELLS:
+                wide.append(idx)
+                continue
+
+            lat_min, lat_max, lon_min, lon_max = zone_cells
+            for lat_cell in range(lat_min, lat_max + 1):
+                for lon_cell in range(lon_min, lon_max + 1):
+                    cells.setdefault((lat_cell, lon_cell), []).append(idx)
+
+        self._zones = zones
+        self._cells = cells
+        self._wide = wide
+        return zones
+
+    @callback
+    def async_active_zone(
+        self, latitude: float, longitude: float, radius: float = 0
+    ) -> Optional[State]:
+        """Find the active zone for given latitude, longitude."""
+        key = (latitude, longitude, radius)
+
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return cast(Optional[State], self._cache[key])
+
+        zones = self._zones
+        if zones is None:
+            zones = self._async_build()
+
+        cells = _cell_range(latitude, longitude, radius)
+
+        if cells is None or _cell_count(cells) > MAX_INDEX_CELLS:
+            candidates: Iterable[int] = range(len(zones))
+        else:
+            found = set(self._wide)
+            lat_min, lat_max, lon_min, lon_max = cells
+            for lat_cell in range(lat_min, lat_max + 1):
+                for lon_cell in range(lon_min, lon_max + 1):
+                    found.update(self._cells.get((lat_cell, lon_cell), ()))
+            candidates = sorted(found)
+
+        closest = _closest_zone(
+            (zones[idx] for idx in candidates), latitude, longitude, radius
+        )
+
+        self._cache[key] = closest
+        if len(self._cache) > ACTIVE_ZONE_CACHE_SIZE:
+            self._cache.popitem(last=False)
+
+        return closest
+
+
 def in_zone(zone: State, latitude: float, longitude: float, radius: float = 0) -> bool:
     """Test if given latitude, longitude is in given zone.
 
@@ -184,12 +363,22 @@ async def async_setup(opp: OpenPeerPower, config: Dict) -> bool:
     component = entity_component.EntityComponent(_LOGGER, DOMAIN, opp)
     id_manager = collection.IDManager()
 
+    index = opp.data[DATA_ZONE_INDEX] = ZoneIndex(opp)
+    opp.bus.async_listen(EVENT_STATE_CHANGED, index.async_state_changed)
+
+    async def _invalidate_index(
+        change_type: str, item_id: str, config: Optional[Dict]
+    ) -> None:
+        """Invalidate the zone index when a zone changed."""
+        index.async_invalidate()
+
     yaml_collection = IDLessCollection(
         logging.getLogger(f"{__name__}.yaml_collection"), id_manager
     )
     collection.attach_entity_component_collection(
         component, yaml_collection, lambda conf: Zone(conf, False)
     )
+    yaml_collection.async_add_listener(_invalidate_index)
 
     storage_collection = ZoneStorageCollection(
         storage.Store(opp, STORAGE_VERSION, STORAGE_KEY),
@@ -199,6 +388,7 @@ async def async_setup(opp: OpenPeerPower, config: Dict) -> bool:
     collection.attach_entity_component_collection(
         component, storage_collection, lambda conf: Zone(conf, True)
     )
+    storage_collection.async_add_listener(_invalidate_index)
 
     if DOMAIN in config:
         await yaml_collection.async_load(config[DOMAIN])
@@ -251,6 +441,7 @@ async def async_setup(opp: OpenPeerPower, config: Dict) -> bool:
     async def core_config_updated(_: Event) -> None:
         """Handle core config updated."""
         await home_zone.async_update_config(_home_conf(opp))
+        index.async_invalidate()
 
     opp.bus.async_listen(EVENT_CORE_CONFIG_UPDATE, core_config_updated)
 
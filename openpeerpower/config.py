@@ -1,6 +1,7 @@
 """Module to help with parsing and generating configuration files."""
 # pylint: disable=no-name-in-module
 from collections import OrderedDict
+from copy import deepcopy
 from distutils.version import LooseVersion  # pylint: disable=import-error
 import logging
 import os
@@ -53,7 +54,7 @@ from openpeerpower.requirements import (
 )
 from openpeerpower.util.package import is_docker_env
 from openpeerpower.util.unit_system import IMPERIAL_SYSTEM, METRIC_SYSTEM
-from openpeerpower.util.yaml import SECRET_YAML, load_yaml
+from openpeerpower.util.yaml import SECRET_YAML, YamlCache, load_yaml
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -64,6 +65,9 @@ YAML_CONFIG_FILE = "configuration.yaml"
 VERSION_FILE = ".OP_VERSION"
 CONFIG_DIR_NAME = ".openpeerpower"
 DATA_CUSTOMIZE = "opp_customize"
+DATA_YAML_CACHE = "config_yaml_cache"
+DATA_VALIDATED_CONFIG = "config_validated"
+YAML_CACHE_FILE = ".yaml_cache"
 
 GROUP_CONFIG_PATH = "groups.yaml"
 AUTOMATION_CONFIG_PATH = "automations.yaml"
@@ -293,23 +297,32 @@ async def async_opp_config_yaml(opp: OpenPeerPower) -> Dict:
     This function allow a component inside the asyncio loop to reload its
     configuration by itself. Include package merge.
     """
+    cache = opp.data.get(DATA_YAML_CACHE)
+    if cache is None:
+        cache = opp.data[DATA_YAML_CACHE] = YamlCache(opp.config.path(YAML_CACHE_FILE))
+
     # Not using async_add_executor_job because this is an internal method.
     config = await opp.loop.run_in_executor(
-        None, load_yaml_config_file, opp.config.path(YAML_CONFIG_FILE)
+        None, load_yaml_config_file, opp.config.path(YAML_CONFIG_FILE), cache
     )
     core_config = config.get(CONF_CORE, {})
     await merge_packages_config(opp, config, core_config.get(CONF_PACKAGES, {}))
     return config
 
 
-def load_yaml_config_file(config_path: str) -> Dict[Any, Any]:
+def load_yaml_config_file(
+    config_path: str, cache: Optional[YamlCache] = None
+) -> Dict[Any, Any]:
     """Parse a YAML configuration file.
 
     Raises FileNotFoundError or OpenPeerPowerError.
 
     This method needs to run in an executor.
     """
-    conf_dict = load_yaml(config_path)
+    if cache is None:
+        conf_dict = load_yaml(config_path)
+    else:
+        conf_dict = cache.load(config_path)
 
     if not isinstance(conf_dict, dict):
         msg = "The configuration file {} does not contain a dictionary".format(
@@ -693,9 +706,19 @@ async def async_process_component_config(
             return None
 
     # No custom config validator, proceed with schema validation
+    domain_keys = extract_domain_configs(config, domain)
+    validated_part = _async_get_validated(opp, integration, config, domain_keys)
+
     if hasattr(component, "CONFIG_SCHEMA"):
+        if validated_part is not None:
+            result = {
+                key: value for key, value in config.items() if key not in domain_keys
+            }
+            result.update(validated_part)
+            return result
+
         try:
-            return component.CONFIG_SCHEMA(config)  # type: ignore
+            result = component.CONFIG_SCHEMA(config)  # type: ignore
         except vol.Invalid as ex:
             async_log_exception(ex, domain, config, opp, integration.documentation)
             return None
@@ -703,6 +726,27 @@ async def async_process_component_config(
             _LOGGER.exception("Unknown error calling %s CONFIG_SCHEMA", domain)
             return None
 
+        # Only cache the result if the configuration of other domains was
+        # passed through unchanged, the cached part is added back to it.
+        if all(
+            result.get(key) is value
+            for key, value in config.items()
+            if key not in domain_keys
+        ):
+            _async_set_validated(
+                opp,
+                integration,
+                config,
+                domain_keys,
+                {
+                    key: value
+                    for key, value in result.items()
+                    if key in domain_keys or key not in config
+                },
+            )
+
+        return result
+
     component_platform_schema = getattr(
         component, "PLATFORM_SCHEMA_BASE", getattr(component, "PLATFORM_SCHEMA", None)
     )
@@ -710,13 +754,20 @@ async def async_process_component_config(
     if component_platform_schema is None:
         return config
 
+    if validated_part is not None:
+        config = config_without_domain(config, domain)
+        config[domain] = validated_part
+        return config
+
     platforms = []
+    valid = True
     for p_name, p_config in config_per_platform(config, domain):
         # Validate component specific platform schema
         try:
             p_validated = component_platform_schema(p_config)
         except vol.Invalid as ex:
             async_log_exception(ex, domain, p_config, opp, integration.documentation)
+            valid = False
             continue
         except Exception:  # pylint: disable=broad-except
             _LOGGER.exception(
@@ -724,6 +775,7 @@ async def async_process_component_config(
                 p_name,
                 domain,
             )
+            valid = False
             continue
 
         # Not all platform components follow same pattern for platforms
@@ -737,12 +789,14 @@ async def async_process_component_config(
             p_integration = await async_get_integration_with_requirements(opp, p_name)
         except (RequirementsNotFound, IntegrationNotFound) as ex:
             _LOGGER.error("Platform error: %s - %s", domain, ex)
+            valid = False
             continue
 
         try:
             platform = p_integration.get_platform(domain)
         except ImportError:
             _LOGGER.exception("Platform error: %s", domain)
+            valid = False
             continue
 
         # Validate platform specific schema
@@ -757,6 +811,7 @@ async def async_process_component_config(
                     opp,
                     p_integration.documentation,
                 )
+                valid = False
                 continue
             except Exception:  # pylint: disable=broad-except
                 _LOGGER.exception(
@@ -764,10 +819,15 @@ async def async_process_component_config(
                     p_name,
                     domain,
                 )
+                valid = False
                 continue
 
         platforms.append(p_validated)
 
+    # Errors are not cached so they are logged again on the next validation
+    if valid:
+        _async_set_validated(opp, integration, config, domain_keys, platforms)
+
     # Create a copy of the configuration with all config for current
     # component removed and add validated config back in.
     config = config_without_domain(config, domain)
@@ -776,6 +836,49 @@ async def async_process_component_config(
     return config
 
 
+@callback
+def _async_get_validated(
+    opp: OpenPeerPower, integration: Integration, config: Dict, domain_keys: Sequence
+) -> Any:
+    """Return a copy of the cached validated config of an integration.
+
+    Returns None if the configuration of the integration changed since it was
+    validated.
+    """
+    cached = opp.data.get(DATA_VALIDATED_CONFIG, {}).get(integration.domain)
+
+    if (
+        cached is None
+        or cached[0] is not integration
+        or cached[1] != {key: config[key] for key in domain_keys}
+    ):
+        return None
+
+    return deepcopy(cached[2])
+
+
+@callback
+def _async_set_validated(
+    opp: OpenPeerPower,
+    integration: Integration,
+    config: Dict,
+    domain_keys: Sequence,
+    validated: Any,
+) -> None:
+    """Cache the validated config of an integration."""
+    cache = opp.data.setdefault(DATA_VALIDATED_CONFIG, {})
+
+    try:
+        cache[integration.domain] = (
+            integration,
+            deepcopy({key: config[key] for key in domain_keys}),
+            deepcopy(validated),
+        )
+    except Exception:  # pylint: disable=broad-except
+        # Not all validated values can be copied
+        cache.pop(integration.domain, None)
+
+
 @callback
 def config_without_domain(config: Dict, domain: str) -> Dict:
     """Return a config with all configuration for a domain removed."""
@@ -827,8 +827,37 @@ class StateMachine:
     def __init__(self, bus: EventBus, loop: asyncio.events.AbstractEventLoop) -> None:
         """Initialize state machine."""
         self._states: Dict[str, State] = {}
+        # Domain -> entity id -> state, in the order the entities were added
+        self._domain_index: Dict[str, Dict[str, State]] = {}
         self._bus = bus
         self._loop = loop
+        self._generation = 0
+        # Domain -> generation of the last change within the domain
+        self._domain_generations: Dict[str, int] = {}
+
+    @property
+    def generation(self) -> int:
+        """Return a number that is increased with every change of the states.
+
+        Async friendly.
+        """
+        return self._generation
+
+    def domain_generation(self, domain: str) -> int:
+        """Return a number that is increased with every change in a domain.
+
+        The number only changes when a state of the domain changes. It is 0
+        if no state of the domain was ever set.
+
+        Async friendly.
+        """
+        return self._domain_generations.get(domain.lower(), 0)
+
+    @callback
+    def _async_changed(self, domain: str) -> None:
+        """Increase the generations after a change in a domain."""
+        self._generation += 1
+        self._domain_generations[domain] = self._generation
 
     def entity_ids(self, domain_filter: Optional[str] = None) -> List[str]:
         """List of entity ids that are being tracked."""
@@ -846,27 +875,24 @@ class StateMachine:
         if domain_filter is None:
             return list(self._states.keys())
 
-        domain_filter = domain_filter.lower()
+        return list(self._domain_index.get(domain_filter.lower(), ()))
 
-        return [
-            state.entity_id
-            for state in self._states.values()
-            if state.domain == domain_filter
-        ]
-
-    def all(self) -> List[State]:
+    def all(self, domain_filter: Optional[str] = None) -> List[State]:
         """Create a list of all states."""
         return run_callback_threadsafe(  # type: ignore
-            self._loop, self.async_all
+            self._loop, self.async_all, domain_filter
         ).result()
 
     @callback
-    def async_all(self) -> List[State]:
-        """Create a list of all states.
+    def async_all(self, domain_filter: Optional[str] = None) -> List[State]:
+        """Create a list of all states, optionally of a single domain.
 
         This method must be run in the event loop.
         """
-        return list(self._states.values())
+        if domain_filter is None:
+            return list(self._states.values())
+
+        return list(self._domain_index.get(domain_filter.lower(), {}).values())
 
     def get(self, entity_id: str) -> Optional[State]:
         """Retrieve state of entity_id or None if not found.
@@ -906,6 +932,13 @@ class StateMachine:
         if old_state is None:
             return False
 
+        domain = split_entity_id(entity_id)[0]
+        domain_states = self._domain_index[domain]
+        del domain_states[entity_id]
+        if not domain_states:
+            del self._domain_index[domain]
+        self._async_changed(domain)
+
         self._bus.async_fire(
             EVENT_STATE_CHANGED,
             {"entity_id": entity_id, "old_state": old_state, "new_state": None},
@@ -976,6 +1009,9 @@ class StateMachine:
 
         state = State(entity_id, new_state, attributes, last_changed, None, context)
         self._states[entity_id] = state
+        domain = split_entity_id(entity_id)[0]
+        self._domain_index.setdefault(domain, {})[entity_id] = state
+        self._async_changed(domain)
         self._bus.async_fire(
             EVENT_STATE_CHANGED,
             {"entity_id": entity_id, "old_state": old_state, "new_state": state},
@@ -5,7 +5,19 @@ from datetime import datetime, timedelta
 import functools as ft
 import logging
 import sys
-from typing import Callable, Container, Optional, Set, Union, cast
+from time import perf_counter
+from typing import (
+    Any,
+    Callable,
+    Container,
+    Dict,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+    cast,
+)
 
 from openpeerpower.components import zone as zone_cmp
 from openpeerpower.components.device_automation import (
@@ -48,6 +60,20 @@ ASYNC_FROM_CONFIG_FORMAT = "async_{}_from_config"
 _LOGGER = logging.getLogger(__name__)
 
 ConditionCheckerType = Callable[[OpenPeerPower, TemplateVarsType], bool]
+CompiledCheckType = Callable[[TemplateVarsType], bool]
+
+# Relative cost of evaluating a condition. Compiled and/or conditions
+# evaluate the cheapest conditions first.
+CONDITION_COSTS = {
+    "state": 1,
+    "numeric_state": 2,
+    "time": 2,
+    "zone": 3,
+    "sun": 5,
+    "device": 5,
+    "template": 10,
+}
+DEFAULT_CONDITION_COST = 5
 
 
 async def async_from_config(
@@ -507,6 +533,176 @@ async def async_device_from_config(
     )
 
 
+class CompiledCondition:
+    """A list of conditions compiled into a single check.
+
+    Nested and/or conditions are flattened and their conditions are
+    evaluated from cheapest to most expensive, stopping as soon as the
+    result is known. A condition that raises counts as not passed.
+    """
+
+    def __init__(self, check: CompiledCheckType, config: List[ConfigType]):
+        """Initialize the compiled condition."""
+        self._check = check
+        self.config = config
+        self.evaluations = 0
+        self.passed = 0
+        self.time_total = 0.0
+        self.time_max = 0.0
+
+    def __call__(self, variables: TemplateVarsType = None) -> bool:
+        """Test the conditions."""
+        start = perf_counter()
+        try:
+            result = self._check(variables)
+        except Exception as ex:  # pylint: disable=broad-except
+            _LOGGER.warning("Error during condition: %s", ex)
+            result = False
+
+        duration = perf_counter() - start
+        self.evaluations += 1
+        self.time_total += duration
+        self.time_max = max(self.time_max, duration)
+        if result:
+            self.passed += 1
+
+        return result
+
+    @property
+    def metrics(self) -> Dict[str, Any]:
+        """Return evaluation counters and timings."""
+        return {
+            "evaluations": self.evaluations,
+            "passed": self.passed,
+            "time_avg": self.time_total / self.evaluations if self.evaluations else 0.0,
+            "time_max": self.time_max,
+        }
+
+
+async def async_compile(
+    opp: OpenPeerPower, configs: List[ConfigType]
+) -> CompiledCondition:
+    """Compile validated condition configs that all need to pass.
+
+    Should be run on the event loop.
+    """
+    config = _flatten({CONF_CONDITION: "and", "conditions": configs})
+    check, _ = await _async_compile_config(opp, config)
+    return CompiledCondition(check, configs)
+
+
+def _flatten(config: ConfigType) -> ConfigType:
+    """Merge and/or conditions into parents of the same kind."""
+    kind = config[CONF_CONDITION]
+
+    if kind not in ("and", "or"):
+        return config
+
+    conditions = []
+    for sub_config in config["conditions"]:
+        sub_config = _flatten(sub_config)
+        if sub_config[CONF_CONDITION] == kind:
+            conditions.extend(sub_config["conditions"])
+        else:
+            conditions.append(sub_config)
+
+    if len(conditions) == 1:
+        return conditions[0]
+
+    return {CONF_CONDITION: kind, "conditions": conditions}
+
+
+async def _async_compile_config(
+    opp: OpenPeerPower, config: ConfigType
+) -> Tuple[CompiledCheckType, int]:
+    """Compile a condition config into a check and its estimated cost."""
+    kind = config[CONF_CONDITION]
+
+    if kind in ("and", "or"):
+        compiled = [
+            await _async_compile_config(opp, sub_config)
+            for sub_config in config["conditions"]
+        ]
+        compiled.sort(key=lambda item: item[1])
+        checks = tuple(check for check, _ in compiled)
+        cost = sum(cost for _, cost in compiled)
+
+        if kind == "and":
+            return _compile_and(checks), cost
+        return _compile_or(checks), cost
+
+    cost = CONDITION_COSTS.get(kind, DEFAULT_CONDITION_COST)
+
+    if kind == "numeric_state" and config.get(CONF_VALUE_TEMPLATE) is None:
+        return _compile_numeric_state(opp, config), cost
+
+    value_template = config.get(CONF_VALUE_TEMPLATE)
+    if value_template is not None:
+        value_template.opp = opp
+
+    checker = await async_from_config(opp, config, False)
+
+    def check(variables: TemplateVarsType) -> bool:
+        """Test the condition."""
+        return checker(opp, variables)
+
+    return check, cost
+
+
+def _compile_and(checks: Tuple[CompiledCheckType, ...]) -> CompiledCheckType:
+    """Compile checks that all need to pass."""
+
+    def and_check(variables: TemplateVarsType) -> bool:
+        """Test and condition."""
+        for check in checks:
+            if not check(variables):
+                return False
+        return True
+
+    return and_check
+
+
+def _compile_or(checks: Tuple[CompiledCheckType, ...]) -> CompiledCheckType:
+    """Compile checks of which one needs to pass."""
+
+    def or_check(variables: TemplateVarsType) -> bool:
+        """Test or condition."""
+        for check in checks:
+            try:
+                if check(variables):
+                    return True
+            except Exception as ex:  # pylint: disable=broad-except
+                _LOGGER.warning("Error during or-condition: %s", ex)
+        return False
+
+    return or_check
+
+
+def _compile_numeric_state(opp: OpenPeerPower, config: ConfigType) -> CompiledCheckType:
+    """Compile a numeric state condition without value template."""
+    entity_id = config[CONF_ENTITY_ID]
+    below = config.get(CONF_BELOW)
+    above = config.get(CONF_ABOVE)
+    states_get = opp.states.get
+    # The last state and its result, a state only gets parsed once
+    last: List[Any] = [None, False]
+
+    def numeric_state_check(variables: TemplateVarsType) -> bool:
+        """Test numeric state condition."""
+        entity = states_get(entity_id)
+
+        if entity is None:
+            return False
+
+        if entity is not last[0]:
+            last[0] = entity
+            last[1] = async_numeric_state(opp, entity, below, above)
+
+        return cast(bool, last[1])
+
+    return numeric_state_check
+
+
 async def async_validate_condition_config(
     opp: OpenPeerPower, config: ConfigType
 ) -> ConfigType:
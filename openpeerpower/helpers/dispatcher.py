@@ -1,8 +1,9 @@
 """Helpers for Open Peer Power dispatcher & internal component/platform."""
+from functools import partial
 import logging
-from typing import Any, Callable
+from typing import Any, Callable, Dict, List, Tuple
 
-from openpeerpower.core import callback
+from openpeerpower.core import callback, is_callback
 from openpeerpower.loader import bind_opp
 from openpeerpower.util.async_ import run_callback_threadsafe
 from openpeerpower.util.logging import catch_log_exception
@@ -12,6 +13,97 @@ from .typing import OpenPeerPowerType
 _LOGGER = logging.getLogger(__name__)
 DATA_DISPATCHER = "dispatcher"
 
+# A target is stored as the exception-catching wrapper and whether it is a
+# callback that can be scheduled on the event loop without further checks.
+_TargetType = Tuple[Callable[..., Any], bool]
+
+
+def _format_err(signal: str, target: Callable[..., Any], *args: Any) -> str:
+    """Format the error message for an exception raised by a target."""
+    return "Exception in {} when dispatching '{}': {}".format(
+        target.__name__, signal, args
+    )
+
+
+class Dispatcher:
+    """Keep track of the targets connected to each signal.
+
+    Sending iterates an immutable snapshot of the targets for a signal, which
+    is only rebuilt when a target connects or disconnects. Send counts are only
+    kept for signals that have targets connected.
+    """
+
+    def __init__(self, opp: OpenPeerPowerType) -> None:
+        """Initialize the dispatcher."""
+        self.opp = opp
+        self._targets: Dict[str, List[_TargetType]] = {}
+        self._snapshots: Dict[str, Tuple[_TargetType, ...]] = {}
+        self.signal_counts: Dict[str, int] = {}
+
+    @callback
+    def async_connect(
+        self, signal: str, target: Callable[..., Any]
+    ) -> Callable[[], None]:
+        """Connect a callable function to a signal."""
+        # Check for partials to properly determine if callback
+        check_target = target
+        while isinstance(check_target, partial):
+            check_target = check_target.func
+
+        entry = (
+            catch_log_exception(target, partial(_format_err, signal, target)),
+            is_callback(check_target),
+        )
+        self._targets.setdefault(signal, []).append(entry)
+        self._snapshots[signal] = tuple(self._targets[signal])
+
+        @callback
+        def async_remove_dispatcher() -> None:
+            """Remove signal listener."""
+            try:
+                self._targets[signal].remove(entry)
+            except (KeyError, ValueError):
+                # KeyError is key target listener did not exist
+                # ValueError if listener did not exist within signal
+                _LOGGER.warning("Unable to remove unknown dispatcher %s", target)
+                return
+
+            if self._targets[signal]:
+                self._snapshots[signal] = tuple(self._targets[signal])
+            else:
+                del self._targets[signal]
+                del self._snapshots[signal]
+                self.signal_counts.pop(signal, None)
+
+        return async_remove_dispatcher
+
+    @callback
+    def async_send(self, signal: str, *args: Any) -> None:
+        """Send signal and data to all connected targets."""
+        targets = self._snapshots.get(signal)
+
+        if targets is None:
+            return
+
+        self.signal_counts[signal] = self.signal_counts.get(signal, 0) + 1
+
+        for target, is_callback_target in targets:
+            if is_callback_target:
+                self.opp.loop.call_soon(target, *args)
+            else:
+                self.opp.async_add_job(target, *args)
+
+
+@callback
+def _async_get_dispatcher(opp: OpenPeerPowerType) -> Dispatcher:
+    """Return the dispatcher, creating it on first use."""
+    dispatcher: Dispatcher = opp.data.get(DATA_DISPATCHER)
+
+    if dispatcher is None:
+        dispatcher = opp.data[DATA_DISPATCHER] = Dispatcher(opp)
+
+    return dispatcher
+
 
 @bind_opp
 def dispatcher_connect(
@@ -38,32 +130,7 @@ def async_dispatcher_connect(
 
     This method must be run in the event loop.
     """
-    if DATA_DISPATCHER not in opp.data:
-        opp.data[DATA_DISPATCHER] = {}
-
-    if signal not in opp.data[DATA_DISPATCHER]:
-        opp.data[DATA_DISPATCHER][signal] = []
-
-    wrapped_target = catch_log_exception(
-        target,
-        lambda *args: "Exception in {} when dispatching '{}': {}".format(
-            target.__name__, signal, args
-        ),
-    )
-
-    opp.data[DATA_DISPATCHER][signal].append(wrapped_target)
-
-    @callback
-    def async_remove_dispatcher() -> None:
-        """Remove signal listener."""
-        try:
-            opp.data[DATA_DISPATCHER][signal].remove(wrapped_target)
-        except (KeyError, ValueError):
-            # KeyError is key target listener did not exist
-            # ValueError if listener did not exist within signal
-            _LOGGER.warning("Unable to remove unknown dispatcher %s", target)
-
-    return async_remove_dispatcher
+    return _async_get_dispatcher(opp).async_connect(signal, target)
 
 
 @bind_opp
@@ -79,7 +146,22 @@ def async_dispatcher_send(opp: OpenPeerPowerType, signal: str, *args: Any) -> No
 
     This method must be run in the event loop.
     """
-    target_list = opp.data.get(DATA_DISPATCHER, {}).get(signal, [])
+    dispatcher: Dispatcher = opp.data.get(DATA_DISPATCHER)
+
+    if dispatcher is not None:
+        dispatcher.async_send(signal, *args)
+
+
+@callback
+@bind_opp
+def async_dispatcher_signal_counts(opp: OpenPeerPowerType) -> Dict[str, int]:
+    """Return how many times each connected signal has been sent, for profiling.
+
+    This method must be run in the event loop.
+    """
+    dispatcher: Dispatcher = opp.data.get(DATA_DISPATCHER)
+
+    if dispatcher is None:
+        return {}
 
-    for target in target_list:
-        opp.async_add_job(target, *args)
+    return dict(dispatcher.signal_counts)
@@ -5,7 +5,8 @@ identified by their domain, platform and a unique id provided by that platform.
 
 The Entity Registry will persist itself 10 seconds after a new entity is
 registered. Registering a new entity while a timer is in progress resets the
-timer.
+timer. Changes are appended to a journal, which is compacted into the
+registry file once it grows too long.
 """
 import asyncio
 from collections import OrderedDict
@@ -105,7 +106,9 @@ class EntityRegistry:
         """Initialize the registry."""
         self.opp = opp
         self.entities: Dict[str, RegistryEntry]
-        self._store = opp.helpers.storage.Store(STORAGE_VERSION, STORAGE_KEY)
+        self._store = opp.helpers.storage.Store(
+            STORAGE_VERSION, STORAGE_KEY, journal_replay=_replay_journal
+        )
         self.opp.bus.async_listen(
             EVENT_DEVICE_REGISTRY_UPDATED, self.async_device_removed
         )
@@ -230,7 +233,7 @@ class EntityRegistry:
         )
         self.entities[entity_id] = entity
         _LOGGER.info("Registered new %s.%s entity: %s", domain, platform, entity_id)
-        self.async_schedule_save()
+        self.async_schedule_save({"set": _entry_as_dict(entity)})
 
         self.opp.bus.async_fire(
             EVENT_ENTITY_REGISTRY_UPDATED, {"action": "create", "entity_id": entity_id}
@@ -245,7 +248,7 @@ class EntityRegistry:
         self.opp.bus.async_fire(
             EVENT_ENTITY_REGISTRY_UPDATED, {"action": "remove", "entity_id": entity_id}
         )
-        self.async_schedule_save()
+        self.async_schedule_save({"remove": entity_id})
 
     @callback
     def async_device_removed(self, event: Event) -> None:
@@ -360,7 +363,12 @@ class EntityRegistry:
 
         new = self.entities[entity_id] = attr.evolve(old, **changes)
 
-        self.async_schedule_save()
+        if old.entity_id != entity_id:
+            self.async_schedule_save(
+                {"remove": old.entity_id}, {"set": _entry_as_dict(new)}
+            )
+        else:
+            self.async_schedule_save({"set": _entry_as_dict(new)})
 
         data = {"action": "update", "entity_id": entity_id, "changes": list(changes)}
 
@@ -405,34 +413,25 @@ class EntityRegistry:
         self.entities = entities
 
     @callback
-    def async_schedule_save(self) -> None:
-        """Schedule saving the entity registry."""
-        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+    def async_schedule_save(self, *deltas: Dict[str, Any]) -> None:
+        """Schedule saving the entity registry.
+
+        Deltas describing the changes are appended to the journal instead of
+        rewriting the registry file.
+        """
+        if not deltas:
+            self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+            return
+
+        for delta in deltas:
+            self._store.async_delay_save_delta(self._data_to_save, delta, SAVE_DELAY)
 
     @callback
     def _data_to_save(self) -> Dict[str, Any]:
         """Return data of entity registry to store in a file."""
         data = {}
 
-        data["entities"] = [
-            {
-                "entity_id": entry.entity_id,
-                "config_entry_id": entry.config_entry_id,
-                "device_id": entry.device_id,
-                "unique_id": entry.unique_id,
-                "platform": entry.platform,
-                "name": entry.name,
-                "icon": entry.icon,
-                "disabled_by": entry.disabled_by,
-                "capabilities": entry.capabilities,
-                "supported_features": entry.supported_features,
-                "device_class": entry.device_class,
-                "unit_of_measurement": entry.unit_of_measurement,
-                "original_name": entry.original_name,
-                "original_icon": entry.original_icon,
-            }
-            for entry in self.entities.values()
-        ]
+        data["entities"] = [_entry_as_dict(entry) for entry in self.entities.values()]
 
         return data
 
@@ -447,6 +446,42 @@ class EntityRegistry:
             self.async_remove(entity_id)
 
 
+def _entry_as_dict(entry: RegistryEntry) -> Dict[str, Any]:
+    """Return the stored representation of a registry entry."""
+    return {
+        "entity_id": entry.entity_id,
+        "config_entry_id": entry.config_entry_id,
+        "device_id": entry.device_id,
+        "unique_id": entry.unique_id,
+        "platform": entry.platform,
+        "name": entry.name,
+        "icon": entry.icon,
+        "disabled_by": entry.disabled_by,
+        "capabilities": entry.capabilities,
+        "supported_features": entry.supported_features,
+        "device_class": entry.device_class,
+        "unit_of_measurement": entry.unit_of_measurement,
+        "original_name": entry.original_name,
+        "original_icon": entry.original_icon,
+    }
+
+
+def _replay_journal(
+    data: Dict[str, Any], deltas: List[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """Apply journaled changes to the stored registry data."""
+    entities = OrderedDict((entity["entity_id"], entity) for entity in data["entities"])
+
+    for delta in deltas:
+        if "remove" in delta:
+            entities.pop(delta["remove"], None)
+        else:
+            entities[delta["set"]["entity_id"]] = delta["set"]
+
+    data["entities"] = list(entities.values())
+    return data
+
+
 @bind_opp
 async def async_get_registry(opp: OpenPeerPowerType) -> EntityRegistry:
     """Return entity registry instance."""
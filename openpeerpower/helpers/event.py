@@ -70,13 +70,13 @@ def async_track_state_change(
     match_from_state = _process_state_match(from_state)
     match_to_state = _process_state_match(to_state)
 
-    # Ensure it is a lowercase list with entity ids we want to match on
+    # Ensure it is a lowercase set with entity ids we want to match on
     if entity_ids == MATCH_ALL:
         pass
     elif isinstance(entity_ids, str):
-        entity_ids = (entity_ids.lower(),)
+        entity_ids = frozenset((entity_ids.lower(),))
     else:
-        entity_ids = tuple(entity_id.lower() for entity_id in entity_ids)
+        entity_ids = frozenset(entity_id.lower() for entity_id in entity_ids)
 
     @callback
     def state_change_listener(event: Event) -> None:
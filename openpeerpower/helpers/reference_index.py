@@ -0,0 +1,85 @@
+"""Reverse index of the entities and devices referenced by other entities."""
+from collections import defaultdict
+from typing import Any, DefaultDict, Dict, Iterable, List, Tuple
+
+from openpeerpower.core import OpenPeerPower, callback
+
+DATA_REFERENCE_INDEX = "reference_index"
+
+
+class ReferenceIndex:
+    """Track which entities reference an entity or a device.
+
+    Owners are the referencing entities, e.g. automations or scripts. They
+    register what they reference when added to Open Peer Power and unregister
+    when removed, so the index follows reloads without rescanning.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the index."""
+        # Owners are keyed by id() because entities are not hashable. The
+        # dicts keep the order in which owners were added.
+        self._by_entity: DefaultDict[str, Dict[int, Any]] = defaultdict(dict)
+        self._by_device: DefaultDict[str, Dict[int, Any]] = defaultdict(dict)
+        self._owners: Dict[int, Tuple[Tuple[str, ...], Tuple[str, ...]]] = {}
+
+    @callback
+    def async_set(
+        self, owner: Any, entity_ids: Iterable[str], device_ids: Iterable[str] = ()
+    ) -> None:
+        """Set the entities and devices referenced by an owner."""
+        self.async_remove(owner)
+
+        entity_ids = tuple(entity_ids)
+        device_ids = tuple(device_ids)
+        key = id(owner)
+        self._owners[key] = (entity_ids, device_ids)
+
+        for entity_id in entity_ids:
+            self._by_entity[entity_id][key] = owner
+        for device_id in device_ids:
+            self._by_device[device_id][key] = owner
+
+    @callback
+    def async_remove(self, owner: Any) -> None:
+        """Remove all references of an owner."""
+        key = id(owner)
+        references = self._owners.pop(key, None)
+
+        if references is None:
+            return
+
+        for index, referenced in zip((self._by_entity, self._by_device), references):
+            for item_id in referenced:
+                owners = index[item_id]
+                owners.pop(key, None)
+                if not owners:
+                    del index[item_id]
+
+    @callback
+    def async_with_entity(self, entity_id: str) -> List[str]:
+        """Return the entity ids of the owners that reference an entity."""
+        owners = self._by_entity.get(entity_id)
+        if not owners:
+            return []
+        return [owner.entity_id for owner in owners.values()]
+
+    @callback
+    def async_with_device(self, device_id: str) -> List[str]:
+        """Return the entity ids of the owners that reference a device."""
+        owners = self._by_device.get(device_id)
+        if not owners:
+            return []
+        return [owner.entity_id for owner in owners.values()]
+
+
+@callback
+def async_get_index(opp: OpenPeerPower, domain: str) -> ReferenceIndex:
+    """Return the reference index of a domain."""
+    indexes = opp.data.setdefault(DATA_REFERENCE_INDEX, {})
+
+    index = indexes.get(domain)
+    if index is None:
+        index = indexes[domain] = ReferenceIndex()
+
+    return index
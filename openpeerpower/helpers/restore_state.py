@@ -4,9 +4,14 @@ from datetime import datetime, timedelta
 import logging
 from typing import Any, Awaitable, Dict, List, Optional, Set, cast
 
-from openpeerpower.const import EVENT_OPENPEERPOWER_START, EVENT_OPENPEERPOWER_STOP
+from openpeerpower.const import (
+    EVENT_OPENPEERPOWER_START,
+    EVENT_OPENPEERPOWER_STOP,
+    EVENT_STATE_CHANGED,
+)
 from openpeerpower.core import (
     CoreState,
+    Event,
     OpenPeerPower,
     State,
     callback,
@@ -25,7 +30,7 @@ DATA_RESTORE_STATE_TASK = "restore_state_task"
 _LOGGER = logging.getLogger(__name__)
 
 STORAGE_KEY = "core.restore_state"
-STORAGE_VERSION = 1
+STORAGE_VERSION = 2
 
 # How long between periodically saving the current states to disk
 STATE_DUMP_INTERVAL = timedelta(minutes=15)
@@ -33,6 +38,9 @@ STATE_DUMP_INTERVAL = timedelta(minutes=15)
 # How long should a saved state be preserved if the entity no longer exists
 STATE_EXPIRATION = timedelta(days=7)
 
+# How often the time of the last dump is refreshed if no state changed
+LAST_DUMP_REFRESH = timedelta(days=1)
+
 
 class StoredState:
     """Object to represent a stored state."""
@@ -57,8 +65,35 @@ class StoredState:
         return cls(State.from_dict(json_dict["state"]), last_seen)
 
 
+class RestoreStateStore(Store):
+    """Store for the restore state data."""
+
+    async def _async_migrate_func(self, old_version, old_data):
+        """Migrate the list of stored states to the compact format."""
+        states = {}
+        for item in old_data:
+            state = item["state"]
+            entry = {
+                "state": state["state"],
+                "attributes": state["attributes"],
+                "last_changed": state["last_changed"],
+                "last_seen": item["last_seen"],
+            }
+            if state["last_updated"] != state["last_changed"]:
+                entry["last_updated"] = state["last_updated"]
+            states[state["entity_id"]] = entry
+
+        return {"last_dump": dt_util.utcnow().isoformat(), "states": states}
+
+
 class RestoreStateData:
-    """Helper class for managing the helper saved data."""
+    """Helper class for managing the helper saved data.
+
+    The stored states are kept as compact entries keyed by entity id. Entries
+    of entities that are registered in this run leave out last_seen, which is
+    the time of the last dump for them. Only the first dump of a run writes
+    all entries, later dumps journal the entries of entities that changed.
+    """
 
     @classmethod
     async def async_get_instance(cls, opp: OpenPeerPower) -> "RestoreStateData":
@@ -72,21 +107,22 @@ class RestoreStateData:
                 data = cls(opp)
 
                 try:
-                    stored_states = await data.store.async_load()
+                    stored = await data.store.async_load()
                 except OpenPeerPowerError as exc:
                     _LOGGER.error("Error loading last states", exc_info=exc)
-                    stored_states = None
+                    stored = None
 
-                if stored_states is None:
+                if stored is None:
                     _LOGGER.debug("Not creating cache - no saved states found")
-                    data.last_states = {}
                 else:
-                    data.last_states = {
-                        item["state"]["entity_id"]: StoredState.from_dict(item)
-                        for item in stored_states
-                        if valid_entity_id(item["state"]["entity_id"])
+                    data.last_dump = dt_util.parse_datetime(stored["last_dump"])
+                    data.last_run_dump = data.last_dump
+                    data.last_entries = {
+                        entity_id: entry
+                        for entity_id, entry in stored["states"].items()
+                        if valid_entity_id(entity_id)
                     }
-                    _LOGGER.debug("Created cache with %s", list(data.last_states))
+                    _LOGGER.debug("Created cache with %s", list(data.last_entries))
 
                 if opp.state == CoreState.running:
                     data.async_setup_dump()
@@ -106,64 +142,169 @@ class RestoreStateData:
     def __init__(self, opp: OpenPeerPower) -> None:
         """Initialize the restore state data class."""
         self.opp: OpenPeerPower = opp
-        self.store: Store = Store(
-            opp, STORAGE_VERSION, STORAGE_KEY, encoder=JSONEncoder
+        self.store: Store = RestoreStateStore(
+            opp,
+            STORAGE_VERSION,
+            STORAGE_KEY,
+            encoder=JSONEncoder,
+            journal_replay=_replay_journal,
         )
+        # Decoded states of the previous run and of removed entities
         self.last_states: Dict[str, StoredState] = {}
+        # Entries of the previous run and of removed entities, decoded into
+        # last_states when they are asked for
+        self.last_entries: Dict[str, Dict[str, Any]] = {}
+        self.last_dump: Optional[datetime] = None
+        # Time of the last dump of the previous run, the last time the
+        # entities of last_entries without last_seen were seen
+        self.last_run_dump: Optional[datetime] = None
         self.entity_ids: Set[str] = set()
+        # The entries as stored on disk
+        self._stored: Optional[Dict[str, Dict[str, Any]]] = None
+        # Time after which stored entries of absent entities expire
+        self._expires: Dict[str, datetime] = {}
+        self._dirty: Set[str] = set()
+
+    @callback
+    def async_get_stored_state(self, entity_id: str) -> Optional[StoredState]:
+        """Return the stored state of an entity, decoding it if needed."""
+        stored_state = self.last_states.get(entity_id)
+
+        if stored_state is None and entity_id in self.last_entries:
+            entry = self.last_entries.pop(entity_id)
+            try:
+                stored_state = _entry_as_stored_state(
+                    entity_id, entry, self.last_run_dump
+                )
+            except (KeyError, ValueError, OpenPeerPowerError) as err:
+                _LOGGER.warning("Unable to restore %s: %s", entity_id, err)
+                return None
+            self.last_states[entity_id] = stored_state
+
+        return stored_state
+
+    @callback
+    def _async_current_entry(self, entity_id: str) -> Optional[Dict[str, Any]]:
+        """Return the entry to store for a registered entity."""
+        state = self.opp.states.get(entity_id)
+
+        # Ignore all states that are entity registry placeholders
+        if state is None or state.attributes.get(entity_registry.ATTR_RESTORED):
+            return None
+
+        return _state_as_entry(state)
+
+    @callback
+    def _async_last_entry(self, entity_id: str) -> Optional[Dict[str, Any]]:
+        """Return the entry to store for an entity that is not in this run."""
+        entry = self.last_entries.get(entity_id)
+
+        if entry is not None:
+            if "last_seen" not in entry and self.last_run_dump is not None:
+                entry = dict(entry, last_seen=self.last_run_dump.isoformat())
+            return entry
+
+        stored_state = self.last_states.get(entity_id)
+        if stored_state is None:
+            return None
+        return _state_as_entry(stored_state.state, stored_state.last_seen)
+
+    @callback
+    def _async_entry(self, entity_id: str) -> Optional[Dict[str, Any]]:
+        """Return the entry to store for an entity."""
+        if entity_id in self.entity_ids:
+            entry = self._async_current_entry(entity_id)
+            if entry is not None:
+                return entry
+
+        state = self.opp.states.get(entity_id)
+        # Don't save old states that have entities in the current run
+        if state is not None and not state.attributes.get(
+            entity_registry.ATTR_RESTORED
+        ):
+            return None
+
+        return self._async_last_entry(entity_id)
+
+    @callback
+    def _async_set_entry(self, entity_id: str, entry: Optional[Dict[str, Any]]) -> bool:
+        """Update the stored entry of an entity, return if it changed."""
+        assert self._stored is not None
+        self._expires.pop(entity_id, None)
+
+        if entry is None:
+            return self._stored.pop(entity_id, None) is not None
+
+        if "last_seen" in entry:
+            last_seen = dt_util.parse_datetime(entry["last_seen"])
+            if last_seen is None or last_seen < dt_util.utcnow() - STATE_EXPIRATION:
+                return self._stored.pop(entity_id, None) is not None
+            self._expires[entity_id] = last_seen + STATE_EXPIRATION
+
+        if self._stored.get(entity_id) == entry:
+            return False
+
+        self._stored[entity_id] = entry
+        return True
 
     @callback
-    def async_get_stored_states(self) -> List[StoredState]:
-        """Get the set of states which should be stored.
+    def _data_to_save(self) -> Dict[str, Any]:
+        """Return the data to store."""
+        return {"last_dump": self.last_dump, "states": self._stored}
+
+    async def async_dump_states(self) -> None:
+        """Save the states that changed since the last dump to storage."""
+        if self._stored is None:
+            await self._async_dump_all_states()
+            return
 
-        This includes the states of all registered entities, as well as the
-        stored states from the previous run, which have not been created as
-        entities on this run, and have not expired.
-        """
         now = dt_util.utcnow()
-        all_states = self.opp.states.async_all()
-        # Entities currently backed by an entity object
-        current_entity_ids = set(
-            state.entity_id
-            for state in all_states
-            if not state.attributes.get(entity_registry.ATTR_RESTORED)
-        )
+        changed = {}
+        removed = []
 
-        # Start with the currently registered states
-        stored_states = [
-            StoredState(state, now)
-            for state in all_states
-            if state.entity_id in self.entity_ids and
-            # Ignore all states that are entity registry placeholders
-            not state.attributes.get(entity_registry.ATTR_RESTORED)
+        expired = [
+            entity_id for entity_id, expires in self._expires.items() if expires < now
         ]
-        expiration_time = now - STATE_EXPIRATION
+        dirty, self._dirty = self._dirty, set()
 
-        for entity_id, stored_state in self.last_states.items():
-            # Don't save old states that have entities in the current run
-            # They are either registered and already part of stored_states,
-            # or no longer care about restoring.
-            if entity_id in current_entity_ids:
+        for entity_id in dirty.union(expired):
+            if not self._async_set_entry(entity_id, self._async_entry(entity_id)):
                 continue
+            if entity_id in self._stored:
+                changed[entity_id] = self._stored[entity_id]
+            else:
+                removed.append(entity_id)
 
-            # Don't save old states that have expired
-            if stored_state.last_seen < expiration_time:
-                continue
-
-            stored_states.append(stored_state)
+        if not changed and not removed:
+            if self.last_dump is not None and now - self.last_dump < LAST_DUMP_REFRESH:
+                return
 
-        return stored_states
+        _LOGGER.debug(
+            "Dumping %s changed and %s removed states", len(changed), len(removed)
+        )
+        self.last_dump = now
+        delta = {"last_dump": now, "set": changed, "remove": removed}
+        try:
+            await self.store.async_save_delta(self._data_to_save, delta)
+        except OpenPeerPowerError as exc:
+            _LOGGER.error("Error saving current states", exc_info=exc)
 
-    async def async_dump_states(self) -> None:
-        """Save the current state machine to storage."""
+    async def _async_dump_all_states(self) -> None:
+        """Save the current states and the unexpired last states to storage."""
         _LOGGER.debug("Dumping states")
+        self._stored = {}
+        self._dirty.clear()
+
+        for entity_id in self.entity_ids:
+            self._async_set_entry(entity_id, self._async_current_entry(entity_id))
+
+        for entity_id in set(self.last_entries).union(self.last_states):
+            if entity_id not in self._stored:
+                self._async_set_entry(entity_id, self._async_entry(entity_id))
+
+        self.last_dump = dt_util.utcnow()
         try:
-            await self.store.async_save(
-                [
-                    stored_state.as_dict()
-                    for stored_state in self.async_get_stored_states()
-                ]
-            )
+            await self.store.async_save(self._data_to_save())
         except OpenPeerPowerError as exc:
             _LOGGER.error("Error saving current states", exc_info=exc)
 
@@ -175,6 +316,18 @@ class RestoreStateData:
         def _async_dump_states(*_: Any) -> None:
             self.opp.async_create_task(self.async_dump_states())
 
+        @callback
+        def _async_state_changed(event: Event) -> None:
+            entity_id = event.data["entity_id"]
+            if self._stored is not None and (
+                entity_id in self.entity_ids
+                or entity_id in self._stored
+                or entity_id in self.last_entries
+            ):
+                self._dirty.add(entity_id)
+
+        self.opp.bus.async_listen(EVENT_STATE_CHANGED, _async_state_changed)
+
         # Dump the initial states now. This helps minimize the risk of having
         # old states loaded by overwriting the last states once Open Peer Power
         # has started and the old states have been read.
@@ -190,6 +343,7 @@ class RestoreStateData:
     def async_restore_entity_added(self, entity_id: str) -> None:
         """Store this entity's state when opp is shutdown."""
         self.entity_ids.add(entity_id)
+        self._dirty.add(entity_id)
 
     @callback
     def async_restore_entity_removed(self, entity_id: str) -> None:
@@ -198,14 +352,63 @@ class RestoreStateData:
         # allows us to support state restoration if the entity is removed, then
         # re-added while opp is still running.
         state = self.opp.states.get(entity_id)
-        # To fully mimic all the attribute data types when loaded from storage,
-        # we're going to serialize it to JSON and then re-load it.
-        if state is not None:
-            state = State.from_dict(_encode_complex(state.as_dict()))
         if state is not None:
-            self.last_states[entity_id] = StoredState(state, dt_util.utcnow())
+            # Keep the encoded entry, it has the attribute data types as they
+            # are when loaded from storage.
+            self.last_entries[entity_id] = _state_as_entry(state, dt_util.utcnow())
+            self.last_states.pop(entity_id, None)
 
         self.entity_ids.remove(entity_id)
+        self._dirty.add(entity_id)
+
+
+def _state_as_entry(
+    state: State, last_seen: Optional[datetime] = None
+) -> Dict[str, Any]:
+    """Return the compact entry to store for a state."""
+    entry = {
+        "state": state.state,
+        "attributes": _encode_complex(dict(state.attributes)),
+        "last_changed": state.last_changed.isoformat(),
+    }
+    if state.last_updated != state.last_changed:
+        entry["last_updated"] = state.last_updated.isoformat()
+    if last_seen is not None:
+        entry["last_seen"] = last_seen.isoformat()
+    return entry
+
+
+def _entry_as_stored_state(
+    entity_id: str, entry: Dict[str, Any], last_dump: Optional[datetime]
+) -> StoredState:
+    """Decode a stored entry."""
+    last_changed = dt_util.parse_datetime(entry["last_changed"])
+    last_updated = last_changed
+    if "last_updated" in entry:
+        last_updated = dt_util.parse_datetime(entry["last_updated"])
+    last_seen = last_dump
+    if "last_seen" in entry:
+        last_seen = dt_util.parse_datetime(entry["last_seen"])
+
+    return StoredState(
+        State(
+            entity_id, entry["state"], entry["attributes"], last_changed, last_updated
+        ),
+        cast(datetime, last_seen or dt_util.utcnow()),
+    )
+
+
+def _replay_journal(data: Dict[str, Any], deltas: List[Dict[str, Any]]) -> Dict:
+    """Apply journaled changes to the stored states."""
+    states = data["states"]
+
+    for delta in deltas:
+        data["last_dump"] = delta["last_dump"]
+        states.update(delta["set"])
+        for entity_id in delta["remove"]:
+            states.pop(entity_id, None)
+
+    return data
 
 
 def _encode(value: Any) -> Any:
@@ -262,6 +465,7 @@ class RestoreEntity(Entity):
             _LOGGER.warning("Cannot get last state. Entity not added to opp")
             return None
         data = await RestoreStateData.async_get_instance(self.opp)
-        if self.entity_id not in data.last_states:
+        stored_state = data.async_get_stored_state(self.entity_id)
+        if stored_state is None:
             return None
-        return data.last_states[self.entity_id].state
+        return stored_state.state
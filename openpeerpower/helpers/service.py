@@ -1,8 +1,11 @@
 """Service calling related helpers."""
 import asyncio
+from collections import deque
+from contextvars import ContextVar
 from functools import partial, wraps
 import logging
-from typing import Callable
+import time
+from typing import Callable, Deque, Dict, FrozenSet, List, Optional
 
 import voluptuous as vol
 
@@ -38,6 +41,18 @@ CONF_SERVICE_DATA_TEMPLATE = "data_template"
 _LOGGER = logging.getLogger(__name__)
 
 SERVICE_DESCRIPTION_CACHE = "service_description_cache"
+DATA_SERVICE_CALL_LIMITERS = "service_call_limiters"
+
+# Integrations can set PARALLEL_SERVICE_CALLS to cap the number of concurrent
+# entity service calls, 0 disables the limit.
+DEFAULT_PARALLEL_SERVICE_CALLS = 64
+INITIAL_PARALLEL_SERVICE_CALLS = 8
+# A call is slow if it takes SLOW_CALL_FACTOR times the typical latency
+SLOW_CALL_FACTOR = 4
+# Calls faster than this are never considered slow
+SLOW_CALL_MIN_LATENCY = 0.05
+# Number of calls over which the typical latency is averaged
+LATENCY_WINDOW = 20
 
 
 @bind_opp
@@ -285,7 +300,11 @@ def async_set_service_schema(opp, domain, service, schema):
 async def entity_service_call(opp, platforms, func, call, required_features=None):
     """Handle an entity service call.
 
-    Calls all platforms simultaneously.
+    Calls all platforms simultaneously, limiting the concurrent calls per
+    integration. Platforms that define async_bulk_service_call(opp, entities,
+    func, data) are called once for all their targeted entities.
+
+    Returns the latency in seconds of the call for each entity.
     """
     if call.context.user_id:
         user = await opp.auth.async_get_user(call.context.user_id)
@@ -385,16 +404,47 @@ async def entity_service_call(opp, platforms, func, call, required_features=None
         entities.append(entity)
 
     if not entities:
-        return
+        return {}
+
+    latencies: Dict[str, float] = {}
+    calls = []
 
-    done, pending = await asyncio.wait(
-        [
-            entity.async_request_call(
-                _handle_entity_call(opp, entity, func, data, call.context)
+    for platform, platform_entities in _group_by_platform(entities).items():
+        limiter = _async_get_limiter(opp, platform)
+        bulk_call = getattr(
+            getattr(platform, "platform", None), "async_bulk_service_call", None
+        )
+
+        if asyncio.iscoroutinefunction(bulk_call):
+            calls.append(
+                _async_limited_call(
+                    limiter,
+                    partial(
+                        _handle_bulk_call,
+                        opp,
+                        bulk_call,
+                        platform_entities,
+                        func,
+                        data,
+                        call.context,
+                    ),
+                    platform_entities,
+                    latencies,
+                )
             )
-            for entity in entities
-        ]
-    )
+            continue
+
+        calls.extend(
+            _async_limited_call(
+                limiter,
+                partial(_handle_request_call, opp, entity, func, data, call.context),
+                [entity],
+                latencies,
+            )
+            for entity in platform_entities
+        )
+
+    done, pending = await asyncio.wait(calls)
     assert not pending
     for future in done:
         future.result()  # pop exception if have
@@ -408,7 +458,12 @@ async def entity_service_call(opp, platforms, func, call, required_features=None
         # Context expires if the turn on commands took a long time.
         # Set context again so it's there when we update
         entity.async_set_context(call.context)
-        tasks.append(entity.async_update_op_state(True))
+        tasks.append(
+            _async_limited_call(
+                _async_get_limiter(opp, entity.platform),
+                partial(entity.async_update_op_state, True),
+            )
+        )
 
     if tasks:
         done, pending = await asyncio.wait(tasks)
@@ -416,6 +471,158 @@ async def entity_service_call(opp, platforms, func, call, required_features=None
         for future in done:
             future.result()  # pop exception if have
 
+    return latencies
+
+
+class ServiceCallLimiter:
+    """Adaptive limit for the concurrent service calls to an integration.
+
+    The limit starts at INITIAL_PARALLEL_SERVICE_CALLS and stays between 1 and
+    max_limit. It grows by one after every call that finishes in time and is
+    halved after a call that is slow or fails, so integrations that get
+    overloaded by a burst of calls are backed off.
+    """
+
+    def __init__(self, max_limit: int) -> None:
+        """Initialize the limiter."""
+        self.max_limit = max_limit
+        self.limit = min(INITIAL_PARALLEL_SERVICE_CALLS, max_limit)
+        self.active = 0
+        # Average latency of the calls in seconds
+        self.latency: Optional[float] = None
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    async def async_acquire(self) -> None:
+        """Wait until a call can be made."""
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            return
+
+        waiter = asyncio.get_event_loop().create_future()
+        self._waiters.append(waiter)
+
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # We were handed a slot before we got cancelled
+                self.active -= 1
+                self._async_wake_waiters()
+            elif waiter in self._waiters:
+                # Not yet skipped by a release
+                self._waiters.remove(waiter)
+            raise
+
+    @op.callback
+    def async_release(self, latency: float, failed: bool = False) -> None:
+        """Release a call and adapt the limit to its latency."""
+        if self.latency is None:
+            self.latency = latency
+
+        if failed or (
+            latency > SLOW_CALL_MIN_LATENCY
+            and latency > self.latency * SLOW_CALL_FACTOR
+        ):
+            self.limit = max(1, self.limit // 2)
+        elif self.limit < self.max_limit:
+            self.limit += 1
+
+        self.latency += (latency - self.latency) / LATENCY_WINDOW
+        self.active -= 1
+        self._async_wake_waiters()
+
+    @op.callback
+    def _async_wake_waiters(self) -> None:
+        """Hand the free slots to the waiting calls."""
+        while self._waiters and self.active < self.limit:
+            waiter = self._waiters.popleft()
+            if waiter.done():
+                continue
+            self.active += 1
+            waiter.set_result(None)
+
+
+@op.callback
+def _async_get_limiter(opp, platform) -> Optional[ServiceCallLimiter]:
+    """Return the service call limiter of the integration of a platform."""
+    integration = getattr(platform, "platform_name", None)
+
+    if not isinstance(integration, str):
+        return None
+
+    limiters = opp.data.setdefault(DATA_SERVICE_CALL_LIMITERS, {})
+
+    if integration not in limiters:
+        max_limit = getattr(
+            platform.platform, "PARALLEL_SERVICE_CALLS", DEFAULT_PARALLEL_SERVICE_CALLS
+        )
+        limiters[integration] = ServiceCallLimiter(max_limit) if max_limit else None
+
+    return limiters[integration]
+
+
+def _group_by_platform(entities):
+    """Group entities by their entity platform."""
+    grouped: Dict = {}
+    for entity in entities:
+        grouped.setdefault(entity.platform, []).append(entity)
+    return grouped
+
+
+# Limiters of the calls the current task is running in
+_active_limiters: ContextVar[FrozenSet[ServiceCallLimiter]] = ContextVar(
+    "active_limiters", default=frozenset()
+)
+
+
+async def _async_limited_call(limiter, job, entities=(), latencies=None):
+    """Run a call within the limit and record its latency for the entities.
+
+    Calls made from within a call limited by the same limiter, e.g. a group
+    light calling its member lights, are not limited again. They would
+    otherwise wait for a slot held by their caller.
+    """
+    active = _active_limiters.get()
+
+    if limiter in active:
+        limiter = None
+
+    if limiter is not None:
+        await limiter.async_acquire()
+        token = _active_limiters.set(active | {limiter})
+
+    start = time.monotonic()
+    failed = True
+
+    try:
+        await job()
+        failed = False
+    finally:
+        latency = time.monotonic() - start
+
+        if limiter is not None:
+            _active_limiters.reset(token)
+            limiter.async_release(latency, failed)
+
+        if latencies is not None:
+            for entity in entities:
+                latencies[entity.entity_id] = latency
+
+
+async def _handle_request_call(opp, entity, func, data, context):
+    """Handle calling service method within the parallel updates of the entity."""
+    await entity.async_request_call(
+        _handle_entity_call(opp, entity, func, data, context)
+    )
+
+
+async def _handle_bulk_call(opp, bulk_call, entities: List, func, data, context):
+    """Handle calling a service for many entities of a platform at once."""
+    for entity in entities:
+        entity.async_set_context(context)
+
+    await bulk_call(opp, entities, func, data)
+
 
 async def _handle_entity_call(opp, entity, func, data, context):
     """Handle calling service method."""
@@ -1,5 +1,6 @@
 """Helper to help store data."""
 import asyncio
+import json
 from json import JSONEncoder
 import logging
 import os
@@ -15,6 +16,14 @@ from openpeerpower.util import json as json_util
 # mypy: no-check-untyped-defs
 
 STORAGE_DIR = ".storage"
+JOURNAL_SUFFIX = ".journal"
+# Number of journal entries after which the journal is compacted into the
+# data file on the next save.
+JOURNAL_MAX_ENTRIES = 1000
+# The journal is also compacted once it is larger than the data file, as
+# replaying it would take longer than loading a rewritten data file. Small
+# data files get a journal of up to this many bytes.
+JOURNAL_MIN_SIZE = 64 * 1024
 _LOGGER = logging.getLogger(__name__)
 
 
@@ -54,7 +63,15 @@ async def async_migrator(
 
 @bind_opp
 class Store:
-    """Class to help storing data."""
+    """Class to help storing data.
+
+    If journal_replay is passed, changes saved with async_delay_save_delta are
+    appended to a journal next to the data file instead of rewriting the whole
+    file. The journal is compacted into the data file once it has too many
+    entries or is larger than the data file, or when a full save is requested.
+    On load, the journaled deltas are applied to the stored data with
+    journal_replay(data, deltas).
+    """
 
     def __init__(
         self,
@@ -64,6 +81,7 @@ class Store:
         private: bool = False,
         *,
         encoder: Optional[Type[JSONEncoder]] = None,
+        journal_replay: Optional[Callable[[Any, List[Any]], Any]] = None,
     ):
         """Initialize storage class."""
         self.version = version
@@ -76,12 +94,27 @@ class Store:
         self._write_lock = asyncio.Lock()
         self._load_task: Optional[asyncio.Future] = None
         self._encoder = encoder
+        self._journal_replay = journal_replay
+        # Deltas waiting to be appended, None if a full write is needed
+        self._pending_deltas: Optional[List[Any]] = None
+        # If the data file on disk can be used as base for the journal
+        self._journal_base = False
+        self._journal_seq = 0
+        self._journal_entries = 0
+        # Sizes in bytes of the files on disk
+        self._journal_size = 0
+        self._data_size = 0
 
     @property
     def path(self):
         """Return the config path."""
         return self.opp.config.path(STORAGE_DIR, self.key)
 
+    @property
+    def journal_path(self):
+        """Return the journal path."""
+        return self.path + JOURNAL_SUFFIX
+
     async def async_load(self) -> Union[Dict, List, None]:
         """Load data.
 
@@ -106,6 +139,18 @@ class Store:
             # If we didn't generate data yet, do it now.
             if "data_func" in data:
                 data["data"] = data.pop("data_func")()
+        elif self._journal_replay is not None:
+            data, seq, entries = await self.opp.async_add_executor_job(
+                self._load_journaled_data
+            )
+
+            if data == {}:
+                return None
+
+            self._journal_seq = seq
+            self._journal_entries = entries or 0
+            # Compact on the next save if the journal was damaged
+            self._journal_base = entries is not None
         else:
             data = await self.opp.async_add_executor_job(json_util.load_json, self.path)
 
@@ -125,9 +170,69 @@ class Store:
         self._load_task = None
         return stored
 
+    def _load_journaled_data(self):
+        """Load the data and apply the deltas from the journal.
+
+        Return the data, the last journal sequence number and the number of
+        journal entries. The number of entries is None if the journal ended
+        with an incomplete entry, e.g. after a crash while appending, or
+        contained invalid entries.
+        """
+        data = json_util.load_json(self.path)
+
+        if data == {}:
+            return data, 0, 0
+
+        seq = base_seq = data.pop("journal_seq", 0)
+        deltas = []
+        complete = True
+
+        try:
+            with open(self.journal_path, encoding="utf-8") as fdesc:
+                for line in fdesc:
+                    try:
+                        if not line.endswith("\n"):
+                            raise ValueError("Incomplete entry")
+                        entry = json.loads(line)
+                    except ValueError:
+                        _LOGGER.warning(
+                            "Ignoring incomplete journal entry for %s", self.key
+                        )
+                        complete = False
+                        break
+
+                    entry_seq = entry.get("seq") if isinstance(entry, dict) else None
+                    if not isinstance(entry_seq, int) or "delta" not in entry:
+                        _LOGGER.warning(
+                            "Ignoring invalid journal entry for %s", self.key
+                        )
+                        complete = False
+                        continue
+
+                    # Entries up to base_seq are already in the data file
+                    if entry_seq > base_seq:
+                        seq = entry_seq
+                        deltas.append(entry["delta"])
+        except FileNotFoundError:
+            pass
+
+        self._data_size = os.path.getsize(self.path)
+        self._journal_size = (
+            os.path.getsize(self.journal_path)
+            if os.path.exists(self.journal_path)
+            else 0
+        )
+
+        if deltas:
+            _LOGGER.debug("Replaying %s journal entries for %s", len(deltas), self.key)
+            data["data"] = self._journal_replay(data["data"], deltas)
+
+        return data, seq, len(deltas) if complete else None
+
     async def async_save(self, data: Union[Dict, List]) -> None:
         """Save data."""
         self._data = {"version": self.version, "key": self.key, "data": data}
+        self._pending_deltas = None
 
         self._async_cleanup_delay_listener()
         self._async_cleanup_stop_listener()
@@ -136,6 +241,41 @@ class Store:
     @callback
     def async_delay_save(self, data_func: Callable[[], Dict], delay: float = 0) -> None:
         """Save data with an optional delay."""
+        self._pending_deltas = None
+        self._async_schedule_write(data_func, delay)
+
+    @callback
+    def async_delay_save_delta(
+        self, data_func: Callable[[], Dict], delta: Any, delay: float = 0
+    ) -> None:
+        """Save a change to the data with an optional delay.
+
+        Stores with a journal append the JSON serializable delta to the journal
+        instead of writing the result of data_func to the data file.
+        """
+        if self._journal_replay is None:
+            self.async_delay_save(data_func, delay)
+            return
+
+        if self._data is None:
+            self._pending_deltas = []
+
+        if self._pending_deltas is not None:
+            self._pending_deltas.append(delta)
+
+        self._async_schedule_write(data_func, delay)
+
+    async def async_save_delta(self, data_func: Callable[[], Dict], delta: Any) -> None:
+        """Save a change to the data now."""
+        self.async_delay_save_delta(data_func, delta)
+
+        self._async_cleanup_delay_listener()
+        self._async_cleanup_stop_listener()
+        await self._async_handle_write_data()
+
+    @callback
+    def _async_schedule_write(self, data_func: Callable[[], Dict], delay: float):
+        """Schedule a write of the data returned by data_func."""
         self._data = {"version": self.version, "key": self.key, "data_func": data_func}
 
         self._async_cleanup_delay_listener()
@@ -182,18 +322,71 @@ class Store:
 
     async def _async_handle_write_data(self, *_args):
         """Handle writing the config."""
+        deltas = self._pending_deltas
+        self._pending_deltas = None
         data = self._data
+        self._data = None
+
+        if (
+            deltas is not None
+            and self._journal_base
+            and self._journal_entries + len(deltas) <= JOURNAL_MAX_ENTRIES
+            and self._journal_size < max(self._data_size, JOURNAL_MIN_SIZE)
+            and await self._async_append_journal(deltas)
+        ):
+            return
 
         if "data_func" in data:
             data["data"] = data.pop("data_func")()
 
-        self._data = None
+        if self._journal_replay is not None:
+            data["journal_seq"] = self._journal_seq
 
         async with self._write_lock:
             try:
                 await self.opp.async_add_executor_job(self._write_data, self.path, data)
             except (json_util.SerializationError, json_util.WriteError) as err:
                 _LOGGER.error("Error writing config for %s: %s", self.key, err)
+                return
+
+        self._journal_base = True
+        self._journal_entries = 0
+        self._journal_size = 0
+
+    async def _async_append_journal(self, deltas: List[Any]) -> bool:
+        """Append deltas to the journal.
+
+        Return False if a delta can not be encoded, the data then has to be
+        written in full.
+        """
+        try:
+            lines = [
+                json.dumps(
+                    {"seq": self._journal_seq + seq, "delta": delta},
+                    cls=self._encoder,
+                )
+                for seq, delta in enumerate(deltas, 1)
+            ]
+        except (TypeError, ValueError) as err:
+            _LOGGER.error("Error encoding journal for %s: %s", self.key, err)
+            self._journal_base = False
+            return False
+
+        self._journal_seq += len(lines)
+        self._journal_entries += len(lines)
+        self._journal_size += sum(len(line.encode()) + 1 for line in lines)
+
+        async with self._write_lock:
+            try:
+                await self.opp.async_add_executor_job(
+                    self._write_journal, self.journal_path, lines
+                )
+            except OSError as err:
+                _LOGGER.error("Error writing journal for %s: %s", self.key, err)
+                # Rewrite the data file on the next save
+                self._journal_base = False
+
+        return True
 
     def _write_data(self, path: str, data: Dict) -> None:
         """Write the data."""
@@ -202,6 +395,20 @@ class Store:
 
         _LOGGER.debug("Writing data for %s", self.key)
         json_util.save_json(path, data, self._private, encoder=self._encoder)
+        self._data_size = os.path.getsize(path)
+
+        if self._journal_replay is not None and os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+
+    def _write_journal(self, path: str, lines: List[str]) -> None:
+        """Append lines to the journal and flush them to disk."""
+        _LOGGER.debug("Appending %s journal entries for %s", len(lines), self.key)
+        with open(path, "a", encoding="utf-8") as fdesc:
+            fdesc.write("".join(f"{line}\n" for line in lines))
+            fdesc.flush()
+            os.fsync(fdesc.fileno())
+
+        os.chmod(path, 0o600 if self._private else 0o644)
 
     async def _async_migrate_func(self, old_version, old_data):
         """Migrate to the new version."""
@@ -39,6 +39,7 @@ DATE_STR_FORMAT = "%Y-%m-%d %H:%M:%S"
 
 _RENDER_INFO = "template.render_info"
 _ENVIRONMENT = "template.environment"
+_SORTED_STATES = "template.sorted_states"
 
 _RE_NONE_ENTITIES = re.compile(r"distance\(|closest\(", re.I | re.M)
 _RE_GET_ENTITIES = re.compile(
@@ -341,12 +342,7 @@ class AllStates:
     def __iter__(self):
         """Return all states."""
         self._collect_all()
-        return iter(
-            _wrap_state(self._opp, state)
-            for state in sorted(
-                self._opp.states.async_all(), key=lambda state: state.entity_id
-            )
-        )
+        return iter(_sorted_template_states(self._opp))
 
     def __len__(self):
         """Return number of states."""
@@ -387,16 +383,7 @@ class DomainStates:
     def __iter__(self):
         """Return the iteration over all the states."""
         self._collect_domain()
-        return iter(
-            sorted(
-                (
-                    _wrap_state(self._opp, state)
-                    for state in self._opp.states.async_all()
-                    if state.domain == self._domain
-                ),
-                key=lambda state: state.entity_id,
-            )
-        )
+        return iter(_sorted_template_states(self._opp, self._domain))
 
     def __len__(self) -> int:
         """Return number of states."""
@@ -466,6 +453,31 @@ def _wrap_state(opp, state):
     return None if state is None else TemplateState(opp, state)
 
 
+def _sorted_template_states(opp, domain=None):
+    """Return the wrapped states, optionally of a domain, sorted by entity id.
+
+    The list is reused until the states change.
+    """
+    if domain is None:
+        generation = opp.states.generation
+    else:
+        generation = opp.states.domain_generation(domain)
+
+    cache = opp.data.setdefault(_SORTED_STATES, {})
+    cached = cache.get(domain)
+    if cached is not None and cached[0] == generation:
+        return cached[1]
+
+    states = [
+        TemplateState(opp, state)
+        for state in sorted(
+            opp.states.async_all(domain), key=lambda state: state.entity_id
+        )
+    ]
+    cache[domain] = (generation, states)
+    return states
+
+
 def _get_state(opp, entity_id):
     state = opp.states.get(entity_id)
     if state is None:
@@ -489,6 +501,7 @@ def expand(opp: OpenPeerPowerType, *args: Any) -> Iterable[State]:
     """Expand out any groups into entity states."""
     search = list(args)
     found = {}
+    expanded_groups = set()
     while search:
         entity = search.pop()
         if isinstance(entity, str):
@@ -508,6 +521,10 @@ def expand(opp: OpenPeerPowerType, *args: Any) -> Iterable[State]:
         from openpeerpower.components import group
 
         if split_entity_id(entity_id)[0] == group.DOMAIN:
+            # Groups can contain each other
+            if entity_id in expanded_groups:
+                continue
+            expanded_groups.add(entity_id)
             # Collect state will be called in here since it's wrapped
             group_entities = entity.attributes.get(ATTR_ENTITY_ID)
             if group_entities:
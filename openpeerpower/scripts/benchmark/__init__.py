@@ -4,11 +4,13 @@ import asyncio
 from contextlib import suppress
 from datetime import datetime
 import logging
+import tempfile
 from timeit import default_timer as timer
 from typing import Callable, Dict
 
 from openpeerpower import core
 from openpeerpower.const import ATTR_NOW, EVENT_STATE_CHANGED, EVENT_TIME_CHANGED
+from openpeerpower.helpers import storage
 from openpeerpower.util import dt as dt_util
 
 # mypy: allow-untyped-calls, allow-untyped-defs, no-check-untyped-defs
@@ -138,6 +140,250 @@ async def async_million_state_changed_helper(opp):
     return timer() - start
 
 
+@benchmark
+async def storage_journal_save(opp):
+    """Compare saving a changed entry in full and through the journal."""
+
+    def replay(data, deltas):
+        for delta in deltas:
+            data["entities"][delta["index"]] = delta["entity"]
+        return data
+
+    total = 0
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        opp.config.config_dir = config_dir
+
+        for size in (100, 1000, 10000):
+            data = {
+                "entities": [
+                    {"entity_id": f"sensor.entity_{idx}", "name": None}
+                    for idx in range(size)
+                ]
+            }
+            store = storage.Store(
+                opp, 1, f"benchmark_{size}", journal_replay=replay
+            )
+            await store.async_save(data)
+
+            start = timer()
+            for idx in range(100):
+                data["entities"][idx]["name"] = f"Full {idx}"
+                await store.async_save(data)
+            full = timer() - start
+
+            start = timer()
+            for idx in range(100):
+                data["entities"][idx]["name"] = f"Journal {idx}"
+                store.async_delay_save_delta(
+                    lambda: data, {"index": idx, "entity": data["entities"][idx]}
+                )
+                # Write right away instead of waiting for the delay
+                # pylint: disable=protected-access
+                store._async_cleanup_delay_listener()
+                store._async_cleanup_stop_listener()
+                await store._async_handle_write_data()
+            journal = timer() - start
+
+            print(
+                f"{size} entries: 100 full saves {full:.3f}s, "
+                f"100 journal saves {journal:.3f}s"
+            )
+            total += full + journal
+
+    return total
+
+
+@benchmark
+async def search_related_automations(opp):
+    """Look up the automations related to entities with 1000 automations."""
+    # pylint: disable=import-outside-toplevel
+    from openpeerpower.components import automation
+    from openpeerpower.components.search import Searcher
+    from openpeerpower.helpers import device_registry, entity_registry, script
+    from openpeerpower.helpers.entity_component import EntityComponent
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        opp.config.config_dir = config_dir
+        component = opp.data[automation.DOMAIN] = EntityComponent(
+            logging.getLogger(__name__), automation.DOMAIN, opp
+        )
+
+        entities = []
+        for idx in range(1000):
+            sequence = [
+                {
+                    "service": "light.turn_on",
+                    "data": {"entity_id": f"light.light_{idx % 100}"},
+                }
+            ]
+            entities.append(
+                automation.AutomationEntity(
+                    f"automation_{idx}",
+                    f"Automation {idx}",
+                    [{"platform": "state", "entity_id": f"sensor.sensor_{idx}"}],
+                    None,
+                    script.Script(opp, sequence),
+                    False,
+                    False,
+                )
+            )
+        await component.async_add_entities(entities)
+
+        searcher_args = (
+            opp,
+            await device_registry.async_get_registry(opp),
+            await entity_registry.async_get_registry(opp),
+        )
+
+        start = timer()
+
+        for idx in range(1000):
+            automation.automations_with_entity(opp, f"light.light_{idx % 100}")
+            Searcher(*searcher_args).async_search("entity", f"light.light_{idx % 100}")
+
+        return timer() - start
+
+
+@benchmark
+async def group_state_changes(opp):
+    """Toggle members of groups of different sizes."""
+    # pylint: disable=import-outside-toplevel
+    from openpeerpower.components import group
+
+    total = 0
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        opp.config.config_dir = config_dir
+
+        for size in (10, 100, 1000, 5000):
+            entity_ids = [f"light.group_{size}_{idx}" for idx in range(size)]
+            for entity_id in entity_ids:
+                opp.states.async_set(entity_id, "off")
+
+            await group.Group.async_create_group(opp, f"Group {size}", entity_ids)
+            await opp.async_block_till_done()
+
+            start = timer()
+            # Toggle the same number of members for every group size
+            for _ in range(100):
+                for entity_id in entity_ids[:10]:
+                    opp.states.async_set(entity_id, "on")
+                    await opp.async_block_till_done()
+                    opp.states.async_set(entity_id, "off")
+                    await opp.async_block_till_done()
+            elapsed = timer() - start
+
+            print(f"{size} members: {elapsed:.3f}s")
+            total += elapsed
+
+    return total
+
+
+@benchmark
+async def active_zone_lookups(opp):
+    """Look up the active zone of positions with 300 zones."""
+    # pylint: disable=import-outside-toplevel
+    import random
+    from openpeerpower.components import zone
+    from openpeerpower.setup import async_setup_component
+
+    rand = random.Random(1)
+    zones = [
+        {
+            "name": f"Zone {idx}",
+            "latitude": 52.3 + rand.uniform(-1, 1),
+            "longitude": 4.9 + rand.uniform(-1, 1),
+            "radius": rand.choice((50, 100, 250, 1000)),
+        }
+        for idx in range(300)
+    ]
+    positions = [
+        (52.3 + rand.uniform(-1, 1), 4.9 + rand.uniform(-1, 1), 10)
+        for _ in range(10000)
+    ]
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        opp.config.config_dir = config_dir
+        await async_setup_component(opp, zone.DOMAIN, {zone.DOMAIN: zones})
+        await opp.async_block_till_done()
+
+        start = timer()
+
+        for latitude, longitude, radius in positions:
+            zone.async_active_zone(opp, latitude, longitude, radius)
+
+        return timer() - start
+
+
+@benchmark
+async def entity_service_call_fanout(opp):
+    """Call a service on 1000 entities with and without a bulk handler."""
+    # pylint: disable=import-outside-toplevel
+    from types import SimpleNamespace
+    from openpeerpower.helpers.entity import Entity
+    from openpeerpower.helpers.entity_platform import EntityPlatform
+    from openpeerpower.helpers.service import entity_service_call
+
+    class BenchEntity(Entity):
+        """Entity talking to a hub that handles 10 requests at a time."""
+
+        should_poll = False
+
+        def __init__(self, hub, idx):
+            """Initialize the entity."""
+            self.hub = hub
+            self.entity_id = f"light.bench_{idx}"
+
+        async def async_turn_on(self):
+            """Turn the entity on."""
+            async with self.hub:
+                await asyncio.sleep(0.001)
+
+    async def async_bulk_service_call(opp, entities, func, data):
+        """Turn on all entities with a single hub request."""
+        async with entities[0].hub:
+            await asyncio.sleep(0.001)
+
+    total = 0
+    call = core.ServiceCall("light", "turn_on", {"entity_id": "all"})
+
+    for name, module in (
+        ("per entity", SimpleNamespace()),
+        ("bulk", SimpleNamespace(async_bulk_service_call=async_bulk_service_call)),
+    ):
+        hub = asyncio.Semaphore(10)
+        platform = EntityPlatform(
+            opp=opp,
+            logger=logging.getLogger(__name__),
+            domain="light",
+            platform_name=f"bench_{name.replace(' ', '_')}",
+            platform=module,
+            scan_interval=None,
+            entity_namespace=None,
+        )
+        for idx in range(1000):
+            entity = BenchEntity(hub, idx)
+            entity.opp = opp
+            entity.platform = platform
+            platform.entities[entity.entity_id] = entity
+
+        start = timer()
+        for _ in range(10):
+            latencies = await entity_service_call(
+                opp, [platform], "async_turn_on", call
+            )
+        elapsed = timer() - start
+
+        print(
+            f"{name}: {elapsed:.3f}s, "
+            f"max latency {max(latencies.values()) * 1000:.1f}ms"
+        )
+        total += elapsed
+
+    return total
+
+
 @benchmark
 @asyncio.coroutine
 def logbook_filtering_state(opp):
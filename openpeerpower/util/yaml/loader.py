@@ -1,10 +1,25 @@
 """Custom loader."""
+import base64
 from collections import OrderedDict
+from datetime import date, datetime
 import fnmatch
+import hashlib
+import json
 import logging
 import os
 import sys
-from typing import Dict, Iterator, List, TypeVar, Union, overload
+import threading
+from typing import (
+    Any,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+    overload,
+)
 
 import yaml
 
@@ -32,6 +47,13 @@ DICT_T = TypeVar("DICT_T", bound=Dict)  # pylint: disable=invalid-name
 _LOGGER = logging.getLogger(__name__)
 __SECRET_CACHE: Dict[str, JSON_TYPE] = {}
 
+# Version of the format of persisted YAML caches
+CACHE_VERSION = 2
+# Marks a result that depends on inputs that can't be checked, e.g. keyring
+_UNCACHEABLE = ("uncacheable",)
+# Marks a result that contains values from secrets.yaml
+_SECRET = ("secret",)
+
 
 def clear_secret_cache() -> None:
     """Clear the secret cache.
@@ -53,13 +75,77 @@ class SafeLineLoader(yaml.SafeLoader):
         return node
 
 
-def load_yaml(fname: str) -> JSON_TYPE:
-    """Load a YAML file."""
+try:
+    # pylint: disable=ungrouped-imports
+    from yaml import CSafeLoader
+
+    HAS_C_LOADER = True
+except ImportError:
+    HAS_C_LOADER = False
+
+if HAS_C_LOADER:
+
+    class FastSafeLoader(CSafeLoader):  # type: ignore
+        """Loader class using LibYAML.
+
+        Nodes are not annotated with __line__, the line numbers are taken from
+        the start marks of the nodes instead.
+        """
+
+        def __init__(self, stream: Any) -> None:
+            """Initialize the loader."""
+            super().__init__(stream)
+            self.stream = stream
+            self.name = getattr(stream, "name", "<file>")
+
+
+else:
+    FastSafeLoader = SafeLineLoader  # type: ignore
+
+
+def add_constructor(tag: str, constructor: Any) -> None:
+    """Add a constructor to the loaders used by load_yaml."""
+    yaml.SafeLoader.add_constructor(tag, constructor)
+    if FastSafeLoader is not SafeLineLoader:
+        FastSafeLoader.add_constructor(tag, constructor)
+
+
+def load_yaml(fname: str, cache: Optional["YamlCache"] = None) -> JSON_TYPE:
+    """Load a YAML file.
+
+    If a cache is passed, a previously parsed result is used if the file and
+    everything it includes are unchanged.
+    """
+    if cache is not None:
+        return cache.load(fname)
+
+    return _parse_yaml(fname)[0]
+
+
+def _parse_yaml(
+    fname: str, cache: Optional["YamlCache"] = None
+) -> Tuple[JSON_TYPE, Optional[Dict[Tuple, Any]]]:
+    """Parse a YAML file.
+
+    Returns the parsed content and, if a cache is passed, the inputs the
+    content depends on.
+    """
     try:
         with open(fname, encoding="utf-8") as conf_file:
-            # If configuration file is empty YAML returns None
-            # We convert that to an empty dict
-            return yaml.load(conf_file, Loader=SafeLineLoader) or OrderedDict()
+            deps = None
+            if cache is not None:
+                deps = {("file", fname): _digest(conf_file.read())}
+                conf_file.seek(0)
+
+            loader = FastSafeLoader(conf_file)
+            loader.cache = cache
+            loader.deps = deps
+            try:
+                # If configuration file is empty YAML returns None
+                # We convert that to an empty dict
+                return loader.get_single_data() or OrderedDict(), deps
+            finally:
+                loader.dispose()
     except yaml.YAMLError as exc:
         _LOGGER.error(str(exc))
         raise OpenPeerPowerError(exc)
@@ -68,6 +154,265 @@ def load_yaml(fname: str) -> JSON_TYPE:
         raise OpenPeerPowerError(exc)
 
 
+def _digest(content: str) -> str:
+    """Return a digest of the content of a file."""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def _dependency_value(dependency: Tuple) -> Any:
+    """Return the current value of an input of a parsed YAML file."""
+    kind = dependency[0]
+
+    if kind == "file":
+        try:
+            with open(dependency[1], encoding="utf-8") as fil:
+                return _digest(fil.read())
+        except (OSError, UnicodeDecodeError):
+            return None
+
+    if kind == "dir":
+        return tuple(_find_files(dependency[1], dependency[2]))
+
+    if kind == "env":
+        return os.environ.get(dependency[1])
+
+    if kind == _SECRET[0]:
+        # Only a marker, the secrets.yaml files are inputs themselves
+        return True
+
+    return None
+
+
+def _add_dependency(loader: SafeLineLoader, dependency: Tuple, value: Any) -> None:
+    """Record an input of the file that is being parsed."""
+    deps = getattr(loader, "deps", None)
+    if deps is not None:
+        deps[dependency] = value
+
+
+def _add_file_dependency(loader: SafeLineLoader, fname: str) -> None:
+    """Record a file read by the file that is being parsed."""
+    deps = getattr(loader, "deps", None)
+    dependency = ("file", fname)
+    if deps is not None and dependency not in deps:
+        deps[dependency] = _dependency_value(dependency)
+
+
+def _load_included(loader: SafeLineLoader, fname: str) -> JSON_TYPE:
+    """Load a file included by the file that is being parsed."""
+    cache = getattr(loader, "cache", None)
+    if cache is None:
+        return load_yaml(fname)
+
+    data, deps = cache.load_with_dependencies(fname)
+    loader.deps.update(deps)
+    return data
+
+
+def _encode(obj: Any) -> Any:
+    """Encode parsed YAML as JSON, keeping the types and file references.
+
+    Raises TypeError for values that can't be encoded.
+    """
+    obj_type = type(obj)
+
+    if obj is None or obj_type in (str, int, float, bool):
+        return obj
+
+    if obj_type in _MAPPING_TAGS:
+        encoded = {
+            "t": _MAPPING_TAGS[obj_type],
+            "v": [[_encode(key), _encode(value)] for key, value in obj.items()],
+        }
+    elif obj_type in _SEQUENCE_TAGS:
+        encoded = {
+            "t": _SEQUENCE_TAGS[obj_type],
+            "v": [_encode(value) for value in obj],
+        }
+    elif obj_type is NodeStrClass:
+        encoded = {"t": "nstr", "v": str(obj)}
+    elif obj_type is datetime:
+        encoded = {"t": "datetime", "v": obj.isoformat()}
+    elif obj_type is date:
+        encoded = {"t": "date", "v": obj.isoformat()}
+    elif obj_type is bytes:
+        encoded = {"t": "bytes", "v": base64.b64encode(obj).decode("ascii")}
+    else:
+        raise TypeError(f"Unable to encode {obj_type.__name__}")
+
+    if hasattr(obj, "__config_file__"):
+        encoded["f"] = getattr(obj, "__config_file__")
+        encoded["l"] = getattr(obj, "__line__")
+
+    return encoded
+
+
+def _decode(value: Any) -> Any:
+    """Decode parsed YAML encoded by _encode.
+
+    Raises KeyError, TypeError or ValueError for invalid content.
+    """
+    if not isinstance(value, dict):
+        return value
+
+    tag = value["t"]
+    content = value["v"]
+
+    if tag in _MAPPING_TYPES:
+        obj = _MAPPING_TYPES[tag](
+            (_decode(key), _decode(item)) for key, item in content
+        )
+    elif tag in _SEQUENCE_TYPES:
+        obj = _SEQUENCE_TYPES[tag](_decode(item) for item in content)
+    elif tag == "nstr":
+        obj = NodeStrClass(content)
+    elif tag == "datetime":
+        obj = datetime.fromisoformat(content)
+    elif tag == "date":
+        obj = date.fromisoformat(content)
+    elif tag == "bytes":
+        obj = base64.b64decode(content)
+    else:
+        raise ValueError(f"Unknown tag {tag}")
+
+    if "f" in value:
+        setattr(obj, "__config_file__", value["f"])
+        setattr(obj, "__line__", value["l"])
+
+    return obj
+
+
+_MAPPING_TYPES = {"odict": OrderedDict, "dict": dict}
+_MAPPING_TAGS = {mapping_type: tag for tag, mapping_type in _MAPPING_TYPES.items()}
+_SEQUENCE_TYPES = {
+    "list": list,
+    "nlist": NodeListClass,
+    "tuple": tuple,
+    "set": set,
+}
+_SEQUENCE_TAGS = {seq_type: tag for tag, seq_type in _SEQUENCE_TYPES.items()}
+
+
+class YamlCache:
+    """Cache of parsed YAML files.
+
+    A parsed file is reused as long as its content and the files, directory
+    listings and environment variables it was built from are unchanged. If a
+    path is passed, the cache is persisted there as JSON so it survives
+    restarts. Files that use values from secrets.yaml, directly or through
+    included files, are only cached in memory and parsed again after a
+    restart, so no secrets are written to disk.
+    """
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        """Initialize the cache."""
+        self.path = path
+        # File name -> (inputs with their values, encoded content)
+        self._entries: Optional[Dict[str, Tuple[Dict[Tuple, Any], Any]]] = None
+        self._dirty = False
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def load(self, fname: str) -> JSON_TYPE:
+        """Load a YAML file and persist the cache if it changed."""
+        data = self.load_with_dependencies(fname)[0]
+
+        if self._dirty and self.path is not None:
+            self._save()
+
+        return data
+
+    def load_with_dependencies(self, fname: str) -> Tuple[JSON_TYPE, Dict[Tuple, Any]]:
+        """Load a YAML file and return it with the inputs it depends on."""
+        entries = self._get_entries()
+        entry = entries.get(fname)
+
+        if entry is not None and all(
+            _dependency_value(dependency) == value
+            for dependency, value in entry[0].items()
+        ):
+            try:
+                data = _decode(entry[1])
+            except (KeyError, TypeError, ValueError):
+                _LOGGER.warning("Ignoring invalid YAML cache entry of %s", fname)
+            else:
+                self.hits += 1
+                return data, entry[0]
+
+        self.misses += 1
+        data, deps = _parse_yaml(fname, self)
+        assert deps is not None
+
+        if deps[("file", fname)] is not None and _UNCACHEABLE not in deps:
+            try:
+                entries[fname] = (deps, _encode(data))
+            except TypeError:
+                entries.pop(fname, None)
+            else:
+                self._dirty = self._dirty or _SECRET not in deps
+
+        return data, deps
+
+    def _get_entries(self) -> Dict[str, Tuple[Dict[Tuple, Any], Any]]:
+        """Return the entries, loading the persisted cache the first time."""
+        with self._lock:
+            if self._entries is None:
+                self._entries = self._load_persisted()
+            return self._entries
+
+    def _load_persisted(self) -> Dict[str, Tuple[Dict[Tuple, Any], Any]]:
+        """Load the persisted cache."""
+        if self.path is None or not os.path.isfile(self.path):
+            return {}
+
+        try:
+            with open(self.path, encoding="utf-8") as fil:
+                stored = json.load(fil)
+
+            if not isinstance(stored, dict) or stored.get("version") != CACHE_VERSION:
+                return {}
+
+            entries = {}
+            for fname, entry in stored["entries"].items():
+                deps = {}
+                for dependency, value in entry["deps"]:
+                    dependency = tuple(dependency)
+                    # Directory listings are compared as tuples
+                    deps[dependency] = (
+                        tuple(value) if dependency[0] == "dir" else value
+                    )
+                entries[fname] = (deps, entry["data"])
+        except (OSError, ValueError, TypeError, KeyError, AttributeError):
+            _LOGGER.warning("Ignoring unreadable YAML cache %s", self.path)
+            return {}
+
+        return entries
+
+    def _save(self) -> None:
+        """Persist the cache, leaving out the entries with secrets."""
+        assert self.path is not None
+
+        with self._lock:
+            self._dirty = False
+            stored = {
+                fname: {"deps": [list(item) for item in deps.items()], "data": data}
+                for fname, (deps, data) in (self._entries or {}).items()
+                if _SECRET not in deps
+            }
+
+        content = json.dumps({"version": CACHE_VERSION, "entries": stored})
+
+        tmp_path = f"{self.path}.tmp"
+        try:
+            fdesc = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with open(fdesc, "w", encoding="utf-8") as fil:
+                fil.write(content)
+            os.replace(tmp_path, self.path)
+        except OSError as err:
+            _LOGGER.warning("Unable to write YAML cache %s: %s", self.path, err)
+
+
 @overload
 def _add_reference(
     obj: Union[list, NodeListClass], loader: yaml.SafeLoader, node: yaml.nodes.Node
@@ -112,7 +457,7 @@ def _include_yaml(loader: SafeLineLoader, node: yaml.nodes.Node) -> JSON_TYPE:
     """
     fname = os.path.join(os.path.dirname(loader.name), node.value)
     try:
-        return _add_reference(load_yaml(fname), loader, node)
+        return _add_reference(_load_included(loader, fname), loader, node)
     except FileNotFoundError:
         raise OpenPeerPowerError(f"{node.start_mark}: Unable to read file {fname}.")
 
@@ -132,17 +477,24 @@ def _find_files(directory: str, pattern: str) -> Iterator[str]:
                 yield filename
 
 
+def _find_included_files(loader: SafeLineLoader, directory: str) -> List[str]:
+    """Return the YAML files in a directory included by the parsed file."""
+    files = list(_find_files(directory, "*.yaml"))
+    _add_dependency(loader, ("dir", directory, "*.yaml"), tuple(files))
+    return files
+
+
 def _include_dir_named_yaml(
     loader: SafeLineLoader, node: yaml.nodes.Node
 ) -> OrderedDict:
     """Load multiple files from directory as a dictionary."""
     mapping: OrderedDict = OrderedDict()
     loc = os.path.join(os.path.dirname(loader.name), node.value)
-    for fname in _find_files(loc, "*.yaml"):
+    for fname in _find_included_files(loader, loc):
         filename = os.path.splitext(os.path.basename(fname))[0]
         if os.path.basename(fname) == SECRET_YAML:
             continue
-        mapping[filename] = load_yaml(fname)
+        mapping[filename] = _load_included(loader, fname)
     return _add_reference(mapping, loader, node)
 
 
@@ -152,10 +504,10 @@ def _include_dir_merge_named_yaml(
     """Load multiple files from directory as a merged dictionary."""
     mapping: OrderedDict = OrderedDict()
     loc = os.path.join(os.path.dirname(loader.name), node.value)
-    for fname in _find_files(loc, "*.yaml"):
+    for fname in _find_included_files(loader, loc):
         if os.path.basename(fname) == SECRET_YAML:
             continue
-        loaded_yaml = load_yaml(fname)
+        loaded_yaml = _load_included(loader, fname)
         if isinstance(loaded_yaml, dict):
             mapping.update(loaded_yaml)
     return _add_reference(mapping, loader, node)
@@ -167,8 +519,8 @@ def _include_dir_list_yaml(
     """Load multiple files from directory as a list."""
     loc = os.path.join(os.path.dirname(loader.name), node.value)
     return [
-        load_yaml(f)
-        for f in _find_files(loc, "*.yaml")
+        _load_included(loader, f)
+        for f in _find_included_files(loader, loc)
         if os.path.basename(f) != SECRET_YAML
     ]
 
@@ -179,10 +531,10 @@ def _include_dir_merge_list_yaml(
     """Load multiple files from directory as a merged list."""
     loc: str = os.path.join(os.path.dirname(loader.name), node.value)
     merged_list: List[JSON_TYPE] = []
-    for fname in _find_files(loc, "*.yaml"):
+    for fname in _find_included_files(loader, loc):
         if os.path.basename(fname) == SECRET_YAML:
             continue
-        loaded_yaml = load_yaml(fname)
+        loaded_yaml = _load_included(loader, fname)
         if isinstance(loaded_yaml, list):
             merged_list.extend(loaded_yaml)
     return _add_reference(merged_list, loader, node)
@@ -229,6 +581,7 @@ def _construct_seq(loader: SafeLineLoader, node: yaml.nodes.Node) -> JSON_TYPE:
 def _env_var_yaml(loader: SafeLineLoader, node: yaml.nodes.Node) -> str:
     """Load environment variables and embed it into the configuration YAML."""
     args = node.value.split()
+    _add_dependency(loader, ("env", args[0]), os.environ.get(args[0]))
 
     # Check for a default value
     if len(args) > 1:
@@ -270,6 +623,7 @@ def secret_yaml(loader: SafeLineLoader, node: yaml.nodes.Node) -> JSON_TYPE:
     """Load secrets and embed it into the configuration YAML."""
     secret_path = os.path.dirname(loader.name)
     while True:
+        _add_file_dependency(loader, os.path.join(secret_path, SECRET_YAML))
         secrets = _load_secret_yaml(secret_path)
 
         if node.value in secrets:
@@ -278,6 +632,7 @@ def secret_yaml(loader: SafeLineLoader, node: yaml.nodes.Node) -> JSON_TYPE:
                 node.value,
                 secret_path,
             )
+            _add_dependency(loader, _SECRET, True)
             return secrets[node.value]
 
         if secret_path == os.path.dirname(sys.path[0]):
@@ -287,6 +642,9 @@ def secret_yaml(loader: SafeLineLoader, node: yaml.nodes.Node) -> JSON_TYPE:
         if not os.path.exists(secret_path) or len(secret_path) < 5:
             break  # Somehow we got past the .openpeerpower config folder
 
+    # Secrets from keyring or credstash can't be checked for changes
+    _add_dependency(loader, _UNCACHEABLE, True)
+
     if keyring:
         # do some keyring stuff
         pwd = keyring.get_password(_SECRET_NAMESPACE, node.value)
@@ -312,18 +670,12 @@ def secret_yaml(loader: SafeLineLoader, node: yaml.nodes.Node) -> JSON_TYPE:
     raise OpenPeerPowerError(f"Secret {node.value} not defined")
 
 
-yaml.SafeLoader.add_constructor("!include", _include_yaml)
-yaml.SafeLoader.add_constructor(
-    yaml.resolver.BaseResolver.DEFAULT_MAPPING_TAG, _ordered_dict
-)
-yaml.SafeLoader.add_constructor(
-    yaml.resolver.BaseResolver.DEFAULT_SEQUENCE_TAG, _construct_seq
-)
-yaml.SafeLoader.add_constructor("!env_var", _env_var_yaml)
-yaml.SafeLoader.add_constructor("!secret", secret_yaml)
-yaml.SafeLoader.add_constructor("!include_dir_list", _include_dir_list_yaml)
-yaml.SafeLoader.add_constructor("!include_dir_merge_list", _include_dir_merge_list_yaml)
-yaml.SafeLoader.add_constructor("!include_dir_named", _include_dir_named_yaml)
-yaml.SafeLoader.add_constructor(
-    "!include_dir_merge_named", _include_dir_merge_named_yaml
-)
+add_constructor("!include", _include_yaml)
+add_constructor(yaml.resolver.BaseResolver.DEFAULT_MAPPING_TAG, _ordered_dict)
+add_constructor(yaml.resolver.BaseResolver.DEFAULT_SEQUENCE_TAG, _construct_seq)
+add_constructor("!env_var", _env_var_yaml)
+add_constructor("!secret", secret_yaml)
+add_constructor("!include_dir_list", _include_dir_list_yaml)
+add_constructor("!include_dir_merge_list", _include_dir_merge_list_yaml)
+add_constructor("!include_dir_named", _include_dir_named_yaml)
+add_constructor("!include_dir_merge_named", _include_dir_merge_named_yaml)
@@ -474,6 +474,28 @@ async def test_remove_refresh_token(mock_opp):
     assert await manager.async_validate_access_token(access_token) is None
 
 
+async def test_validate_access_token_cache(mock_opp):
+    """Test verified access tokens are cached until invalidated."""
+    manager = await auth.auth_manager_from_config(mock_opp, [], [])
+    user = MockUser().add_to_auth_manager(manager)
+    refresh_token = await manager.async_create_refresh_token(user, CLIENT_ID)
+    access_token = manager.async_create_access_token(refresh_token)
+    assert await manager.async_validate_access_token(access_token) is refresh_token
+
+    with patch("openpeerpower.auth.jwt.decode", side_effect=AssertionError):
+        assert (
+            await manager.async_validate_access_token(access_token) is refresh_token
+        )
+
+    user.is_active = False
+    assert await manager.async_validate_access_token(access_token) is None
+    user.is_active = True
+    assert await manager.async_validate_access_token(access_token) is refresh_token
+
+    await manager.async_remove_refresh_token(refresh_token)
+    assert await manager.async_validate_access_token(access_token) is None
+
+
 async def test_create_access_token(mock_opp):
     """Test normal refresh_token's jwt_key keep same after used."""
     manager = await auth.auth_manager_from_config(mock_opp, [], [])
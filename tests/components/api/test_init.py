@@ -33,6 +33,87 @@ async def test_api_list_state_entities(opp, mock_api_client):
     assert remote_data == opp.states.async_all()
 
 
+async def test_api_list_states_filtered(opp, mock_api_client):
+    """Test filtering the states by domain and entity id."""
+    opp.states.async_set("test.entity", "hello")
+    opp.states.async_set("light.kitchen", "on")
+    opp.states.async_set("light.bed", "off")
+
+    resp = await mock_api_client.get(f"{const.URL_API_STATES}?domain=light")
+    assert resp.status == 200
+    json = await resp.json()
+    assert sorted(item["entity_id"] for item in json) == ["light.bed", "light.kitchen"]
+
+    resp = await mock_api_client.get(
+        f"{const.URL_API_STATES}?entity_id=test.entity,light.bed,light.missing"
+    )
+    json = await resp.json()
+    assert sorted(item["entity_id"] for item in json) == ["light.bed", "test.entity"]
+
+    resp = await mock_api_client.get(f"{const.URL_API_STATES}?domain=switch")
+    assert await resp.json() == []
+
+
+async def test_api_list_states_etag(opp, mock_api_client):
+    """Test unchanged states are not sent again."""
+    opp.states.async_set("test.entity", "hello")
+
+    resp = await mock_api_client.get(const.URL_API_STATES)
+    assert resp.status == 200
+    etag = resp.headers["ETag"]
+
+    resp = await mock_api_client.get(
+        const.URL_API_STATES, headers={"If-None-Match": etag}
+    )
+    assert resp.status == 304
+    assert resp.headers["ETag"] == etag
+
+    opp.states.async_set("test.entity", "world")
+
+    resp = await mock_api_client.get(
+        const.URL_API_STATES, headers={"If-None-Match": etag}
+    )
+    assert resp.status == 200
+    assert resp.headers["ETag"] != etag
+    json = await resp.json()
+    assert json[0]["state"] == "world"
+
+
+async def test_api_list_states_domain_etag(opp, mock_api_client):
+    """Test changes in other domains don't change the ETag of a domain."""
+    opp.states.async_set("light.kitchen", "on")
+
+    resp = await mock_api_client.get(f"{const.URL_API_STATES}?domain=light")
+    etag = resp.headers["ETag"]
+
+    opp.states.async_set("test.entity", "hello")
+
+    resp = await mock_api_client.get(
+        f"{const.URL_API_STATES}?domain=light", headers={"If-None-Match": etag}
+    )
+    assert resp.status == 304
+
+    opp.states.async_remove("light.kitchen")
+
+    resp = await mock_api_client.get(
+        f"{const.URL_API_STATES}?domain=light", headers={"If-None-Match": etag}
+    )
+    assert resp.status == 200
+    assert await resp.json() == []
+
+
+async def test_api_list_states_serialize_error(opp, mock_api_client):
+    """Test a state that can't be serialized fails the request."""
+    opp.states.async_set("test.entity", "hello")
+    opp.states.async_set("test.invalid", "hello", {"value": float("nan")})
+
+    with patch("openpeerpower.components.api.STATES_CHUNK_SIZE", 1):
+        resp = await mock_api_client.get(const.URL_API_STATES)
+
+    assert resp.status == 500
+    assert "ETag" not in resp.headers
+
+
 async def test_api_get_state(opp, mock_api_client):
     """Test if the debug interface allows us to get a state."""
     opp.states.async_set("hello.world", "nice", {"attr": 1})
@@ -351,7 +432,9 @@ async def test_stream_with_restricted(opp, mock_api_client):
         "{}?restrict=test_event1,test_event3".format(const.URL_API_STREAM)
     )
     assert resp.status == 200
-    assert listen_count + 1 == _listen_count(opp)
+    # One listener per event type, including openpeerpower_stop
+    assert listen_count + 3 == _listen_count(opp)
+    assert opp.bus.async_listeners().get("test_event2") is None
 
     opp.bus.async_fire("test_event1")
     data = await _stream_next_event(resp.content)
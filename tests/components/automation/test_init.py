@@ -281,6 +281,64 @@ async def test_two_conditions_with_and(opp, calls):
     assert 1 == len(calls)
 
 
+async def test_nested_conditions_metrics(opp, calls):
+    """Test nested and/or conditions and their evaluation counters."""
+    entity_id = "test.entity"
+    assert await async_setup_component(
+        opp,
+        automation.DOMAIN,
+        {
+            automation.DOMAIN: {
+                "alias": "hello",
+                "trigger": [{"platform": "event", "event_type": "test_event"}],
+                "condition": {
+                    "condition": "or",
+                    "conditions": [
+                        {
+                            "condition": "template",
+                            "value_template": "{{ is_state('test.other', 'on') }}",
+                        },
+                        {
+                            "condition": "or",
+                            "conditions": [
+                                {
+                                    "condition": "and",
+                                    "conditions": [
+                                        {
+                                            "condition": "numeric_state",
+                                            "entity_id": entity_id,
+                                            "above": 10,
+                                        },
+                                        {
+                                            "condition": "numeric_state",
+                                            "entity_id": entity_id,
+                                            "below": 20,
+                                        },
+                                    ],
+                                },
+                            ],
+                        },
+                    ],
+                },
+                "action": {"service": "test.automation"},
+            }
+        },
+    )
+    component = opp.data[automation.DOMAIN]
+    entity = component.get_entity("automation.hello")
+
+    for state, other in ((15, "off"), (25, "off"), (25, "on"), ("unknown", "off")):
+        opp.states.async_set(entity_id, state)
+        opp.states.async_set("test.other", other)
+        opp.bus.async_fire("test_event")
+        await opp.async_block_till_done()
+
+    assert len(calls) == 2
+    metrics = entity.condition_metrics
+    assert metrics["evaluations"] == 4
+    assert metrics["passed"] == 2
+
+
 async def test_automation_list_setting(opp, calls):
     """Event is not a valid condition."""
     assert await async_setup_component(
@@ -599,6 +657,53 @@ async def test_reload_config_handles_load_fails(opp, calls):
     assert len(calls) == 2
 
 
+async def test_reload_keeps_unchanged_automations(opp, calls):
+    """Test reloading only replaces automations whose config changed."""
+
+    def automation_config(bye_event):
+        """Return the automation config."""
+        return {
+            automation.DOMAIN: [
+                {
+                    "alias": "hello",
+                    "trigger": {"platform": "event", "event_type": "test_event"},
+                    "action": {"service": "test.automation"},
+                },
+                {
+                    "alias": "bye",
+                    "trigger": {"platform": "event", "event_type": bye_event},
+                    "action": {"service": "test.automation"},
+                },
+            ]
+        }
+
+    assert await async_setup_component(
+        opp, automation.DOMAIN, automation_config("test_event2")
+    )
+    component = opp.data[automation.DOMAIN]
+    hello = component.get_entity("automation.hello")
+    bye = component.get_entity("automation.bye")
+
+    with patch(
+        "openpeerpower.config.load_yaml_config_file",
+        autospec=True,
+        return_value=automation_config("test_event3"),
+    ):
+        await common.async_reload(opp)
+        await opp.async_block_till_done()
+
+    assert component.get_entity("automation.hello") is hello
+    assert component.get_entity("automation.bye") is not bye
+    listeners = opp.bus.async_listeners()
+    assert listeners.get("test_event") == 1
+    assert listeners.get("test_event2") is None
+    assert listeners.get("test_event3") == 1
+
+    opp.bus.async_fire("test_event3")
+    await opp.async_block_till_done()
+    assert len(calls) == 1
+
+
 async def test_automation_restore_state(opp):
     """Ensure states are restored on startup."""
     time = dt_util.utcnow()
@@ -1022,3 +1127,37 @@ async def test_extraction_functions(opp):
         "device-in-both",
         "device-in-last",
     }
+
+
+async def test_references_follow_reload(opp):
+    """Test the reference index is updated when automations are reloaded."""
+
+    def automation_config(entity_id):
+        """Return the automation config."""
+        return {
+            automation.DOMAIN: {
+                "alias": "hello",
+                "trigger": {"platform": "event", "event_type": "test_event"},
+                "action": {"service": "test.script", "data": {"entity_id": entity_id}},
+            }
+        }
+
+    assert await async_setup_component(
+        opp, automation.DOMAIN, automation_config("light.first")
+    )
+    assert automation.automations_with_entity(opp, "light.first") == [
+        "automation.hello"
+    ]
+
+    with patch(
+        "openpeerpower.config.load_yaml_config_file",
+        autospec=True,
+        return_value=automation_config("light.second"),
+    ):
+        await common.async_reload(opp)
+        await opp.async_block_till_done()
+
+    assert automation.automations_with_entity(opp, "light.first") == []
+    assert automation.automations_with_entity(opp, "light.second") == [
+        "automation.hello"
+    ]
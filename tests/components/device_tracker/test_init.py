@@ -1,4 +1,5 @@
 """The tests for the device tracker component."""
+import asyncio
 from datetime import datetime, timedelta
 import json
 import logging
@@ -124,6 +125,29 @@ async def test_reading_yaml_config(opp, yaml_devices):
     assert device.icon == config.icon
 
 
+async def test_new_devices_written_in_batches(opp, yaml_devices):
+    """Test new devices seen together are appended with few writes."""
+    tracker = legacy.DeviceTracker(opp, timedelta(seconds=180), True, {}, [])
+
+    with patch(
+        "openpeerpower.components.device_tracker.legacy.update_devices_config",
+        side_effect=legacy.update_devices_config,
+    ) as mock_write:
+        await asyncio.gather(
+            *(
+                tracker.async_see(mac=f"AA:BB:CC:DD:EE:{idx:02X}", host_name=f"h{idx}")
+                for idx in range(20)
+            )
+        )
+        await opp.async_block_till_done()
+
+    assert mock_write.call_count < 20
+    devices = await legacy.async_load_config(yaml_devices, opp, timedelta(seconds=180))
+    assert sorted(dev.dev_id for dev in devices) == sorted(
+        f"h{idx}" for idx in range(20)
+    )
+
+
 @patch("openpeerpower.components.device_tracker.const.LOGGER.warning")
 async def test_duplicate_mac_dev_id(mock_warning, opp):
     """Test adding duplicate MACs or device IDs to DeviceTracker."""
@@ -655,3 +679,24 @@ def test_see_schema_allowing_ios_calls():
             "hostname": "beer",
         }
     )
+
+
+async def test_concurrent_see_new_device(mock_device_tracker_conf, opp):
+    """Test concurrent sees of a new device only add it once."""
+    tracker = legacy.DeviceTracker(opp, timedelta(seconds=60), False, {}, [])
+    registry = Mock(async_is_registered=Mock(return_value=False))
+
+    async def mock_get_registry(opp):
+        """Return the registry after yielding to the other see calls."""
+        await asyncio.sleep(0)
+        return registry
+
+    with patch.object(legacy, "async_get_registry", mock_get_registry):
+        await asyncio.gather(
+            tracker.async_see(mac="AB:CD:EF:01:02:03", host_name="phone"),
+            tracker.async_see(mac="ab:cd:ef:01:02:03", host_name="phone"),
+        )
+    await opp.async_block_till_done()
+
+    assert list(tracker.devices) == ["phone"]
+    assert len(mock_device_tracker_conf) == 1
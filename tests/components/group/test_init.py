@@ -0,0 +1,125 @@
+"""The tests for the Group components."""
+from openpeerpower.components import group
+from openpeerpower.const import ATTR_ENTITY_ID, STATE_OFF, STATE_ON
+from openpeerpower.setup import async_setup_component
+
+
+async def test_expand_entity_ids(opp):
+    """Test expanding groups keeps the order and removes duplicates."""
+    opp.states.async_set("light.bowl", STATE_ON)
+    opp.states.async_set("light.ceiling", STATE_OFF)
+    opp.states.async_set(
+        "group.lights",
+        STATE_ON,
+        {ATTR_ENTITY_ID: ["light.Ceiling", "light.bowl", "light.ceiling"]},
+    )
+
+    assert group.expand_entity_ids(
+        opp, ["light.kitchen", "GROUP.lights", "light.bowl", None, "all"]
+    ) == ["light.kitchen", "light.ceiling", "light.bowl"]
+
+
+async def test_expand_nested_groups(opp):
+    """Test expanding groups within groups."""
+    opp.states.async_set("group.inner", STATE_ON, {ATTR_ENTITY_ID: ["light.bowl"]})
+    opp.states.async_set(
+        "group.outer",
+        STATE_ON,
+        {ATTR_ENTITY_ID: ["switch.ac", "group.inner", "light.ceiling"]},
+    )
+
+    assert group.expand_entity_ids(opp, ["group.outer"]) == [
+        "switch.ac",
+        "light.bowl",
+        "light.ceiling",
+    ]
+    assert group.expand_entity_ids(opp, ["group.unknown"]) == []
+
+
+async def test_expand_group_cycles(opp):
+    """Test groups containing each other are expanded once."""
+    opp.states.async_set(
+        "group.first", STATE_ON, {ATTR_ENTITY_ID: ["light.bowl", "group.second"]}
+    )
+    opp.states.async_set(
+        "group.second", STATE_ON, {ATTR_ENTITY_ID: ["group.first", "light.ceiling"]}
+    )
+    opp.states.async_set("group.self", STATE_ON, {ATTR_ENTITY_ID: ["group.self"]})
+
+    assert group.expand_entity_ids(opp, ["group.first"]) == [
+        "light.bowl",
+        "light.ceiling",
+    ]
+    assert group.expand_entity_ids(opp, ["group.second"]) == [
+        "light.bowl",
+        "light.ceiling",
+    ]
+    assert group.expand_entity_ids(opp, ["group.self"]) == []
+
+
+async def test_expand_group_cache(opp):
+    """Test cached members of a group in a cycle keep the expansion order."""
+    opp.states.async_set(
+        "group.first", STATE_ON, {ATTR_ENTITY_ID: ["group.second", "light.bowl"]}
+    )
+    opp.states.async_set(
+        "group.second", STATE_ON, {ATTR_ENTITY_ID: ["group.first", "light.ceiling"]}
+    )
+    cache = {}
+
+    assert group._expand_group(opp, "group.first", cache, set()) == (
+        "light.ceiling",
+        "light.bowl",
+    )
+    assert cache == {"group.first": ("light.ceiling", "light.bowl")}
+    assert group._expand_group(opp, "group.second", cache, set()) == (
+        "light.bowl",
+        "light.ceiling",
+    )
+    assert group._expand_group(opp, "group.first", cache, set()) is (
+        cache["group.first"]
+    )
+
+
+async def test_membership_index_invalidated(opp):
+    """Test the cached members are cleared when group members change."""
+    assert await async_setup_component(opp, "group", {})
+    index = opp.data[group.DATA_MEMBERS]
+
+    opp.states.async_set("group.lights", STATE_ON, {ATTR_ENTITY_ID: ["light.bowl"]})
+    await opp.async_block_till_done()
+    assert group.expand_entity_ids(opp, ["group.lights"]) == ["light.bowl"]
+    assert "group.lights" in index._members
+
+    # Only the state changed, the members are still cached
+    opp.states.async_set("group.lights", STATE_OFF, {ATTR_ENTITY_ID: ["light.bowl"]})
+    await opp.async_block_till_done()
+    assert "group.lights" in index._members
+
+    opp.states.async_set(
+        "group.lights", STATE_OFF, {ATTR_ENTITY_ID: ["light.bowl", "light.ceiling"]}
+    )
+    await opp.async_block_till_done()
+    assert group.expand_entity_ids(opp, ["group.lights"]) == [
+        "light.bowl",
+        "light.ceiling",
+    ]
+
+    opp.states.async_remove("group.lights")
+    await opp.async_block_till_done()
+    assert group.expand_entity_ids(opp, ["group.lights"]) == []
+
+
+async def test_membership_index_group_update(opp):
+    """Test updating the tracked entities of a group clears the cache."""
+    assert await async_setup_component(opp, "group", {})
+
+    test_group = await group.Group.async_create_group(
+        opp, "Lights", ["light.bowl"], object_id="lights"
+    )
+    await opp.async_block_till_done()
+    assert group.expand_entity_ids(opp, ["group.lights"]) == ["light.bowl"]
+
+    await test_group.async_update_tracked_entity_ids(["light.ceiling"])
+    await opp.async_block_till_done()
+    assert group.expand_entity_ids(opp, ["group.lights"]) == ["light.ceiling"]
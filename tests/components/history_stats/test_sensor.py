@@ -1,5 +1,6 @@
 """The test for the History Statistics sensor platform."""
 # pylint: disable=protected-access
+import asyncio
 from datetime import datetime, timedelta
 import unittest
 from unittest.mock import patch
@@ -141,16 +142,136 @@ class TestHistoryStatsSensor(unittest.TestCase):
             return_value=fake_states,
         ):
             with patch("openpeerpower.components.history.get_state", return_value=None):
-                sensor1.update()
-                sensor2.update()
-                sensor3.update()
-                sensor4.update()
+                for sensor in (sensor1, sensor2, sensor3, sensor4):
+                    asyncio.run_coroutine_threadsafe(
+                        sensor.async_update(), self.opp.loop
+                    ).result()
 
         assert sensor1.state == 0.5
         assert sensor2.state is None
         assert sensor3.state == 2
         assert sensor4.state == 50
 
+    def test_measure_incremental(self):
+        """Test the measure is kept up to date from state changes."""
+        t0 = dt_util.utcnow() - timedelta(minutes=40)
+        t1 = dt_util.utcnow() - timedelta(minutes=20)
+
+        # Start     t0        t1        End
+        # |--20min--|--20min--|--20min--|
+        # |---off---|---on----|---off---|
+
+        fake_states = {
+            "binary_sensor.test_id": [
+                op.State("binary_sensor.test_id", "on", last_changed=t0),
+                op.State("binary_sensor.test_id", "off", last_changed=t1),
+            ]
+        }
+
+        start = Template("{{ as_timestamp(now()) - 3600 }}", self.opp)
+        end = Template("{{ now() }}", self.opp)
+
+        sensor = HistoryStatsSensor(
+            self.opp, "binary_sensor.test_id", "on", start, end, None, "count", "Test"
+        )
+
+        with patch(
+            "openpeerpower.components.history.state_changes_during_period",
+            return_value=fake_states,
+        ) as mock_changes, patch(
+            "openpeerpower.components.history.get_state", return_value=None
+        ):
+            asyncio.run_coroutine_threadsafe(
+                sensor.async_update(), self.opp.loop
+            ).result()
+            assert sensor.state == 1
+
+            t2 = dt_util.utcnow() - timedelta(minutes=5)
+            sensor._record_state(
+                op.State("binary_sensor.test_id", "on", last_changed=t2)
+            )
+            asyncio.run_coroutine_threadsafe(
+                sensor.async_update(), self.opp.loop
+            ).result()
+
+        assert sensor.state == 2
+        assert len(mock_changes.mock_calls) == 1
+
+    def test_measure_no_history(self):
+        """Test an entity without history is measured from its state."""
+        t0 = dt_util.utcnow() - timedelta(minutes=30)
+        t1 = dt_util.utcnow() - timedelta(minutes=20)
+        t2 = dt_util.utcnow() - timedelta(minutes=10)
+
+        start = Template("{{ as_timestamp(now()) - 3600 }}", self.opp)
+        end = Template("{{ now() }}", self.opp)
+
+        sensor = HistoryStatsSensor(
+            self.opp, "binary_sensor.test_id", "on", start, end, None, "count", "Test"
+        )
+
+        # Seen before the first update
+        for _ in range(200):
+            sensor._record_state(
+                op.State("binary_sensor.test_id", "off", last_changed=t0)
+            )
+        assert len(sensor._pending_changes) == 100
+
+        with patch("openpeerpower.util.dt.utcnow", return_value=t1):
+            self.opp.states.set("binary_sensor.test_id", "on")
+
+        with patch(
+            "openpeerpower.components.history.state_changes_during_period",
+            return_value={},
+        ) as mock_changes, patch(
+            "openpeerpower.components.history.get_state", return_value=None
+        ):
+            asyncio.run_coroutine_threadsafe(
+                sensor.async_update(), self.opp.loop
+            ).result()
+            assert sensor.state == 1
+            assert not sensor._pending_changes
+
+            for state in ("off", "on"):
+                sensor._record_state(
+                    op.State("binary_sensor.test_id", state, last_changed=t2)
+                )
+                assert not sensor._pending_changes
+            asyncio.run_coroutine_threadsafe(
+                sensor.async_update(), self.opp.loop
+            ).result()
+
+        assert sensor.state == 2
+        assert len(mock_changes.mock_calls) == 1
+
+    def test_measure_unknown_entity(self):
+        """Test the history is only loaded once for an unknown entity."""
+        t0 = dt_util.utcnow() - timedelta(minutes=10)
+
+        start = Template("{{ as_timestamp(now()) - 3600 }}", self.opp)
+        end = Template("{{ now() }}", self.opp)
+
+        sensor = HistoryStatsSensor(
+            self.opp, "unknown.id", "on", start, end, None, "count", "Test"
+        )
+
+        with patch(
+            "openpeerpower.components.history.state_changes_during_period",
+            return_value={},
+        ) as mock_changes:
+            asyncio.run_coroutine_threadsafe(
+                sensor.async_update(), self.opp.loop
+            ).result()
+            assert sensor.state is None
+
+            sensor._record_state(op.State("unknown.id", "on", last_changed=t0))
+            asyncio.run_coroutine_threadsafe(
+                sensor.async_update(), self.opp.loop
+            ).result()
+
+        assert sensor.state == 1
+        assert len(mock_changes.mock_calls) == 1
+
     def test_wrong_date(self):
         """Test when start or end value is not a timestamp or a date."""
         good = Template("{{ now() }}", self.opp)
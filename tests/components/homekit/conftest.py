@@ -0,0 +1,19 @@
+"""HomeKit session fixtures."""
+from unittest.mock import patch
+
+import pytest
+
+from openpeerpower.components.homekit.accessories import HomeDriver
+
+
+@pytest.fixture
+def hk_driver(opp):
+    """Return a custom AccessoryDriver instance for HomeKit accessory init."""
+    with patch("pyhap.accessory_driver.Zeroconf"), patch(
+        "pyhap.accessory_driver.AccessoryEncoder"
+    ), patch("pyhap.accessory_driver.HAPServer"), patch(
+        "pyhap.accessory_driver.AccessoryDriver.persist"
+    ):
+        driver = HomeDriver(opp, pincode=b"123-45-678", address="127.0.0.1")
+        yield driver
+        driver.loop.close()
@@ -0,0 +1,166 @@
+"""Test the HomeKit accessory base classes and driver."""
+import json
+import threading
+
+from pyhap.accessory_driver import get_topic
+from pyhap.const import HAP_REPR_CHARS, HAP_REPR_VALUE
+
+from openpeerpower.components.homekit.accessories import HomeAccessory
+from openpeerpower.components.homekit.const import (
+    CHAR_BRIGHTNESS,
+    CHAR_ON,
+    SERV_LIGHTBULB,
+)
+from openpeerpower.const import EVENT_STATE_CHANGED
+from openpeerpower.core import callback
+
+
+class MockLight(HomeAccessory):
+    """Light accessory recording the states it was updated with."""
+
+    def __init__(self, *args):
+        """Initialize the accessory."""
+        super().__init__(*args)
+        self.states = []
+        serv_light = self.add_preload_service(SERV_LIGHTBULB, [CHAR_BRIGHTNESS])
+        self.char_on = serv_light.configure_char(CHAR_ON, value=False)
+        self.char_brightness = serv_light.configure_char(CHAR_BRIGHTNESS, value=0)
+
+    def update_state(self, new_state):
+        """Record the new state."""
+        self.states.append(new_state.state)
+
+
+def _listener_count(opp):
+    """Return the number of state changed listeners."""
+    return opp.bus.async_listeners().get(EVENT_STATE_CHANGED, 0)
+
+
+async def _async_flush(opp):
+    """Handle the state changes and values queued for the next ticks."""
+    for _ in range(3):
+        await opp.async_block_till_done()
+
+
+def _pushed_values(hk_driver):
+    """Return the characteristic values pushed to the clients per event."""
+    while not hk_driver.event_queue.empty():
+        hk_driver._send_event(*hk_driver.event_queue.get())
+    return [
+        [char[HAP_REPR_VALUE] for char in json.loads(call[0][0])[HAP_REPR_CHARS]]
+        for call in hk_driver.http_server.push_event.call_args_list
+    ]
+
+
+async def test_state_changes_coalesced(opp, hk_driver):
+    """Test state changes within a tick are dispatched once."""
+    calls = []
+
+    @callback
+    def record_calls(entity_id, old_state, new_state):
+        """Record calls."""
+        calls.append((entity_id, old_state.state, new_state.state))
+
+    opp.states.async_set("light.demo", "off")
+    await _async_flush(opp)
+
+    listeners = _listener_count(opp)
+    unsub = hk_driver.async_track_entity_state("light.demo", record_calls)
+    assert _listener_count(opp) == listeners + 1
+
+    opp.states.async_set("light.demo", "on")
+    opp.states.async_set("light.demo", "on", {"brightness": 255})
+    opp.states.async_set("light.other", "on")
+    await _async_flush(opp)
+
+    assert calls == [("light.demo", "off", "on")]
+
+    unsub()
+    assert _listener_count(opp) == listeners
+
+    opp.states.async_set("light.demo", "off")
+    await _async_flush(opp)
+
+    assert len(calls) == 1
+
+
+async def test_accessory_listeners_removed(opp, hk_driver):
+    """Test accessories do not leak state listeners."""
+    opp.states.async_set("light.demo", "off")
+    await _async_flush(opp)
+    acc = MockLight(opp, hk_driver, "Light", "light.demo", 2, None)
+
+    await acc.run_handler()
+    # A reset runs the accessory again
+    await acc.run_handler()
+    assert acc.states == ["off", "off"]
+
+    opp.states.async_set("light.demo", "on")
+    await _async_flush(opp)
+    assert acc.states == ["off", "off", "on"]
+
+    await acc.stop()
+    await _async_flush(opp)
+
+    opp.states.async_set("light.demo", "off")
+    await _async_flush(opp)
+    assert acc.states == ["off", "off", "on"]
+    assert "light.demo" not in hk_driver._entity_listeners
+
+
+async def test_characteristic_values_diffed(opp, hk_driver):
+    """Test changed characteristic values are sent once in a single event."""
+    setattr(opp.loop, "_thread_ident", threading.get_ident())
+    opp.states.async_set("light.demo", "off")
+    await opp.async_block_till_done()
+    acc = MockLight(opp, hk_driver, "Light", "light.demo", 2, None)
+
+    client = ("192.168.1.2", 12345)
+    for char in (acc.char_on, acc.char_brightness):
+        hk_driver.topics[get_topic(acc.aid, char.to_HAP()["iid"])] = {client}
+
+    acc.char_on.set_value(True)
+    acc.char_brightness.set_value(50)
+    acc.char_brightness.set_value(100)
+    await opp.async_block_till_done()
+
+    assert _pushed_values(hk_driver) == [[True, 100]]
+    assert hk_driver.http_server.push_event.call_args[0][1] == client
+
+    # Values that did not change are not sent again
+    acc.char_on.set_value(True)
+    acc.char_brightness.set_value(60)
+    acc.char_brightness.set_value(100)
+    await opp.async_block_till_done()
+
+    assert _pushed_values(hk_driver) == [[True, 100]]
+
+    acc.char_on.set_value(False)
+    await opp.async_block_till_done()
+
+    assert _pushed_values(hk_driver) == [[True, 100], [False]]
+
+
+async def test_characteristic_values_stale_client(opp, hk_driver):
+    """Test clients that can't be reached are unsubscribed."""
+    setattr(opp.loop, "_thread_ident", threading.get_ident())
+    opp.states.async_set("light.demo", "off")
+    await opp.async_block_till_done()
+    acc = MockLight(opp, hk_driver, "Light", "light.demo", 2, None)
+
+    client = ("192.168.1.2", 12345)
+    stale_client = ("192.168.1.3", 12345)
+    topic_on = get_topic(acc.aid, acc.char_on.to_HAP()["iid"])
+    topic_brightness = get_topic(acc.aid, acc.char_brightness.to_HAP()["iid"])
+    hk_driver.topics[topic_on] = {client, stale_client}
+    hk_driver.topics[topic_brightness] = {stale_client}
+    hk_driver.http_server.push_event.side_effect = (
+        lambda bytedata, client_addr: client_addr == client
+    )
+
+    acc.char_on.set_value(True)
+    acc.char_brightness.set_value(50)
+    await opp.async_block_till_done()
+
+    assert sorted(_pushed_values(hk_driver)) == [[True], [True, 50]]
+    assert hk_driver.topics == {topic_on: {client}}
@@ -1,5 +1,6 @@
 """The tests for the Open Peer Power HTTP component."""
 # pylint: disable=protected-access
+from datetime import datetime, timedelta
 from ipaddress import ip_address
 from unittest.mock import Mock, mock_open, patch
 
@@ -13,7 +14,9 @@ from openpeerpower.components.http.ban import (
     IP_BANS_FILE,
     KEY_BANNED_IPS,
     KEY_FAILED_LOGIN_ATTEMPTS,
+    FailedLoginAttempts,
     IpBan,
+    IpBanIndex,
     setup_bans,
 )
 from openpeerpower.components.http.view import request_handler_factory
@@ -152,3 +155,37 @@ async def test_failed_login_attempts_counter(opp, aiohttp_client):
     resp = await client.get("/auth_true")
     assert resp.status == 200
     assert app[KEY_FAILED_LOGIN_ATTEMPTS][remote_ip] == 2
+
+
+def test_ip_ban_index():
+    """Test looking up banned addresses and networks."""
+    expired = datetime.utcnow() - timedelta(minutes=1)
+    index = IpBanIndex(
+        [
+            IpBan("200.201.202.203"),
+            IpBan("100.64.0.0/10"),
+            IpBan("2001:db8::/32"),
+            IpBan("200.201.202.204", expires_at=expired),
+        ]
+    )
+    assert len(index) == 4
+
+    assert ip_address("200.201.202.203") in index
+    assert ip_address("100.127.1.2") in index
+    assert ip_address("2001:db8::1") in index
+    assert ip_address("100.128.0.1") not in index
+    assert ip_address("2001:db9::1") not in index
+
+    assert ip_address("200.201.202.204") not in index
+    assert len(index) == 3
+
+
+def test_failed_login_attempts_bounded():
+    """Test only the most recent failing addresses are kept."""
+    attempts = FailedLoginAttempts(2)
+    attempts[ip_address("10.0.0.1")] += 1
+    attempts[ip_address("10.0.0.2")] += 1
+    attempts[ip_address("10.0.0.1")] += 1
+    attempts[ip_address("10.0.0.3")] += 1
+
+    assert dict(attempts) == {ip_address("10.0.0.1"): 2, ip_address("10.0.0.3"): 1}
@@ -1,4 +1,5 @@
 """The tests for the MQTT component."""
+import asyncio
 from datetime import timedelta
 import ssl
 import unittest
@@ -575,9 +576,9 @@ class TestMQTTCallbacks(unittest.TestCase):
         self.opp.block_till_done()
 
         expected = [
-            mock.call("test/state", 2),
-            mock.call("test/state", 0),
-            mock.call("test/state", 1),
+            mock.call([("test/state", 2)]),
+            mock.call([("test/state", 2)]),
+            mock.call([("test/state", 2)]),
         ]
         assert self.opp.data["mqtt"]._mqttc.subscribe.mock_calls == expected
 
@@ -589,7 +590,7 @@ class TestMQTTCallbacks(unittest.TestCase):
         self.opp.data["mqtt"]._mqtt_on_connect(None, None, None, 0)
         self.opp.block_till_done()
 
-        expected.append(mock.call("test/state", 1))
+        expected.append(mock.call([("test/state", 1)]))
         assert self.opp.data["mqtt"]._mqttc.subscribe.mock_calls == expected
 
 
@@ -733,6 +734,124 @@ async def test_birth_message(opp):
     assert calls[-1] == ("birth", "birth", 0, False)
 
 
+async def test_publish_pipeline(opp):
+    """Test queued messages are published in order."""
+    mqtt_client = await async_mock_mqtt_client(opp)
+    calls = []
+    mqtt_client.publish.side_effect = lambda *args: calls.append(args)
+
+    await asyncio.gather(
+        *(
+            opp.data["mqtt"].async_publish(f"test/{idx}", "payload", 1, False)
+            for idx in range(10)
+        )
+    )
+    opp.data["mqtt"].async_publish_nowait("test/nowait", "payload", 0, True)
+    await opp.async_block_till_done()
+
+    assert calls == [(f"test/{idx}", "payload", 1, False) for idx in range(10)] + [
+        ("test/nowait", "payload", 0, True)
+    ]
+    metrics = opp.data["mqtt"].publish_metrics
+    assert metrics["queued"] == 0
+    assert metrics["published"] == 11
+
+
+async def test_publish_raises_client_error(opp):
+    """Test errors of the client are raised to the publisher."""
+    mqtt_client = await async_mock_mqtt_client(opp)
+    mqtt_client.publish.side_effect = ValueError("Invalid topic")
+
+    with pytest.raises(ValueError):
+        await opp.data["mqtt"].async_publish("test/topic", "payload", 0, False)
+
+
+async def test_publish_drain_failure(opp):
+    """Test publishers are not left waiting if the queue can't be drained."""
+    mqtt_client = await async_mock_mqtt_client(opp)
+    calls = []
+    mqtt_client.publish.side_effect = lambda *args: calls.append(args)
+    failed_drain = opp.loop.create_future()
+    failed_drain.set_exception(RuntimeError("Executor shut down"))
+
+    with mock.patch.object(opp, "async_add_executor_job", return_value=failed_drain):
+        results = await asyncio.gather(
+            opp.data["mqtt"].async_publish("test/1", "payload", 0, False),
+            opp.data["mqtt"].async_publish("test/2", "payload", 0, False),
+            return_exceptions=True,
+        )
+
+    assert [type(result) for result in results] == [RuntimeError, RuntimeError]
+    assert opp.data["mqtt"].publish_metrics["queued"] == 0
+
+    await opp.data["mqtt"].async_publish("test/3", "payload", 0, False)
+    assert calls == [("test/3", "payload", 0, False)]
+
+
+async def test_received_messages_handled_in_slices(opp):
+    """Test received messages are handed to the event loop in slices."""
+    await async_mock_mqtt_client(opp)
+    calls = []
+
+    @callback
+    def record_calls(msg):
+        """Record calls."""
+        calls.append(msg)
+
+    await mqtt.async_subscribe(opp, "test-topic", record_calls)
+
+    for _ in range(mqtt.MAX_INBOX_SLICE + 1):
+        opp.data["mqtt"]._mqtt_on_message(
+            None, None, mqtt.Message("test-topic", b"test", 0, False)
+        )
+
+    await asyncio.sleep(0)
+    assert len(calls) == mqtt.MAX_INBOX_SLICE
+    await asyncio.sleep(0)
+    assert len(calls) == mqtt.MAX_INBOX_SLICE + 1
+    assert not opp.data["mqtt"]._inbox_scheduled
+
+
+async def test_received_message_exception_does_not_stop_inbox(opp, caplog):
+    """Test messages are still handled after a subscriber raised."""
+    await async_mock_mqtt_client(opp)
+    calls = []
+
+    @callback
+    def bad_handler(msg):
+        """Raise an exception."""
+        raise ValueError("This is a bad message callback")
+
+    @callback
+    def record_calls(msg):
+        """Record calls."""
+        calls.append(msg.payload)
+
+    await opp.data["mqtt"].async_subscribe("test-topic", bad_handler, 0, "utf-8")
+    await mqtt.async_subscribe(opp, "other-topic", record_calls)
+
+    for topic, payload in (
+        ("other-topic", b"first"),
+        ("test-topic", b"bad"),
+        ("other-topic", b"second"),
+    ):
+        opp.data["mqtt"]._mqtt_on_message(
+            None, None, mqtt.Message(topic, payload, 0, False)
+        )
+    await opp.async_block_till_done()
+
+    assert calls == ["first", "second"]
+    assert "Error handling message on test-topic" in caplog.text
+    assert not opp.data["mqtt"]._inbox_scheduled
+
+    opp.data["mqtt"]._mqtt_on_message(
+        None, None, mqtt.Message("other-topic", b"third", 0, False)
+    )
+    await opp.async_block_till_done()
+
+    assert calls == ["first", "second", "third"]
+
+
 async def test_mqtt_subscribes_topics_on_connect(opp):
     """Test subscription to topic on connect."""
     mqtt_client = await async_mock_mqtt_client(opp)
@@ -744,16 +863,47 @@ async def test_mqtt_subscribes_topics_on_connect(opp):
         mqtt.Subscription("still/pending", None, 1),
     ]
 
-    opp.add_job = mock.MagicMock()
+    mqtt_client.subscribe.reset_mock()
     opp.data["mqtt"]._mqtt_on_connect(None, None, 0, 0)
 
     await opp.async_block_till_done()
 
     assert mqtt_client.disconnect.call_count == 0
 
-    expected = {"topic/test": 0, "home/sensor": 2, "still/pending": 1}
-    calls = {call[1][1]: call[1][2] for call in opp.add_job.mock_calls}
-    assert calls == expected
+    assert mqtt_client.subscribe.mock_calls == [
+        mock.call([("home/sensor", 2), ("still/pending", 1), ("topic/test", 0)])
+    ]
+
+
+async def test_subscriptions_coalesced(opp):
+    """Test subscriptions made together are sent in a single packet."""
+    mqtt_client = await async_mock_mqtt_client(opp)
+    mqtt_client.subscribe.reset_mock()
+    opp.data["mqtt"].connected = True
+
+    unsubs = await asyncio.gather(
+        mqtt.async_subscribe(opp, "test/state", None, 0),
+        mqtt.async_subscribe(opp, "test/state", None, 1),
+        mqtt.async_subscribe(opp, "test/other", None, 0),
+    )
+    assert mqtt_client.subscribe.mock_calls == [
+        mock.call([("test/state", 1), ("test/other", 0)])
+    ]
+
+    unsubs[0]()
+    await opp.async_block_till_done()
+    assert mqtt_client.unsubscribe.call_count == 0
+
+    unsubs[1]()
+    unsubs[2]()
+    await opp.async_block_till_done()
+    assert mqtt_client.unsubscribe.mock_calls == [
+        mock.call(mock.ANY),
+    ]
+    assert sorted(mqtt_client.unsubscribe.call_args[0][0]) == [
+        "test/other",
+        "test/state",
+    ]
 
 
 async def test_setup_fails_without_config(opp):
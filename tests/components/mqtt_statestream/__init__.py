@@ -0,0 +1 @@
+"""Tests for the MQTT statestream component."""
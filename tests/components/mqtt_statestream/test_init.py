@@ -0,0 +1,146 @@
+"""The tests for the MQTT statestream component."""
+import json
+from unittest.mock import ANY, call
+
+import openpeerpower.components.mqtt_statestream as statestream
+from openpeerpower.setup import async_setup_component
+
+from tests.common import async_mock_mqtt_component
+
+
+async def add_statestream(opp, **config):
+    """Set up the MQTT statestream component."""
+    mqtt_mock = await async_mock_mqtt_component(opp)
+    assert await async_setup_component(
+        opp,
+        statestream.DOMAIN,
+        {statestream.DOMAIN: {"base_topic": "pub", **config}},
+    )
+    await opp.async_block_till_done()
+    mqtt_mock.async_publish_nowait.reset_mock()
+    return mqtt_mock
+
+
+def published(mqtt_mock):
+    """Return the topics and payloads published."""
+    return {
+        args[0]: args[1] for args, _ in mqtt_mock.async_publish_nowait.call_args_list
+    }
+
+
+async def test_fails_with_no_base(opp):
+    """Setup should fail if no base_topic is set."""
+    await async_mock_mqtt_component(opp)
+    assert not await async_setup_component(
+        opp, statestream.DOMAIN, {statestream.DOMAIN: {}}
+    )
+
+
+async def test_state_changed_attr_sends_message(opp):
+    """Test the sending of a new message if attribute changed."""
+    mqtt_mock = await add_statestream(opp, publish_attributes=True)
+
+    opp.states.async_set("fake.entity", "on", {"testing": "YES", "list": [1, 2]})
+    await opp.async_block_till_done()
+
+    assert mqtt_mock.async_publish_nowait.mock_calls == [
+        call("pub/fake/entity/state", "on", 1, True),
+        call("pub/fake/entity/testing", '"YES"', 1, True),
+        call("pub/fake/entity/list", "[1, 2]", 1, True),
+    ]
+
+
+async def test_publish_changed_only(opp):
+    """Test only topics with a changed payload are published."""
+    mqtt_mock = await add_statestream(
+        opp, publish_attributes=True, publish_changed_only=True
+    )
+
+    opp.states.async_set("fake.entity", "on", {"brightness": 100, "color": "red"})
+    await opp.async_block_till_done()
+    assert published(mqtt_mock) == {
+        "pub/fake/entity/state": "on",
+        "pub/fake/entity/brightness": "100",
+        "pub/fake/entity/color": '"red"',
+    }
+
+    mqtt_mock.async_publish_nowait.reset_mock()
+    opp.states.async_set("fake.entity", "on", {"brightness": 200, "color": "red"})
+    await opp.async_block_till_done()
+    assert published(mqtt_mock) == {"pub/fake/entity/brightness": "200"}
+
+    # Everything is published again after the entity was removed
+    mqtt_mock.async_publish_nowait.reset_mock()
+    opp.states.async_remove("fake.entity")
+    opp.states.async_set("fake.entity", "on", {"brightness": 200, "color": "red"})
+    await opp.async_block_till_done()
+    assert len(published(mqtt_mock)) == 3
+
+
+async def test_publish_all_without_changed_only(opp):
+    """Test all topics are published by default."""
+    mqtt_mock = await add_statestream(opp, publish_attributes=True)
+
+    opp.states.async_set("fake.entity", "on", {"brightness": 100})
+    opp.states.async_set("fake.entity", "on", {"brightness": 200})
+    await opp.async_block_till_done()
+
+    assert mqtt_mock.async_publish_nowait.call_count == 4
+
+
+async def test_publish_json(opp):
+    """Test the state is published as a single JSON document."""
+    mqtt_mock = await add_statestream(
+        opp, publish_json=True, publish_attributes=True, publish_timestamps=True
+    )
+
+    opp.states.async_set("fake.entity", "on", {"brightness": 100})
+    await opp.async_block_till_done()
+
+    mqtt_mock.async_publish_nowait.assert_called_once_with(
+        "pub/fake/entity", ANY, 1, True
+    )
+    document = json.loads(mqtt_mock.async_publish_nowait.call_args[0][1])
+    state = opp.states.get("fake.entity")
+    assert document == {
+        "state": "on",
+        "last_updated": state.last_updated.isoformat(),
+        "last_changed": state.last_changed.isoformat(),
+        "attributes": {"brightness": 100},
+    }
+
+
+async def test_attribute_cache_compares_types(opp):
+    """Test values that compare equal but encode differently are published."""
+    mqtt_mock = await add_statestream(opp, publish_attributes=True)
+
+    for value in (1, True, 1.0, 1):
+        opp.states.async_set("fake.entity", "on", {"value": value}, force_update=True)
+        await opp.async_block_till_done()
+
+    assert [
+        args[1]
+        for args, _ in mqtt_mock.async_publish_nowait.call_args_list
+        if args[0] == "pub/fake/entity/value"
+    ] == ["1", "true", "1.0", "1"]
+
+
+async def test_attribute_cache_mutated_value(opp):
+    """Test containers changed in place are encoded again."""
+    mqtt_mock = await add_statestream(
+        opp, publish_attributes=True, publish_changed_only=True
+    )
+    sources = ["tv"]
+
+    opp.states.async_set("fake.entity", "on", {"sources": sources})
+    await opp.async_block_till_done()
+
+    sources.append("radio")
+    opp.states.async_set("fake.entity", "on", {"sources": sources}, force_update=True)
+    await opp.async_block_till_done()
+
+    assert [
+        args[1]
+        for args, _ in mqtt_mock.async_publish_nowait.call_args_list
+        if args[0] == "pub/fake/entity/sources"
+    ] == ['["tv"]', '["tv", "radio"]']
@@ -0,0 +1 @@
+"""Tests for the system_log component."""
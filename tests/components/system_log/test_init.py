@@ -0,0 +1,152 @@
+"""Test system log component."""
+import logging
+import os
+import traceback
+from unittest.mock import patch
+
+import pytest
+
+from openpeerpower.components import system_log
+from openpeerpower.core import callback
+
+_LOGGER = logging.getLogger("test_logger")
+
+OUTSIDE_PATH = "/outside/library.py"
+
+
+@pytest.fixture
+def handler(opp):
+    """Add a system log handler to the test logger."""
+    # Make this file a source within the config dir
+    opp.config.config_dir = os.path.dirname(__file__)
+    log_handler = system_log.LogErrorHandler(opp, 50, True)
+    _LOGGER.addHandler(log_handler)
+    yield log_handler
+    _LOGGER.removeHandler(log_handler)
+
+
+@pytest.fixture
+def events(opp):
+    """Collect the fired system log events."""
+    fired = []
+
+    @callback
+    def listener(event):
+        """Collect an event."""
+        fired.append(event)
+
+    opp.bus.async_listen(system_log.EVENT_SYSTEM_LOG, listener)
+    return fired
+
+
+def _log_outside(message):
+    """Log from a file outside of Open Peer Power."""
+    code = compile("_LOGGER.warning(message)", OUTSIDE_PATH, "exec")
+    exec(code, {"_LOGGER": _LOGGER, "message": message})  # pylint: disable=exec-used
+
+
+async def test_dedup_before_source(opp, handler):
+    """Test the source is only looked up for new entries."""
+    with patch.object(
+        handler, "_figure_out_source", wraps=handler._figure_out_source
+    ) as mock_source:
+        for _ in range(3):
+            _LOGGER.warning("repeated")
+        _LOGGER.warning("other")
+
+    assert len(mock_source.mock_calls) == 2
+
+    entries = handler.records.to_list()
+    assert [(entry["message"], entry["count"]) for entry in entries] == [
+        ("other", 1),
+        ("repeated", 3),
+    ]
+    assert entries[1]["first_occured"] <= entries[1]["timestamp"]
+
+
+async def test_source_matches_extracted_stack(opp, handler):
+    """Test the source from the call stack matches the extracted stack."""
+    sources = []
+
+    class CompareHandler(logging.Handler):
+        """Find the source in both ways."""
+
+        def emit(self, record):
+            """Store the source from the extracted stack and the call stack."""
+            stack = [frame[0] for frame in traceback.extract_stack()]
+            sources.append(
+                (
+                    system_log._figure_out_source(record, stack, opp),
+                    handler._figure_out_source(record),
+                )
+            )
+
+    compare = CompareHandler()
+    _LOGGER.addHandler(compare)
+
+    try:
+        _LOGGER.warning("from this file")
+        _log_outside("from outside")
+        try:
+            raise ValueError("failure")
+        except ValueError:
+            _LOGGER.exception("with a traceback")
+    finally:
+        _LOGGER.removeHandler(compare)
+
+    assert sources == [("test_init.py", "test_init.py")] * 3
+
+    # Cached from the previous lookups
+    assert handler._sources[OUTSIDE_PATH] is None
+    assert handler._sources[__file__] == "test_init.py"
+
+
+async def test_source_outside(opp, handler):
+    """Test the path of the log call is used if no caller is known."""
+    with patch(
+        "openpeerpower.components.system_log._call_stack",
+        return_value=iter([OUTSIDE_PATH]),
+    ):
+        _log_outside("from outside")
+
+    assert handler.records.to_list()[0]["source"] == OUTSIDE_PATH
+
+
+async def test_events_rate_limited(opp, handler, events):
+    """Test events are fired in a batch and limited per second."""
+    count = system_log.MAX_EVENTS_PER_SECOND + 5
+
+    for idx in range(count):
+        _LOGGER.warning("message %d", idx)
+    await opp.async_block_till_done()
+    await opp.async_block_till_done()
+
+    assert len(events) == system_log.MAX_EVENTS_PER_SECOND
+    assert events[0].data["message"] == "message 0"
+    assert handler.events_dropped == 5
+
+    with patch("time.monotonic", return_value=system_log.time.monotonic() + 1):
+        _LOGGER.warning("next second")
+        await opp.async_block_till_done()
+        await opp.async_block_till_done()
+
+    assert events[-1].data["message"] == "next second"
+    assert handler.events_dropped == 5
+
+
+async def test_pending_events_overflow_counted(opp, handler, events):
+    """Test events discarded from a full queue are counted as dropped."""
+    count = system_log.MAX_PENDING_EVENTS + 10
+
+    for idx in range(count):
+        _LOGGER.warning("message %d", idx)
+
+    assert len(handler._pending_events) == system_log.MAX_PENDING_EVENTS
+    assert handler.events_dropped == 10
+
+    await opp.async_block_till_done()
+    await opp.async_block_till_done()
+
+    assert len(events) + handler.events_dropped == count
+    # The oldest events were discarded
+    assert events[0].data["message"] == "message 10"
@@ -1,4 +1,7 @@
 """Test ZHA Gateway."""
+import time
+from unittest.mock import patch
+
 import pytest
 import zigpy.zcl.clusters.general as general
 
@@ -37,3 +40,33 @@ async def test_device_left(opp, zigpy_dev_basic, zha_dev_basic):
 
     get_zha_gateway(opp).device_left(zigpy_dev_basic)
     assert zha_dev_basic.available is False
+
+
+async def test_device_availability_sweep(opp, zigpy_dev_basic, zha_dev_basic):
+    """Quiet devices get checkins before becoming unavailable."""
+
+    zha_gateway = get_zha_gateway(opp)
+    assert zha_dev_basic.available is False
+
+    # restored device was seen recently
+    zha_gateway._async_check_available()
+    await opp.async_block_till_done()
+    assert zha_dev_basic.available is True
+
+    now = time.time()
+    zigpy_dev_basic.last_seen = now - 7200 - 10
+    basic = zigpy_dev_basic.endpoints[1].basic
+    basic.read_attributes.reset_mock()
+
+    with patch("openpeerpower.components.zha.core.gateway.time") as mock_time:
+        mock_time.time.return_value = now + 7200 + 10
+        for checkins in (1, 2):
+            zha_gateway._async_check_available()
+            await opp.async_block_till_done()
+            assert basic.read_attributes.call_count == checkins
+            assert zha_dev_basic.available is True
+
+        zha_gateway._async_check_available()
+        await opp.async_block_till_done()
+        assert basic.read_attributes.call_count == 2
+        assert zha_dev_basic.available is False
@@ -0,0 +1,115 @@
+"""Test ZHA request scheduler."""
+import asyncio
+
+import pytest
+import zigpy.exceptions
+
+from openpeerpower.components.zha.core.scheduler import (
+    RequestPriority,
+    ZHARequestScheduler,
+)
+
+
+async def test_priority_order():
+    """Commands are sent before reads and configuration requests."""
+    scheduler = ZHARequestScheduler(max_in_flight=1)
+    blocker = asyncio.Event()
+    order = []
+
+    async def request(name):
+        if name == "blocker":
+            await blocker.wait()
+        order.append(name)
+
+    tasks = [
+        asyncio.ensure_future(
+            scheduler.async_request("dev1", RequestPriority.READ, request, "blocker")
+        )
+    ]
+    await asyncio.sleep(0)
+    for name, priority in (
+        ("configure", RequestPriority.CONFIGURE),
+        ("read", RequestPriority.READ),
+        ("command", RequestPriority.COMMAND),
+    ):
+        tasks.append(
+            asyncio.ensure_future(
+                scheduler.async_request("dev2", priority, request, name)
+            )
+        )
+    await asyncio.sleep(0)
+    assert scheduler.metrics["queued"] == 3
+
+    blocker.set()
+    await asyncio.gather(*tasks)
+    assert order == ["blocker", "command", "read", "configure"]
+    assert scheduler.metrics["in_flight"] == 0
+    assert scheduler.metrics["requests"] == 4
+
+
+async def test_per_device_limit():
+    """A busy device does not hold up requests to other devices."""
+    scheduler = ZHARequestScheduler(max_in_flight=2, max_in_flight_per_device=1)
+    blocker = asyncio.Event()
+    order = []
+
+    async def request(name):
+        if name == "busy":
+            await blocker.wait()
+        order.append(name)
+
+    busy = asyncio.ensure_future(
+        scheduler.async_request("dev1", RequestPriority.COMMAND, request, "busy")
+    )
+    await asyncio.sleep(0)
+    queued = asyncio.ensure_future(
+        scheduler.async_request("dev1", RequestPriority.COMMAND, request, "queued")
+    )
+    await asyncio.sleep(0)
+
+    await scheduler.async_request("dev2", RequestPriority.READ, request, "other")
+    assert order == ["other"]
+
+    blocker.set()
+    await asyncio.gather(busy, queued)
+    assert order == ["other", "busy", "queued"]
+
+
+async def test_nack_metrics():
+    """Delivery errors are counted and raised."""
+    scheduler = ZHARequestScheduler()
+
+    async def request():
+        raise zigpy.exceptions.DeliveryError("nack")
+
+    with pytest.raises(zigpy.exceptions.DeliveryError):
+        await scheduler.async_request("dev1", RequestPriority.COMMAND, request)
+
+    assert scheduler.metrics["nacks"] == 1
+    assert scheduler.metrics["nack_rate"] == 1.0
+    assert scheduler.metrics["in_flight"] == 0
+
+
+async def test_cancelled_request_releases_slot():
+    """A cancelled queued request does not take a slot."""
+    scheduler = ZHARequestScheduler(max_in_flight=1)
+    blocker = asyncio.Event()
+
+    async def request():
+        await blocker.wait()
+
+    running = asyncio.ensure_future(
+        scheduler.async_request("dev1", RequestPriority.COMMAND, request)
+    )
+    await asyncio.sleep(0)
+    queued = asyncio.ensure_future(
+        scheduler.async_request("dev2", RequestPriority.COMMAND, request)
+    )
+    await asyncio.sleep(0)
+    queued.cancel()
+
+    blocker.set()
+    await running
+    with pytest.raises(asyncio.CancelledError):
+        await queued
+    assert scheduler.metrics["in_flight"] == 0
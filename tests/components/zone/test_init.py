@@ -198,6 +198,47 @@ async def test_active_zone_prefers_smaller_zone_if_same_distance_2(opp):
     assert "zone.smallest_zone" == active.entity_id
 
 
+async def test_active_zone_follows_zone_changes(opp):
+    """Test the active zone is looked up again after zones changed."""
+    latitude = 32.880600
+    longitude = -117.237561
+    assert await setup.async_setup_component(
+        opp,
+        zone.DOMAIN,
+        {
+            "zone": [
+                {
+                    "name": "Big Zone",
+                    "latitude": latitude,
+                    "longitude": longitude,
+                    "radius": 5000,
+                },
+                {
+                    "name": "Far Zone",
+                    "latitude": latitude + 1,
+                    "longitude": longitude,
+                    "radius": 250,
+                },
+            ]
+        },
+    )
+    await opp.async_block_till_done()
+
+    active = zone.async_active_zone(opp, latitude + 0.01, longitude)
+    assert active.entity_id == "zone.big_zone"
+    assert zone.async_active_zone(opp, latitude + 0.5, longitude) is None
+
+    opp.states.async_set(
+        "zone.small_zone",
+        "zoning",
+        {"latitude": latitude + 0.01, "longitude": longitude, "radius": 50},
+    )
+    await opp.async_block_till_done()
+
+    active = zone.async_active_zone(opp, latitude + 0.01, longitude)
+    assert active.entity_id == "zone.small_zone"
+
+
 async def test_in_zone_works_for_passive_zones(opp):
     """Test working in passive zones."""
     latitude = 32.880600
@@ -0,0 +1,120 @@
+"""Test dispatcher helpers."""
+from openpeerpower.core import callback
+from openpeerpower.helpers.dispatcher import (
+    async_dispatcher_connect,
+    async_dispatcher_send,
+    async_dispatcher_signal_counts,
+)
+
+
+async def test_simple_function(opp):
+    """Test simple function (executor)."""
+    calls = []
+
+    def test_funct(data):
+        """Test function."""
+        calls.append(data)
+
+    async_dispatcher_connect(opp, "test", test_funct)
+    async_dispatcher_send(opp, "test", 3)
+    await opp.async_block_till_done()
+
+    assert calls == [3]
+
+
+async def test_callback_targets_are_scheduled(opp):
+    """Test callback targets run after the send in connect order."""
+    calls = []
+
+    @callback
+    def first(data):
+        """Record first."""
+        calls.append(("first", data))
+
+    @callback
+    def second(data):
+        """Record second."""
+        calls.append(("second", data))
+
+    async_dispatcher_connect(opp, "test", first)
+    async_dispatcher_connect(opp, "test", second)
+    async_dispatcher_send(opp, "test", 1)
+    async_dispatcher_send(opp, "test", 2)
+
+    assert calls == []
+
+    await opp.async_block_till_done()
+
+    assert calls == [("first", 1), ("second", 1), ("first", 2), ("second", 2)]
+
+
+async def test_connect_and_disconnect_while_sending(opp):
+    """Test targets connected when sending get the signal."""
+    calls = []
+
+    @callback
+    def old_target(data):
+        """Record old target."""
+        calls.append(("old", data))
+
+    @callback
+    def new_target(data):
+        """Record new target."""
+        calls.append(("new", data))
+
+    unsub_old = async_dispatcher_connect(opp, "test", old_target)
+
+    @callback
+    def swap_targets(data):
+        """Replace the old target with the new target."""
+        unsub_old()
+        async_dispatcher_connect(opp, "test", new_target)
+
+    unsub_swap = async_dispatcher_connect(opp, "test", swap_targets)
+
+    async_dispatcher_send(opp, "test", 1)
+    await opp.async_block_till_done()
+    unsub_swap()
+
+    async_dispatcher_send(opp, "test", 2)
+    await opp.async_block_till_done()
+
+    assert calls == [("old", 1), ("new", 2)]
+
+
+async def test_callback_exception_gets_logged(opp, caplog):
+    """Test exception raised by a callback target."""
+    calls = []
+
+    @callback
+    def bad_handler(*args):
+        """Raise an exception."""
+        raise Exception("This is a bad message callback")
+
+    @callback
+    def good_handler(data):
+        """Record calls."""
+        calls.append(data)
+
+    async_dispatcher_connect(opp, "test", bad_handler)
+    async_dispatcher_connect(opp, "test", good_handler)
+    async_dispatcher_send(opp, "test", "bad")
+    await opp.async_block_till_done()
+
+    assert calls == ["bad"]
+    assert "Exception in bad_handler when dispatching 'test': ('bad',)" in caplog.text
+
+
+async def test_signal_counts(opp):
+    """Test sends are only counted for connected signals."""
+    unsub = async_dispatcher_connect(opp, "test", callback(lambda data: None))
+
+    async_dispatcher_send(opp, "test", 1)
+    async_dispatcher_send(opp, "test", 2)
+    async_dispatcher_send(opp, "other", 1)
+
+    assert async_dispatcher_signal_counts(opp) == {"test": 2}
+
+    unsub()
+
+    assert async_dispatcher_signal_counts(opp) == {}
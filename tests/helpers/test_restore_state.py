@@ -0,0 +1,216 @@
+"""The tests for the Restore component."""
+from datetime import timedelta
+from unittest.mock import patch
+
+from openpeerpower.core import State
+from openpeerpower.helpers.restore_state import (
+    STORAGE_KEY,
+    RestoreEntity,
+    RestoreStateData,
+    RestoreStateStore,
+    _replay_journal,
+)
+from openpeerpower.util import dt as dt_util
+
+
+def _mock_stored_data(opp_storage, last_dump, states):
+    """Store restore state data in the version 2 format."""
+    opp_storage[STORAGE_KEY] = {
+        "version": 2,
+        "key": STORAGE_KEY,
+        "data": {"last_dump": last_dump.isoformat(), "states": states},
+    }
+
+
+async def _async_get_data(opp):
+    """Return the restore state data after the initial dump."""
+    data = await RestoreStateData.async_get_instance(opp)
+    await opp.async_block_till_done()
+    return data
+
+
+async def test_migrate_v1_states(opp):
+    """Test the list of stored states is migrated to compact entries."""
+    now = dt_util.utcnow()
+    changed = State("input_boolean.b1", "on", {"icon": "mdi:power"})
+    updated = State(
+        "input_boolean.b2",
+        "off",
+        {},
+        last_changed=now - timedelta(hours=1),
+        last_updated=now,
+    )
+    old_data = [
+        {"state": changed.as_dict(), "last_seen": now.isoformat()},
+        {"state": updated.as_dict(), "last_seen": now.isoformat()},
+    ]
+    store = RestoreStateStore(opp, 2, STORAGE_KEY)
+
+    data = await store._async_migrate_func(1, old_data)
+
+    assert data["states"] == {
+        "input_boolean.b1": {
+            "state": "on",
+            "attributes": {"icon": "mdi:power"},
+            "last_changed": changed.last_changed,
+            "last_seen": now.isoformat(),
+        },
+        "input_boolean.b2": {
+            "state": "off",
+            "attributes": {},
+            "last_changed": updated.last_changed,
+            "last_updated": updated.last_updated,
+            "last_seen": now.isoformat(),
+        },
+    }
+    assert dt_util.parse_datetime(data["last_dump"]) >= now
+
+
+async def test_lazy_decode(opp, opp_storage):
+    """Test stored entries are only decoded when asked for."""
+    last_dump = dt_util.utcnow() - timedelta(hours=1)
+    _mock_stored_data(
+        opp_storage,
+        last_dump,
+        {
+            "input_boolean.b1": {
+                "state": "on",
+                "attributes": {"icon": "mdi:power"},
+                "last_changed": "2020-01-01T10:00:00+00:00",
+            },
+            "input_boolean.broken": {"state": "on", "attributes": {}},
+        },
+    )
+
+    data = await _async_get_data(opp)
+
+    assert data.last_states == {}
+    assert set(data.last_entries) == {"input_boolean.b1", "input_boolean.broken"}
+
+    entity = RestoreEntity()
+    entity.opp = opp
+    entity.entity_id = "input_boolean.b1"
+    state = await entity.async_get_last_state()
+
+    assert state.state == "on"
+    assert state.attributes == {"icon": "mdi:power"}
+    assert state.last_updated == state.last_changed
+    assert data.last_states["input_boolean.b1"].last_seen == last_dump
+    assert "input_boolean.b1" not in data.last_entries
+
+    assert data.async_get_stored_state("input_boolean.broken") is None
+    assert data.async_get_stored_state("input_boolean.unknown") is None
+
+
+async def test_only_dirty_entities_journaled(opp, opp_storage):
+    """Test later dumps only save the entities that changed."""
+    deltas = []
+
+    async def mock_save_delta(data_func, delta):
+        """Record the saved delta."""
+        deltas.append(delta)
+
+    opp.states.async_set("input_boolean.b1", "on")
+    opp.states.async_set("input_boolean.b2", "off")
+    data = await _async_get_data(opp)
+    assert opp_storage[STORAGE_KEY]["data"]["states"] == {}
+
+    with patch.object(data.store, "async_save_delta", mock_save_delta):
+        data.async_restore_entity_added("input_boolean.b1")
+        data.async_restore_entity_added("input_boolean.b2")
+        await data.async_dump_states()
+
+        assert set(deltas[-1]["set"]) == {"input_boolean.b1", "input_boolean.b2"}
+        assert deltas[-1]["remove"] == []
+
+        opp.states.async_set("input_boolean.b1", "off")
+        opp.states.async_set("sensor.not_restored", "1")
+        await opp.async_block_till_done()
+        await data.async_dump_states()
+
+        assert list(deltas[-1]["set"]) == ["input_boolean.b1"]
+        assert deltas[-1]["set"]["input_boolean.b1"]["state"] == "off"
+
+        # Nothing changed
+        await data.async_dump_states()
+        assert len(deltas) == 2
+
+        data.async_restore_entity_removed("input_boolean.b2")
+        opp.states.async_remove("input_boolean.b2")
+        await opp.async_block_till_done()
+        await data.async_dump_states()
+
+        assert "last_seen" in deltas[-1]["set"]["input_boolean.b2"]
+
+
+async def test_stale_entries_expire(opp, opp_storage):
+    """Test entries of absent entities expire."""
+    deltas = []
+
+    async def mock_save_delta(data_func, delta):
+        """Record the saved delta."""
+        deltas.append(delta)
+
+    now = dt_util.utcnow()
+    entry = {"state": "on", "attributes": {}, "last_changed": now.isoformat()}
+    _mock_stored_data(
+        opp_storage,
+        now - timedelta(days=1),
+        {
+            "input_boolean.stale": dict(
+                entry, last_seen=(now - timedelta(days=8)).isoformat()
+            ),
+            "input_boolean.recent": dict(
+                entry, last_seen=(now - timedelta(days=6)).isoformat()
+            ),
+            # Registered in the last run, last seen at the last dump
+            "input_boolean.last_run": entry,
+        },
+    )
+
+    data = await _async_get_data(opp)
+
+    assert set(opp_storage[STORAGE_KEY]["data"]["states"]) == {
+        "input_boolean.recent",
+        "input_boolean.last_run",
+    }
+
+    with patch.object(data.store, "async_save_delta", mock_save_delta), patch(
+        "openpeerpower.util.dt.utcnow", return_value=now + timedelta(days=2)
+    ):
+        await data.async_dump_states()
+
+    assert deltas[-1]["set"] == {}
+    assert deltas[-1]["remove"] == ["input_boolean.recent"]
+
+
+def test_replay_journal():
+    """Test replaying journaled dumps."""
+    data = {
+        "last_dump": "2020-01-01T10:00:00+00:00",
+        "states": {"input_boolean.b1": {"state": "on"}, "input_boolean.b2": {}},
+    }
+
+    data = _replay_journal(
+        data,
+        [
+            {
+                "last_dump": "2020-01-01T10:15:00+00:00",
+                "set": {"input_boolean.b1": {"state": "off"}},
+                "remove": ["input_boolean.b2"],
+            },
+            {
+                "last_dump": "2020-01-01T10:30:00+00:00",
+                "set": {"input_boolean.b3": {"state": "on"}},
+                "remove": [],
+            },
+        ],
+    )
+
+    assert data == {
+        "last_dump": "2020-01-01T10:30:00+00:00",
+        "states": {
+            "input_boolean.b1": {"state": "off"},
+            "input_boolean.b3": {"state": "on"},
+        },
+    }
@@ -0,0 +1,225 @@
+"""Test service helpers."""
+import asyncio
+import logging
+from types import SimpleNamespace
+
+import pytest
+
+from openpeerpower import core as op
+from openpeerpower.helpers import service
+from openpeerpower.helpers.entity import Entity
+from openpeerpower.helpers.entity_platform import EntityPlatform
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class MockEntity(Entity):
+    """Entity recording the service calls."""
+
+    should_poll = False
+
+    def __init__(self, entity_id, handler=None):
+        """Initialize the entity."""
+        self.entity_id = entity_id
+        self.handler = handler
+        self.calls = 0
+
+    async def async_turn_on(self, **kwargs):
+        """Turn the entity on."""
+        self.calls += 1
+        if self.handler is not None:
+            await self.handler()
+
+
+def _mock_platform(opp, name, entities, **module_attrs):
+    """Return a platform of an integration with entities."""
+    platform = EntityPlatform(
+        opp=opp,
+        logger=_LOGGER,
+        domain="light",
+        platform_name=name,
+        platform=SimpleNamespace(**module_attrs),
+        scan_interval=None,
+        entity_namespace=None,
+    )
+    for entity in entities:
+        entity.opp = opp
+        entity.platform = platform
+        platform.entities[entity.entity_id] = entity
+    return platform
+
+
+def _turn_on(entity_ids):
+    """Return a turn on service call."""
+    return op.ServiceCall("light", "turn_on", {"entity_id": entity_ids})
+
+
+async def test_limiter_limits_concurrent_calls():
+    """Test calls wait for a free slot."""
+    limiter = service.ServiceCallLimiter(2)
+    assert limiter.limit == 2
+
+    await limiter.async_acquire()
+    await limiter.async_acquire()
+    waiter = asyncio.ensure_future(limiter.async_acquire())
+    await asyncio.sleep(0)
+    assert not waiter.done()
+
+    limiter.async_release(0.01)
+    await asyncio.sleep(0)
+    assert waiter.done()
+    assert limiter.active == 2
+
+    # Cancelled waiters don't take a slot
+    cancelled = asyncio.ensure_future(limiter.async_acquire())
+    await asyncio.sleep(0)
+    cancelled.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await cancelled
+    limiter.async_release(0.01)
+    assert limiter.active == 1
+
+
+async def test_limiter_cancelled_before_release():
+    """Test a waiter cancelled right before a release doesn't take the slot."""
+    limiter = service.ServiceCallLimiter(1)
+
+    await limiter.async_acquire()
+    cancelled = asyncio.ensure_future(limiter.async_acquire())
+    await asyncio.sleep(0)
+    cancelled.cancel()
+    limiter.async_release(0.01)
+    with pytest.raises(asyncio.CancelledError):
+        await cancelled
+    assert limiter.active == 0
+    assert not limiter._waiters
+
+
+async def test_limiter_adapts_limit():
+    """Test the limit grows for fast calls and is halved for slow ones."""
+    limiter = service.ServiceCallLimiter(10)
+    assert limiter.limit == service.INITIAL_PARALLEL_SERVICE_CALLS
+
+    for _ in range(4):
+        await limiter.async_acquire()
+        limiter.async_release(0.1)
+    assert limiter.limit == 10
+
+    await limiter.async_acquire()
+    limiter.async_release(0.1 * service.SLOW_CALL_FACTOR + 1)
+    assert limiter.limit == 5
+
+    await limiter.async_acquire()
+    limiter.async_release(0.1, failed=True)
+    assert limiter.limit == 2
+
+
+async def test_entity_service_call_latencies(opp):
+    """Test the latency is returned for every called entity."""
+    entities = [MockEntity(f"light.test_{idx}") for idx in range(3)]
+    platform = _mock_platform(opp, "test", entities)
+
+    latencies = await service.entity_service_call(
+        opp, [platform], "async_turn_on", _turn_on(["light.test_0", "light.test_2"])
+    )
+
+    assert set(latencies) == {"light.test_0", "light.test_2"}
+    assert all(latency >= 0 for latency in latencies.values())
+    assert [entity.calls for entity in entities] == [1, 0, 1]
+
+
+async def test_entity_service_call_limited(opp):
+    """Test concurrent calls to an integration are limited."""
+    running = 0
+    max_running = 0
+
+    async def handler():
+        """Track the concurrent calls."""
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0)
+        running -= 1
+
+    entities = [MockEntity(f"light.test_{idx}", handler) for idx in range(10)]
+    platform = _mock_platform(opp, "test", entities, PARALLEL_SERVICE_CALLS=2)
+
+    await service.entity_service_call(opp, [platform], "async_turn_on", _turn_on("all"))
+
+    assert all(entity.calls == 1 for entity in entities)
+    assert max_running == 2
+
+
+async def test_nested_call_same_integration(opp):
+    """Test calls from within a call to the same integration are not limited."""
+    member = MockEntity("light.member")
+    members = [MockEntity(f"light.member_{idx}") for idx in range(3)]
+
+    async def call_members():
+        """Call the members like a group light."""
+        await service.entity_service_call(
+            opp,
+            [platform],
+            "async_turn_on",
+            _turn_on(["light.member"] + [entity.entity_id for entity in members]),
+        )
+
+    groups = [MockEntity(f"light.group_{idx}", call_members) for idx in range(2)]
+    platform = _mock_platform(
+        opp, "test", groups + members + [member], PARALLEL_SERVICE_CALLS=1
+    )
+    limiter = service._async_get_limiter(opp, platform)
+
+    await asyncio.wait_for(
+        service.entity_service_call(
+            opp,
+            [platform],
+            "async_turn_on",
+            _turn_on([entity.entity_id for entity in groups]),
+        ),
+        1,
+    )
+
+    assert member.calls == 2
+    assert limiter.active == 0
+    assert service._active_limiters.get() == frozenset()
+
+
+async def test_bulk_service_call(opp):
+    """Test platforms with a bulk handler are called once."""
+    bulk_calls = []
+
+    async def async_bulk_service_call(opp, entities, func, data):
+        """Handle the call for all entities."""
+        bulk_calls.append(([entity.entity_id for entity in entities], func, data))
+
+    entities = [MockEntity(f"light.bulk_{idx}") for idx in range(3)]
+    platform = _mock_platform(
+        opp, "bulk", entities, async_bulk_service_call=async_bulk_service_call
+    )
+    other = MockEntity("light.other")
+    other_platform = _mock_platform(opp, "other", [other])
+
+    context = op.Context()
+    call = op.ServiceCall(
+        "light", "turn_on", {"entity_id": "all", "brightness": 10}, context=context
+    )
+    latencies = await service.entity_service_call(
+        opp, [platform, other_platform], "async_turn_on", call
+    )
+
+    assert bulk_calls == [
+        (
+            ["light.bulk_0", "light.bulk_1", "light.bulk_2"],
+            "async_turn_on",
+            {"brightness": 10},
+        )
+    ]
+    assert all(entity.calls == 0 for entity in entities)
+    assert all(entity._context is context for entity in entities)
+    assert other.calls == 1
+    # All entities of the bulk call have its latency
+    assert len({latencies[entity.entity_id] for entity in entities}) == 1
+    assert set(latencies) == {"light.bulk_0", "light.bulk_1", "light.bulk_2"} | {
+        "light.other"
+    }
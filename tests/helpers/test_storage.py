@@ -0,0 +1,203 @@
+"""Tests for the storage helper journal."""
+import json
+import os
+from unittest.mock import patch
+
+import pytest
+
+from openpeerpower.helpers import entity_registry, storage
+
+MOCK_VERSION = 1
+MOCK_KEY = "storage-test"
+
+
+def _replay(data, deltas):
+    """Append the journaled items."""
+    data["items"] = data["items"] + deltas
+    return data
+
+
+@pytest.fixture
+def store(opp, tmpdir):
+    """Fixture of a store with a journal in a temporary config dir."""
+    opp.config.config_dir = str(tmpdir)
+    os.makedirs(opp.config.path(storage.STORAGE_DIR))
+    return storage.Store(opp, MOCK_VERSION, MOCK_KEY, journal_replay=_replay)
+
+
+def _write_files(store, data, lines, journal_seq=0):
+    """Write a data file and raw journal lines."""
+    with open(store.path, "w") as fdesc:
+        json.dump(
+            {
+                "version": MOCK_VERSION,
+                "key": MOCK_KEY,
+                "data": data,
+                "journal_seq": journal_seq,
+            },
+            fdesc,
+        )
+    with open(store.journal_path, "w") as fdesc:
+        fdesc.write("".join(lines))
+
+
+def _read_journal(store):
+    """Return the entries of the journal."""
+    with open(store.journal_path) as fdesc:
+        return [json.loads(line) for line in fdesc]
+
+
+def test_journal_replayed_on_load(store):
+    """Test journal entries newer than the data file are replayed."""
+    _write_files(
+        store,
+        {"items": [1]},
+        [
+            '{"seq": 1, "delta": 1}\n',
+            '{"seq": 2, "delta": 2}\n',
+            '{"seq": 3, "delta": 3}\n',
+        ],
+        journal_seq=1,
+    )
+
+    data, seq, entries = store._load_journaled_data()
+
+    assert data["data"] == {"items": [1, 2, 3]}
+    assert seq == 3
+    assert entries == 2
+    assert store._data_size == os.path.getsize(store.path)
+    assert store._journal_size == os.path.getsize(store.journal_path)
+
+
+def test_journal_truncated_trailing_line(store):
+    """Test an entry cut off by a crash is ignored."""
+    _write_files(
+        store, {"items": []}, ['{"seq": 1, "delta": 1}\n', '{"seq": 2, "del']
+    )
+
+    data, seq, entries = store._load_journaled_data()
+
+    assert data["data"] == {"items": [1]}
+    assert seq == 1
+    assert entries is None
+
+
+def test_journal_invalid_entry_skipped(store):
+    """Test entries without a sequence number are skipped."""
+    _write_files(
+        store,
+        {"items": []},
+        ['{"seq": 1, "delta": 1}\n', '{"delta": 5}\n', '{"seq": 2, "delta": 2}\n'],
+    )
+
+    data, seq, entries = store._load_journaled_data()
+
+    assert data["data"] == {"items": [1, 2]}
+    assert seq == 2
+    assert entries is None
+
+
+async def test_save_delta_appends_to_journal(opp, opp_storage, store):
+    """Test deltas are appended to the journal after a full save."""
+    await store.async_save({"items": []})
+    assert opp_storage[MOCK_KEY]["data"] == {"items": []}
+
+    await store.async_save_delta(lambda: {"items": [1]}, 1)
+    await store.async_save_delta(lambda: {"items": [1, 2]}, 2)
+
+    assert _read_journal(store) == [{"seq": 1, "delta": 1}, {"seq": 2, "delta": 2}]
+    assert opp_storage[MOCK_KEY]["data"] == {"items": []}
+
+
+async def test_journal_compacted(opp, opp_storage, store):
+    """Test the journal is compacted into the data file when it is full."""
+    items = []
+
+    async def save_item(item):
+        """Add an item and journal it."""
+        items.append(item)
+        await store.async_save_delta(lambda: {"items": list(items)}, item)
+
+    await store.async_save({"items": []})
+
+    with patch("openpeerpower.helpers.storage.JOURNAL_MAX_ENTRIES", 2):
+        await save_item(1)
+        await save_item(2)
+        assert opp_storage[MOCK_KEY]["data"] == {"items": []}
+
+        await save_item(3)
+
+    assert opp_storage[MOCK_KEY]["data"] == {"items": [1, 2, 3]}
+    assert opp_storage[MOCK_KEY]["journal_seq"] == 2
+
+    await save_item(4)
+
+    assert _read_journal(store)[-1] == {"seq": 3, "delta": 4}
+
+
+async def test_journal_compacted_by_size(opp, opp_storage, store):
+    """Test the journal is compacted when it is larger than the data file."""
+    items = []
+
+    async def save_item(item):
+        """Add an item and journal it."""
+        items.append(item)
+        await store.async_save_delta(lambda: {"items": list(items)}, item)
+
+    await store.async_save({"items": []})
+
+    with patch("openpeerpower.helpers.storage.JOURNAL_MIN_SIZE", 40):
+        await save_item(1)
+        await save_item(2)
+        assert opp_storage[MOCK_KEY]["data"] == {"items": []}
+        assert store._journal_size == os.path.getsize(store.journal_path)
+
+        await save_item(3)
+
+    assert opp_storage[MOCK_KEY]["data"] == {"items": [1, 2, 3]}
+    assert store._journal_size == 0
+
+
+async def test_journal_encode_error_writes_data(opp, opp_storage, store):
+    """Test the data is written in full if a delta can not be encoded."""
+    circular = []
+    circular.append(circular)
+    await store.async_save({"items": []})
+    await store.async_save_delta(lambda: {"items": [1]}, 1)
+
+    for delta in (object(), circular):
+        await store.async_save_delta(lambda: {"items": [1, 2]}, delta)
+
+        assert opp_storage[MOCK_KEY]["data"] == {"items": [1, 2]}
+        assert opp_storage[MOCK_KEY]["journal_seq"] == 1
+
+    await store.async_save_delta(lambda: {"items": [1, 2, 3]}, 3)
+
+    assert _read_journal(store)[-1] == {"seq": 2, "delta": 3}
+
+
+def test_entity_registry_replay_journal():
+    """Test replaying entity registry changes."""
+    data = {
+        "entities": [
+            {"entity_id": "light.kitchen", "name": None},
+            {"entity_id": "light.hall", "name": None},
+            {"entity_id": "light.porch", "name": None},
+        ]
+    }
+
+    data = entity_registry._replay_journal(
+        data,
+        [
+            {"set": {"entity_id": "light.hall", "name": "Hall"}},
+            {"remove": "light.kitchen"},
+            {"set": {"entity_id": "light.garage", "name": None}},
+            {"remove": "light.unknown"},
+        ],
+    )
+
+    assert data["entities"] == [
+        {"entity_id": "light.hall", "name": "Hall"},
+        {"entity_id": "light.porch", "name": None},
+        {"entity_id": "light.garage", "name": None},
+    ]
@@ -0,0 +1,119 @@
+"""Test config utils."""
+from unittest.mock import Mock, patch
+
+import voluptuous as vol
+
+from openpeerpower import config as config_util
+import openpeerpower.helpers.config_validation as cv
+
+
+def _mock_integration(domain, component):
+    """Return an integration without a config platform."""
+    integration = Mock(domain=domain, documentation=None)
+    integration.get_component.return_value = component
+    integration.get_platform.side_effect = ImportError
+    return integration
+
+
+async def test_validated_config_cached(opp):
+    """Test the validated config of an integration is reused."""
+    schema = Mock(
+        wraps=vol.Schema(
+            {"comp": {vol.Required("value"): cv.positive_int}}, extra=vol.ALLOW_EXTRA
+        )
+    )
+    integration = _mock_integration("comp", Mock(CONFIG_SCHEMA=schema))
+
+    config = {"comp": {"value": "1"}, "other": {"key": "raw"}}
+    result = await config_util.async_process_component_config(
+        opp, config, integration
+    )
+    assert result == {"comp": {"value": 1}, "other": {"key": "raw"}}
+    assert len(schema.mock_calls) == 1
+
+    # Changes to the result don't end up in the cache
+    result["comp"]["value"] = 5
+
+    config = {"comp": {"value": "1"}, "other": {"key": "changed"}}
+    result = await config_util.async_process_component_config(
+        opp, config, integration
+    )
+    assert result == {"comp": {"value": 1}, "other": {"key": "changed"}}
+    assert len(schema.mock_calls) == 1
+
+    config = {"comp": {"value": "2"}, "other": {"key": "changed"}}
+    result = await config_util.async_process_component_config(
+        opp, config, integration
+    )
+    assert result["comp"] == {"value": 2}
+    assert len(schema.mock_calls) == 2
+
+    # A reloaded integration is validated again
+    integration = _mock_integration("comp", Mock(CONFIG_SCHEMA=schema))
+    await config_util.async_process_component_config(opp, config, integration)
+    assert len(schema.mock_calls) == 3
+
+
+async def test_invalid_config_not_cached(opp):
+    """Test a config that failed validation is validated again."""
+    schema = Mock(wraps=vol.Schema({"comp": {vol.Required("value"): int}}))
+    integration = _mock_integration("comp", Mock(CONFIG_SCHEMA=schema))
+    config = {"comp": {"value": "not a number"}}
+
+    for _ in range(2):
+        assert (
+            await config_util.async_process_component_config(opp, config, integration)
+            is None
+        )
+
+    assert len(schema.mock_calls) == 2
+
+
+async def test_validated_platform_config_cached(opp):
+    """Test validated platform configs are reused."""
+    component = Mock(
+        spec=["PLATFORM_SCHEMA_BASE"], PLATFORM_SCHEMA_BASE=cv.PLATFORM_SCHEMA_BASE
+    )
+    integration = _mock_integration("comp", component)
+    platform_schema = Mock(
+        wraps=cv.PLATFORM_SCHEMA.extend({vol.Required("value"): cv.positive_int})
+    )
+    platform_integration = Mock(documentation=None)
+    platform_integration.get_platform.return_value = Mock(
+        PLATFORM_SCHEMA=platform_schema
+    )
+
+    async def process(config):
+        """Validate the config."""
+        with patch(
+            "openpeerpower.config.async_get_integration_with_requirements",
+            return_value=platform_integration,
+        ):
+            return await config_util.async_process_component_config(
+                opp, config, integration
+            )
+
+    config = {
+        "comp": {"platform": "test", "value": "1"},
+        "comp 2": [{"platform": "test", "value": "2"}],
+    }
+    result = await process(config)
+    assert result == {
+        "comp": [
+            {"platform": "test", "value": 1},
+            {"platform": "test", "value": 2},
+        ]
+    }
+    assert len(platform_schema.mock_calls) == 2
+
+    assert await process(config) == result
+    assert len(platform_schema.mock_calls) == 2
+
+    config["comp 2"] = [{"platform": "test", "value": "invalid"}]
+    result = await process(config)
+    assert result == {"comp": [{"platform": "test", "value": 1}]}
+    assert len(platform_schema.mock_calls) == 4
+
+    # Errors are logged again
+    assert await process(config) == result
+    assert len(platform_schema.mock_calls) == 6
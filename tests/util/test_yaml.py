@@ -0,0 +1,198 @@
+"""Test Open Peer Power yaml loader."""
+from datetime import date
+import json
+import os
+import stat
+from unittest.mock import patch
+
+import pytest
+
+from openpeerpower.util import yaml
+from openpeerpower.util.yaml import loader as yaml_loader
+from openpeerpower.util.yaml.objects import NodeListClass, NodeStrClass
+
+
+@pytest.fixture(autouse=True)
+def clear_secrets():
+    """Clear the cached secrets after a test."""
+    yield
+    yaml.clear_secret_cache()
+
+
+def _write(path, content):
+    """Write a file and return its path."""
+    path.write(content, ensure=True)
+    return str(path)
+
+
+def test_line_numbers(tmpdir):
+    """Test file and line references are added to the parsed nodes."""
+    _write(tmpdir.join("included.yaml"), "value")
+    fname = _write(
+        tmpdir.join("configuration.yaml"),
+        "key:\n  nested: 1\nlist:\n  - item\nincluded: !include included.yaml\n",
+    )
+
+    data = yaml.load_yaml(fname)
+
+    assert data.__config_file__ == fname
+    assert data.__line__ == 0
+    assert data["key"].__line__ == 1
+    assert isinstance(data["list"], NodeListClass)
+    assert data["list"].__line__ == 3
+    assert isinstance(data["included"], NodeStrClass)
+    assert data["included"] == "value"
+    assert data["included"].__config_file__ == fname
+    assert data["included"].__line__ == 4
+
+
+@pytest.mark.skipif(not yaml_loader.HAS_C_LOADER, reason="LibYAML not available")
+def test_line_numbers_libyaml(tmpdir):
+    """Test references with LibYAML match the pure Python loader."""
+    fname = _write(
+        tmpdir.join("configuration.yaml"),
+        "key:\n  nested: 1\n\nlist:\n  - item\n  - other: 2\n",
+    )
+
+    fast = yaml.load_yaml(fname)
+    with patch.object(yaml_loader, "FastSafeLoader", yaml_loader.SafeLineLoader):
+        slow = yaml.load_yaml(fname)
+
+    assert fast == slow
+    for key in ("key", "list"):
+        assert fast[key].__line__ == slow[key].__line__
+        assert fast[key].__config_file__ == slow[key].__config_file__ == fname
+    assert fast["list"][1].__line__ == slow["list"][1].__line__ == 5
+
+
+def test_cache_keeps_types_and_references(tmpdir):
+    """Test a cached result is equal to a parsed one."""
+    _write(tmpdir.join("included.yaml"), "value")
+    fname = _write(
+        tmpdir.join("configuration.yaml"),
+        "day: 2020-01-01\n"
+        "binary: !!binary aGVsbG8=\n"
+        "numbers: !!set {1, 2}\n"
+        "1: integer key\n"
+        "nested:\n  - [a, 1.5, null, true]\n"
+        "included: !include included.yaml\n",
+    )
+    cache = yaml.YamlCache()
+
+    parsed = cache.load(fname)
+    cached = cache.load(fname)
+
+    # The included file is cached too
+    assert (cache.misses, cache.hits) == (2, 1)
+    assert cached == parsed
+    assert cached is not parsed
+    assert cached["day"] == date(2020, 1, 1)
+    assert cached["binary"] == b"hello"
+    assert cached["numbers"] == {1, 2}
+    assert cached[1] == "integer key"
+    assert type(cached) is type(parsed)
+    assert type(cached["nested"][0]) is NodeListClass
+    assert type(cached["included"]) is NodeStrClass
+    assert cached["nested"][0].__line__ == parsed["nested"][0].__line__ == 5
+    assert cached["included"].__config_file__ == fname
+
+
+def test_cache_invalidated_on_include_change(tmpdir):
+    """Test a changed included file is parsed again."""
+    included = _write(tmpdir.join("included.yaml"), "value: 1")
+    _write(tmpdir.join("dir").join("first.yaml"), "first: 1")
+    fname = _write(
+        tmpdir.join("configuration.yaml"),
+        "included: !include included.yaml\n"
+        "merged: !include_dir_merge_named dir\n",
+    )
+    cache = yaml.YamlCache()
+
+    assert cache.load(fname)["included"] == {"value": 1}
+
+    _write(tmpdir.join("included.yaml"), "value: 2")
+    assert cache.load(fname)["included"] == {"value": 2}
+
+    _write(tmpdir.join("dir").join("second.yaml"), "second: 2")
+    assert cache.load(fname)["merged"] == {"first": 1, "second": 2}
+
+    # The unchanged included file is taken from the cache
+    hits = cache.hits
+    assert cache.load(included) == {"value": 2}
+    assert cache.hits == hits + 1
+
+
+def test_cache_invalidated_on_secret_change(tmpdir):
+    """Test a changed secret is picked up."""
+    _write(tmpdir.join("secrets.yaml"), "password: old")
+    fname = _write(tmpdir.join("configuration.yaml"), "password: !secret password")
+    cache = yaml.YamlCache()
+
+    assert cache.load(fname) == {"password": "old"}
+
+    _write(tmpdir.join("secrets.yaml"), "password: new")
+    yaml.clear_secret_cache()
+
+    assert cache.load(fname) == {"password": "new"}
+    assert cache.misses == 2
+
+
+def test_cache_invalidated_on_env_change(tmpdir):
+    """Test a changed environment variable is picked up."""
+    fname = _write(
+        tmpdir.join("configuration.yaml"), "value: !env_var OPP_TEST_VALUE default"
+    )
+    cache = yaml.YamlCache()
+
+    with patch.dict(os.environ, {"OPP_TEST_VALUE": "first"}):
+        assert cache.load(fname) == {"value": "first"}
+        assert cache.load(fname) == {"value": "first"}
+
+    assert cache.hits == 1
+    assert cache.load(fname) == {"value": "default"}
+    assert cache.misses == 2
+
+
+def test_cache_persisted_without_secrets(tmpdir):
+    """Test the cache is stored as JSON without files using secrets."""
+    _write(tmpdir.join("secrets.yaml"), "password: very_secret")
+    included = _write(tmpdir.join("included.yaml"), "value: 1")
+    fname = _write(
+        tmpdir.join("configuration.yaml"),
+        "included: !include included.yaml\npassword: !secret password\n",
+    )
+    path = str(tmpdir.join(".yaml_cache"))
+
+    yaml.YamlCache(path).load(fname)
+
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+    with open(path) as fil:
+        content = fil.read()
+    assert "very_secret" not in content
+    assert set(json.loads(content)["entries"]) == {included}
+
+    cache = yaml.YamlCache(path)
+    assert cache.load(fname)["password"] == "very_secret"
+    assert (cache.misses, cache.hits) == (1, 1)
+
+
+def test_invalid_persisted_cache(tmpdir, caplog):
+    """Test an unreadable persisted cache is ignored."""
+    fname = _write(tmpdir.join("configuration.yaml"), "value: 1")
+    path = _write(tmpdir.join(".yaml_cache"), "not json")
+
+    assert yaml.YamlCache(path).load(fname) == {"value": 1}
+    assert "Ignoring unreadable YAML cache" in caplog.text
+
+    # An entry with unknown content is parsed again
+    yaml.YamlCache(path).load(fname)
+    with open(path) as fil:
+        stored = json.load(fil)
+    stored["entries"][fname]["data"] = {"t": "unknown", "v": None}
+    with open(path, "w") as fil:
+        json.dump(stored, fil)
+
+    cache = yaml.YamlCache(path)
+    assert cache.load(fname) == {"value": 1}
+    assert cache.misses == 1
+    assert "Ignoring invalid YAML cache entry" in caplog.text